@@ -3,28 +3,30 @@ Main CLI module that orchestrates the entire application.
 """
 
 import typer
-from rich.console import Console
-from rich.prompt import Prompt
-from rich.table import Table
+from contextlib import contextmanager
 from typing import Optional, List
-from .ui_helper import UIHelper, console
-from .framework_selector import FrameworkSelector
-from .project_manager import ProjectManager
-from .config import config_manager
-from generator.generate import generate_project
+from .ui_helper import console
+from .config import get_config_manager
 
 # Initialize Typer app
 app = typer.Typer()
+templates_app = typer.Typer(help="Inspect and maintain the template catalog.")
+app.add_typer(templates_app, name="templates")
 
 
 class AppGenCLI:
     """Main CLI application class with clean organization"""
     
     def __init__(self):
-        self.config_manager = config_manager
-        self.framework_selector = FrameworkSelector(config_manager)
-        self.project_manager = ProjectManager(config_manager)
-        self.ui = UIHelper(config_manager)
+        from .ui_helper import UIHelper
+        from .framework_selector import FrameworkSelector
+        from .project_manager import ProjectManager
+
+        self.config_manager = get_config_manager()
+        # One UIHelper shared by every interactive component
+        self.ui = UIHelper(self.config_manager)
+        self.framework_selector = FrameworkSelector(self.config_manager, self.ui)
+        self.project_manager = ProjectManager(self.config_manager, self.ui)
     
     def show_welcome(self) -> None:
         """Display welcome message"""
@@ -53,15 +55,187 @@ class AppGenCLI:
             console.print("[yellow]Project generation cancelled.[/yellow]")
             raise typer.Exit()
         
+        # Ask about dependencies up front so they install while the files are written
+        package_manager = None
+        if self.project_manager.needs_install(framework, features):
+            package_manager = self.project_manager.choose_package_manager()
+        
         # Generate project
-        self.project_manager.generate_with_progress(framework, features, dir_name)
+        if not self.project_manager.generate_with_progress(framework, features, dir_name, package_manager):
+            console.print("[red]❌ Project setup did not complete; see the errors above.[/red]")
+            raise typer.Exit(1)
         
         # Show post-generation info
-        self.project_manager.show_post_generation_info(dir_name, framework)
+        self.project_manager.show_post_generation_info(dir_name, framework, installed=package_manager is not None)
+
+
+_cli_instance: Optional[AppGenCLI] = None
+
+
+def get_cli() -> AppGenCLI:
+    """Return the interactive CLI instance, building it on first use"""
+    global _cli_instance
+    if _cli_instance is None:
+        _cli_instance = AppGenCLI()
+    return _cli_instance
+
+
+def _check_copy_mode(copy_mode: str) -> None:
+    """Exit with an error if --copy-mode is not a known mode"""
+    from generator.copy_engine import COPY_MODES
+
+    if copy_mode not in COPY_MODES:
+        console.print(f"[red]Invalid copy mode '{copy_mode}'. Valid options: {', '.join(COPY_MODES)}[/red]")
+        raise typer.Exit(1)
+
+
+def _result_cache(enabled: Optional[bool]):
+    """Build the result cache if --cache or the config turns it on"""
+    cache_config = get_config_manager().get_cache_config()
+    if enabled is None:
+        enabled = cache_config.get("results", False)
+    if not enabled:
+        return None
+    from generator.result_cache import ResultCache
+    return ResultCache(max_bytes=int(cache_config.get("max_size_mb", 512)) * 1024 * 1024)
+
+
+def _install_dependencies(directory: str, **overrides) -> bool:
+    """Run the concurrent install stage over a generated tree; settings default to the install config"""
+    from pathlib import Path
+    from .project_manager import ProjectManager
+
+    return ProjectManager(get_config_manager()).install_dependencies(Path(directory), **overrides)
 
 
-# Initialize CLI instance
-cli_instance = AppGenCLI()
+def _configure_templates() -> None:
+    """Point the template store at templates.base_path and templates.sources, exiting on a bad source"""
+    # Called by the commands that read templates, so the others start without the store's imports
+    from generator.sources import SourceError
+    from generator.store import configure_template_sources, get_template_store
+
+    template_config = get_config_manager().get_template_config()
+    sources = template_config.get("sources") or []
+    configure_template_sources(template_config.get("base_path"), sources,
+                               int(template_config.get("cache_max_mb", 1024)) * 1024 * 1024)
+    if sources:
+        # Resolve (and unpack on first use) now, so a bad or mismatched source is reported up front
+        try:
+            get_template_store()
+        except (SourceError, OSError) as e:
+            from rich.markup import escape
+            console.print(f"[red]❌ Template sources: {escape(str(e))}[/red]")
+            raise typer.Exit(1)
+
+
+@contextmanager
+def _profiling(path: Optional[str]):
+    """Trace the enclosed command when --profile is given, then save and summarise the trace"""
+    if not path:
+        yield
+        return
+    from generator import trace
+
+    tracer = trace.enable()
+    try:
+        yield
+    finally:
+        trace.disable()
+        tracer.save(path)
+        _print_profile(tracer, path)
+
+
+def _print_profile(tracer, path: str) -> None:
+    """Print the per-span timing table for a finished trace"""
+    from rich.table import Table
+
+    table = Table(title="⏱️  Profile", show_header=True)
+    table.add_column("Span", style="cyan")
+    table.add_column("Calls", justify="right")
+    table.add_column("Total ms", justify="right")
+    table.add_column("Mean ms", justify="right")
+    table.add_column("Max ms", justify="right")
+    for entry in tracer.summary():
+        table.add_row(entry["name"], str(entry["calls"]), f"{entry['total_ms']:.2f}", f"{entry['mean_ms']:.2f}", f"{entry['max_ms']:.2f}")
+    console.print(table)
+    console.print(f"[blue]📈 Trace written to {path}[/blue] [dim](open in chrome://tracing or ui.perfetto.dev)[/dim]")
+
+
+def _preview(framework: str, features: List[str], dir: Optional[str], plan_json: Optional[str], diff: bool,
+             variables: dict) -> None:
+    """Show (or write as JSON) what `create` would generate, without writing the project"""
+    import json
+    from pathlib import Path
+    from rich.table import Table
+    from generator.preview import diff_preview, preview_project
+    from generator.variables import default_variables
+
+    preview = preview_project(framework, features, variables=default_variables(Path(dir), variables) if dir else variables)
+    if not preview["ok"]:
+        console.print(f"[red]❌ {preview['error']}[/red]")
+        raise typer.Exit(1)
+    if diff:
+        preview["diff"] = diff_preview(preview, dir)
+
+    if plan_json:
+        text = json.dumps(preview, indent=2) + "\n"
+        if plan_json == "-":
+            typer.echo(text, nl=False)
+        else:
+            Path(plan_json).write_text(text)
+            console.print(f"[blue]📝 Plan written to {plan_json}[/blue]")
+        return
+
+    colors = get_config_manager().get_ui_config().get("colors", {})
+    if diff:
+        status = {path: label for label, key in (("➕ added", "added"), ("✏️  modified", "modified"), ("📄 extra", "extra"))
+                  for path in preview["diff"][key]}
+        table = Table(title=f"🔍 {framework} vs {dir}", show_header=True)
+        table.add_column("Change", style=colors.get("secondary", "magenta"))
+        table.add_column("Path", style=colors.get("primary", "cyan"))
+        for path in sorted(status):
+            table.add_row(status[path], path)
+        console.print(table)
+        console.print(f"[green]{len(preview['diff']['added'])} added[/green], [yellow]{len(preview['diff']['modified'])} modified[/yellow], "
+                      f"{len(preview['diff']['unchanged'])} unchanged, {len(preview['diff']['extra'])} not from the templates")
+        return
+
+    table = Table(title=f"🔍 {framework} ({', '.join(features) or 'no features'}) (dry run)", show_header=True)
+    table.add_column("Path", style=colors.get("primary", "cyan"))
+    table.add_column("Bytes", justify="right")
+    table.add_column("Template", style=colors.get("secondary", "magenta"))
+    for f in preview["files"]:
+        table.add_row(f["path"], str(f["size"]), f["source"] or "generated")
+    console.print(table)
+    deps = {**preview["package_json"].get("dependencies", {}), **preview["package_json"].get("devDependencies", {})}
+    console.print(f"[green]{preview['total_files']} files, {preview['total_bytes']} bytes[/green] from {', '.join(preview['overlays'])}; "
+                  f"{len(deps)} dependencies in package.json")
+    for overlay in preview["missing_overlays"]:
+        console.print(f"[yellow]⚠️  Skipping missing template: {overlay}[/yellow]")
+    if preview["lockfile_error"]:
+        console.print(f"[yellow]⚠️  No package-lock.json: {preview['lockfile_error']}[/yellow]")
+
+
+def _generate_archive(framework: str, features: List[str], output_zip: Optional[str], output_tar: Optional[str],
+                      variables: dict) -> None:
+    """Generate straight into the --output-zip or --output-tar archive, without a project directory"""
+    import sys
+    from rich.console import Console
+    from generator.archive import generate_archive
+    from generator.events import NullSink, RichSink
+
+    output = output_zip or output_tar
+    fmt = "zip" if output_zip else "tar.gz" if output_tar.lower().endswith((".gz", ".tgz")) else "tar"
+    # On stdout the archive is the output; report only failures, on stderr
+    errors = Console(stderr=True) if output == "-" else console
+    if output == "-" and sys.stdout.isatty():
+        errors.print("[red]❌ Refusing to write an archive to a terminal; redirect stdout or pass a file name[/red]")
+        raise typer.Exit(1)
+    result = generate_archive(framework, features, output, fmt, sink=NullSink() if output == "-" else RichSink(),
+                              variables=variables)
+    if not result.ok:
+        errors.print(f"[red]❌ {result.error}[/red]")
+        raise typer.Exit(1)
 
 
 @app.command()
@@ -72,60 +246,108 @@ def create(
     router: str = typer.Option("pages", help="Router type for Next.js"),
     db: str = typer.Option("", "--db", help="Database type for Express (mongodb, postgresql, supabase)"),
     language: str = typer.Option("", "--language", help="Language for Serverless (javascript, typescript)"),
-    interactive: bool = typer.Option(False, "--interactive", "-i", help="Use interactive mode")
+    interactive: bool = typer.Option(False, "--interactive", "-i", help="Use interactive mode"),
+    copy_mode: str = typer.Option("auto", "--copy-mode", help="How template files are materialized (auto, reflink, copy_file_range, hardlink, copy)"),
+    jobs: int = typer.Option(1, "--jobs", "-j", min=1, help="Number of threads used to write template files"),
+    cache: Optional[bool] = typer.Option(None, "--cache/--no-cache", help="Reuse cached output for repeated combinations (default from config)"),
+    profile: Optional[str] = typer.Option(None, "--profile", help="Write a Chrome trace of each phase to this file and print a timing summary"),
+    install: bool = typer.Option(False, "--install", help="Install dependencies in every generated package.json while the files are written"),
+    dry_run: bool = typer.Option(False, "--dry-run", help="List the files and package.json the project would get, without writing anything"),
+    plan_json: Optional[str] = typer.Option(None, "--plan-json", help="Write the dry-run plan as JSON to this file ('-' for stdout)"),
+    diff: bool = typer.Option(False, "--diff", help="Compare the plan with the existing --dir instead of generating into it"),
+    var: Optional[List[str]] = typer.Option(None, "--var", help="Template variable as NAME=VALUE, e.g. port=8080 (repeatable; project_name defaults to the directory name)"),
+    output_zip: Optional[str] = typer.Option(None, "--output-zip", help="Write the project into this zip instead of a directory ('-' for stdout)"),
+    output_tar: Optional[str] = typer.Option(None, "--output-tar", help="Write the project into this tar instead of a directory; gzipped for .tar.gz/.tgz ('-' for stdout)")
 ):
     """Create a new project with the specified framework and features."""
+    _check_copy_mode(copy_mode)
+    with _profiling(profile):
+        # Inside the trace, so the config parse and store setup show up in it
+        _configure_templates()
+        # Determine if we should use interactive mode
+        use_interactive = interactive or (framework is None and dir is None)
     
-    # Determine if we should use interactive mode
-    use_interactive = interactive or (framework is None and dir is None)
-    
-    if use_interactive:
-        cli_instance.run_interactive_mode()
-    else:
-        # Command-line mode
-        if not framework:
-            typer.echo("[red]Framework is required in non-interactive mode[/red]")
-            raise typer.Exit(1)
-        
-        if not dir:
-            typer.echo("[red]Directory is required in non-interactive mode[/red]")
-            raise typer.Exit(1)
-        
-        feature_list = [f.strip().lower() for f in features.split(",") if f.strip()]
-        
-        # Handle framework-specific logic
-        if framework.lower() == "nextjs":
-            framework_config = config_manager.get_framework_config("nextjs")
-            valid_routers = framework_config.get("routers", ["app", "pages"])
-            if router not in valid_routers:
-                typer.echo(f"[red]Please specify --router {' or '.join(valid_routers)} for Next.js.[/red]")
+        if use_interactive:
+            get_cli().run_interactive_mode()
+        else:
+            # Command-line mode
+            if not framework:
+                typer.echo("[red]Framework is required in non-interactive mode[/red]")
                 raise typer.Exit(1)
-            feature_list = [router] + feature_list
-        elif framework.lower() == "express" and db:
-            valid_databases = ["mongodb", "postgresql", "supabase"]
-            if db.lower() not in valid_databases:
-                typer.echo(f"[red]Invalid database '{db}'. Valid options: {', '.join(valid_databases)}[/red]")
+        
+            archive = output_zip or output_tar
+            if archive and (dir or install or dry_run or plan_json or diff or (output_zip and output_tar)):
+                typer.echo("[red]--output-zip/--output-tar replace --dir and can't be combined with --install, --dry-run, --plan-json, --diff or each other[/red]")
                 raise typer.Exit(1)
-            feature_list = [db.lower()]
-        elif framework.lower() == "serverless":
-            valid_languages = ["javascript", "typescript", "python", "go"]
-            lang = language.lower() if language else ""
-            if not lang:
-                typer.echo("[red]--language is required for serverless framework (javascript, typescript)[/red]")
+            if not dir and not archive and (diff or not (dry_run or plan_json)):
+                typer.echo("[red]Directory is required in non-interactive mode[/red]")
                 raise typer.Exit(1)
-            if lang not in valid_languages:
-                typer.echo(f"[red]Invalid language '{lang}'. Valid options: {', '.join(valid_languages)}[/red]")
+        
+            feature_list = [f.strip().lower() for f in features.split(",") if f.strip()]
+            config_manager = get_config_manager()
+            from generator.variables import parse_assignments
+            try:
+                variables = parse_assignments(var or [])
+            except ValueError as e:
+                typer.echo(f"[red]{e}[/red]")
                 raise typer.Exit(1)
-            feature_list = [lang]
         
-        # Generate project
-        generate_project(framework, feature_list, dir)
-        console.print(f"[green]✅ Project '{framework}' created successfully at {dir}![green]")
+            # Handle framework-specific logic
+            if framework.lower() == "nextjs":
+                framework_config = config_manager.get_framework_config("nextjs")
+                valid_routers = framework_config.get("routers", ["app", "pages"])
+                if router not in valid_routers:
+                    typer.echo(f"[red]Please specify --router {' or '.join(valid_routers)} for Next.js.[/red]")
+                    raise typer.Exit(1)
+                feature_list = [router] + feature_list
+            elif framework.lower() == "express" and db:
+                valid_databases = ["mongodb", "postgresql", "supabase"]
+                if db.lower() not in valid_databases:
+                    typer.echo(f"[red]Invalid database '{db}'. Valid options: {', '.join(valid_databases)}[/red]")
+                    raise typer.Exit(1)
+                feature_list = [db.lower()]
+            elif framework.lower() == "serverless":
+                valid_languages = ["javascript", "typescript", "python", "go"]
+                lang = language.lower() if language else ""
+                if not lang:
+                    typer.echo("[red]--language is required for serverless framework (javascript, typescript)[/red]")
+                    raise typer.Exit(1)
+                if lang not in valid_languages:
+                    typer.echo(f"[red]Invalid language '{lang}'. Valid options: {', '.join(valid_languages)}[/red]")
+                    raise typer.Exit(1)
+                feature_list = [lang]
+        
+            if dry_run or plan_json or diff:
+                _preview(framework, feature_list, dir, plan_json, diff, variables)
+                return
+            if archive:
+                _generate_archive(framework, feature_list, output_zip, output_tar, variables)
+                return
+
+            # Generate project
+            from generator.events import ProgressSink
+            from generator.generate import generate_project
+            from .project_manager import ProjectManager
+            # With --install, each package.json starts installing while the remaining files are written
+            project_manager = ProjectManager(get_config_manager())
+            pipeline = project_manager.install_pipeline() if install else None
+            sink = pipeline.watch(ProgressSink(console)) if pipeline else ProgressSink(console)
+            result = generate_project(framework, feature_list, dir, copy_mode=copy_mode, jobs=jobs, cache=_result_cache(cache),
+                                      sink=sink, variables=variables)
+            if result.ok:
+                console.print(f"[green]✅ Project '{framework}' created successfully at {dir}![green]")
+            if pipeline and not project_manager.finish_pipeline(pipeline):
+                raise typer.Exit(1)
+            if not result.ok:
+                raise typer.Exit(1)
 
 
 @app.command()
 def list_frameworks():
     """List all available frameworks and their features."""
+    from rich.table import Table
+
+    config_manager = get_config_manager()
     interactive_frameworks = config_manager.get_interactive_frameworks()
     simple_frameworks = config_manager.get_simple_frameworks()
     ui_config = config_manager.get_ui_config()
@@ -151,6 +373,9 @@ def list_frameworks():
 @app.command()
 def config():
     """Show current configuration."""
+    from rich.table import Table
+
+    config_manager = get_config_manager()
     ui_config = config_manager.get_ui_config()
     
     table = Table(title="⚙️  Current Configuration", show_header=True)
@@ -167,11 +392,24 @@ def config():
 @app.command()
 def preset(
     name: Optional[str] = typer.Argument(None, help="Name of the preset (e.g., mern, headless-cms)"),
-    dir: Optional[str] = typer.Option(None, help="Base directory to generate the project in")
+    dir: Optional[str] = typer.Option(None, help="Base directory to generate the project in"),
+    copy_mode: str = typer.Option("auto", "--copy-mode", help="How template files are materialized (auto, reflink, copy_file_range, hardlink, copy)"),
+    jobs: int = typer.Option(1, "--jobs", "-j", min=1, help="Number of threads used to write template files"),
+    cache: Optional[bool] = typer.Option(None, "--cache/--no-cache", help="Reuse cached output for repeated combinations (default from config)"),
+    profile: Optional[str] = typer.Option(None, "--profile", help="Write a Chrome trace of each phase to this file and print a timing summary"),
+    install: bool = typer.Option(False, "--install", help="Install dependencies in every generated package.json while the files are written")
 ):
     """Generate a project using a predefined preset."""
+    _check_copy_mode(copy_mode)
+    _configure_templates()
+    from rich.prompt import Prompt
+    from rich.table import Table
+    from generator.events import RichSink
+    from .presets import preset_components, generate_components
+    from .project_manager import ProjectManager
+
     # Get presets from config
-    presets = config_manager.get_presets()
+    presets = get_config_manager().get_presets()
     
     if not presets:
         console.print("[red]❌ No presets configured[/red]")
@@ -183,7 +421,7 @@ def preset(
         for i, (preset_name, preset_info) in enumerate(presets.items(), 1):
             console.print(f"{i}. {preset_name} - {preset_info['description']}")
         
-        choice = cli_instance.ui.get_user_choice("Choose preset number", len(presets))
+        choice = get_cli().ui.get_user_choice("Choose preset number", len(presets))
         name = list(presets.keys())[choice - 1]
     
     if name not in presets:
@@ -196,38 +434,332 @@ def preset(
     if not dir:
         dir = Prompt.ask(f"Enter project directory name", default=f"my-{name}")
     
-    console.print(f"[cyan]🚀 Generating {name} preset...[/cyan]")
+    components = preset_components(preset_info)
+    if not components:
+        console.print(f"[red]❌ Invalid preset configuration for {name}[/red]")
+        raise typer.Exit(1)
     
-    if "frontend" in preset_info and "backend" in preset_info:
-        # Generate frontend
-        frontend = preset_info["frontend"]
-        frontend_dir = f"{dir}/{frontend['directory']}" if frontend['directory'] != "." else dir
-        console.print(f"[blue]📱 Generating frontend ({frontend['framework']})...[/blue]")
-        generate_project(frontend["framework"], frontend["features"], frontend_dir)
-        
-        # Generate backend
-        backend = preset_info["backend"]
-        backend_dir = f"{dir}/{backend['directory']}"
-        console.print(f"[green]🖥️  Generating backend ({backend['framework']})...[/green]")
-        generate_project(backend["framework"], backend["features"], backend_dir)
-        
-        console.print(f"[bold green]🎉 Fullstack {name} project created successfully![/bold green]")
-        console.print(f"[cyan]Frontend:[/cyan] {frontend_dir}")
-        console.print(f"[cyan]Backend:[/cyan] {backend_dir}")
+    if len(components) > 1:
+        console.print(f"[cyan]🚀 Generating {name} preset ({len(components)} components in parallel)...[/cyan]")
+    else:
+        console.print(f"[cyan]🚀 Generating {name} preset...[/cyan]")
+    with _profiling(profile):
+        project_manager = ProjectManager(get_config_manager())
+        pipeline = project_manager.install_pipeline() if install else None
+        try:
+            results = generate_components(components, dir, pipeline=pipeline, copy_mode=copy_mode, jobs=jobs, cache=_result_cache(cache))
+        except ValueError as e:
+            console.print(f"[red]❌ Invalid preset configuration for {name}: {e}[/red]")
+            raise typer.Exit(1)
+    
+        renderer = RichSink()
+        for result in results:
+            result["events"].replay(renderer)
+    
+        ui_config = get_config_manager().get_ui_config()
+        colors = ui_config.get("colors", {})
+        table = Table(title=f"🧱 {name} components", show_header=True)
+        table.add_column("Component", style=colors.get("primary", "cyan"))
+        table.add_column("Framework", style=colors.get("secondary", "magenta"))
+        table.add_column("Directory")
+        table.add_column("Status")
+        table.add_column("Files", justify="right")
+        table.add_column("Time", justify="right")
+        for result in results:
+            status = "✅ ok" if result["status"] == "ok" else f"❌ {result['error']}"
+            table.add_row(result["name"], result["framework"], result["directory"], status, str(result["files"]), f"{result['seconds']:.2f}s")
+        console.print(table)
     
-    elif "frontend" in preset_info:
-        frontend = preset_info["frontend"]
-        final_dir = dir if frontend['directory'] == "." else f"{dir}/{frontend['directory']}"
-        generate_project(frontend["framework"], frontend["features"], final_dir)
-        console.print(f"[green]✅ {name} project created successfully at {final_dir}![/green]")
+        failed = any(result["status"] != "ok" for result in results)
+        if failed:
+            console.print(f"[red]❌ {name} preset finished with errors[/red]")
+        else:
+            console.print(f"[bold green]🎉 {name} project created successfully at {dir}![/bold green]")
+    
+        if pipeline and not project_manager.finish_pipeline(pipeline):
+            raise typer.Exit(1)
+        if failed:
+            raise typer.Exit(1)
+
+
+@app.command()
+def batch(
+    manifest: str = typer.Argument(..., help="YAML or JSON file listing {framework, features, dir} entries"),
+    workers: Optional[int] = typer.Option(None, "--workers", "-w", min=1, help="Worker processes (default: CPU count)"),
+    json_out: Optional[str] = typer.Option(None, "--json", help="Write the summary as JSON to this file, or '-' for stdout"),
+    copy_mode: str = typer.Option("auto", "--copy-mode", help="How template files are materialized (auto, reflink, copy_file_range, hardlink, copy)"),
+    jobs: int = typer.Option(1, "--jobs", "-j", min=1, help="Number of threads each worker uses to write files"),
+    cache: Optional[bool] = typer.Option(None, "--cache/--no-cache", help="Reuse cached output for repeated combinations (default from config)")
+):
+    """Generate many projects from one manifest across a process pool."""
+    import json
+    from pathlib import Path
+    from generator.batch import generate_batch
+
+    _check_copy_mode(copy_mode)
+    _configure_templates()
+    manifest_path = Path(manifest)
+    if not manifest_path.exists():
+        console.print(f"[red]❌ Manifest not found: {manifest}[/red]")
+        raise typer.Exit(1)
+    with manifest_path.open() as f:
+        if manifest_path.suffix == ".json":
+            data = json.load(f)
+        else:
+            import yaml
+            data = yaml.safe_load(f)
+    entries = data.get("projects", []) if isinstance(data, dict) else data
+    if not entries:
+        console.print(f"[red]❌ No projects listed in {manifest}[/red]")
+        raise typer.Exit(1)
     
-    elif "framework" in preset_info:
-        generate_project(preset_info["framework"], preset_info["features"], dir)
-        console.print(f"[green]✅ {name} project created successfully at {dir}![/green]")
+    try:
+        summary = generate_batch(entries, workers=workers, copy_mode=copy_mode, jobs=jobs, cache=_result_cache(cache))
+    except ValueError as e:
+        console.print(f"[red]❌ {e}[/red]")
+        raise typer.Exit(1)
     
+    if json_out == "-":
+        typer.echo(json.dumps(summary, indent=2))
     else:
-        console.print(f"[red]❌ Invalid preset configuration for {name}[/red]")
+        from rich.table import Table
+
+        colors = get_config_manager().get_ui_config().get("colors", {})
+        table = Table(title=f"📦 Batch: {len(summary['projects'])} projects on {summary['workers']} workers", show_header=True)
+        table.add_column("Framework", style=colors.get("primary", "cyan"))
+        table.add_column("Features", style=colors.get("secondary", "magenta"))
+        table.add_column("Directory")
+        table.add_column("Status")
+        table.add_column("Time", justify="right")
+        for project in summary["projects"]:
+            status = "✅ ok" if project["status"] == "ok" else f"❌ {project['error']}"
+            table.add_row(project["framework"], ", ".join(project["features"]) or "-", project["dir"], status, f"{project['seconds']:.2f}s")
+        console.print(table)
+        console.print(f"[green]{summary['ok']} ok[/green], [red]{summary['failed']} failed[/red] in {summary['seconds']:.2f}s")
+        if json_out:
+            Path(json_out).write_text(json.dumps(summary, indent=2))
+    
+    if summary["failed"]:
+        raise typer.Exit(1)
+
+
+@app.command()
+def install(
+    dir: str = typer.Argument(".", help="Generated project to install dependencies in"),
+    package_manager: Optional[str] = typer.Option(None, "--package-manager", "-p", help="npm, yarn, pnpm or bun (default from config)"),
+    jobs: Optional[int] = typer.Option(None, "--jobs", "-j", min=1, help="Sub-projects installed at the same time (default from config)"),
+    prefer_offline: bool = typer.Option(False, "--prefer-offline", help="Use cached packages when present, fetching only what is missing"),
+    offline: bool = typer.Option(False, "--offline", help="Install only from the package cache or an offline mirror"),
+    registry: Optional[str] = typer.Option(None, "--registry", help="Registry or offline mirror URL"),
+    cache_dir: Optional[str] = typer.Option(None, "--cache-dir", help="Package cache shared by every install"),
+    profile: Optional[str] = typer.Option(None, "--profile", help="Write a Chrome trace of each install to this file and print a timing summary")
+):
+    """Install dependencies for every package.json in a generated project, concurrently."""
+    from pathlib import Path
+
+    if not Path(dir).is_dir():
+        console.print(f"[red]❌ Directory not found: {dir}[/red]")
+        raise typer.Exit(1)
+    mode = "offline" if offline else "prefer-offline" if prefer_offline else None
+    with _profiling(profile):
+        ok = _install_dependencies(dir, package_manager=package_manager, mode=mode, jobs=jobs,
+                                   registry=registry, cache_dir=cache_dir)
+    if not ok:
+        raise typer.Exit(1)
+
+
+@app.command()
+def sync(
+    dirs: Optional[List[str]] = typer.Argument(None, help="Generated projects to update (default: current directory)"),
+    dry_run: bool = typer.Option(False, "--dry-run", help="Report what would change without writing anything"),
+    as_json: bool = typer.Option(False, "--json", help="Print the reports as JSON"),
+    copy_mode: str = typer.Option("auto", "--copy-mode", help="How template files are materialized (auto, reflink, copy_file_range, hardlink, copy)")
+):
+    """Update generated projects to the current templates, keeping local edits."""
+    import json
+    from rich.table import Table
+    from generator.sync import sync_project
+
+    _check_copy_mode(copy_mode)
+    _configure_templates()
+    reports = []
+    for directory in dirs or ["."]:
+        try:
+            reports.append(sync_project(directory, dry_run=dry_run, copy_mode=copy_mode))
+        except ValueError as e:
+            console.print(f"[red]❌ {e}[/red]")
+            raise typer.Exit(1)
+    
+    if as_json:
+        typer.echo(json.dumps(reports, indent=2))
+        return
+    
+    colors = get_config_manager().get_ui_config().get("colors", {})
+    for report in reports:
+        changes = [("➕ added", path) for path in report["added"]]
+        changes += [("✏️  updated", path) for path in report["updated"]]
+        changes += [("🗑️  removed", path) for path in report["removed"]]
+        changes += [(f"⚠️  conflict: {c['reason']}", c["path"]) for c in report["conflicts"]]
+        title = f"🔄 {report['target']} ({report['from_version']} → {report['to_version']})"
+        if not changes:
+            console.print(f"[green]{title}: up to date[/green]")
+            continue
+        table = Table(title=title + (" (dry run)" if dry_run else ""), show_header=True)
+        table.add_column("Change", style=colors.get("secondary", "magenta"))
+        table.add_column("Path", style=colors.get("primary", "cyan"))
+        for change, path in changes:
+            table.add_row(change, path)
+        console.print(table)
+        console.print(f"[green]{len(report['added']) + len(report['updated']) + len(report['removed'])} changed[/green], "
+                      f"[yellow]{len(report['conflicts'])} conflicts[/yellow], {report['unchanged']} unchanged")
+
+
+@app.command()
+def serve(
+    host: Optional[str] = typer.Option(None, "--host", help="Address to listen on (default from config)"),
+    port: Optional[int] = typer.Option(None, "--port", "-p", help="Port to listen on (default from config)"),
+    workers: Optional[int] = typer.Option(None, "--workers", "-w", min=1, help="Requests generated at the same time (default from config)"),
+    queue: Optional[int] = typer.Option(None, "--queue", min=0, help="Connections held for a free worker before answering 503 (default from config)"),
+    verbose: bool = typer.Option(False, "--verbose", "-v", help="Log every request")
+):
+    """Serve project generation over HTTP, streaming each project back as an archive."""
+    from generator.pack import load_build_combinations
+    from generator.server import GenerationServer
+
+    _configure_templates()
+    config_manager = get_config_manager()
+    server_config = config_manager.get_server_config()
+    address = (host or server_config.get("host", "127.0.0.1"), port or int(server_config.get("port", 8765)))
+    try:
+        server = GenerationServer(address, workers=workers or int(server_config.get("workers", 4)),
+                                  queue=queue if queue is not None else int(server_config.get("queue", 16)), verbose=verbose,
+                                  combinations=load_build_combinations(config_manager.config_path))
+    except OSError as e:
+        console.print(f"[red]❌ Cannot listen on {address[0]}:{address[1]}: {e}[/red]")
+        raise typer.Exit(1)
+    console.print(f"[green]🚀 Serving on http://{address[0]}:{server.server_address[1]} "
+                  f"with {server.workers} workers[/green] [dim](POST /generate, GET /health, GET /metrics)[/dim]")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        console.print("[yellow]Shutting down...[/yellow]")
+    finally:
+        server.server_close()
+
+
+@templates_app.command("sources")
+def templates_sources():
+    """Show the template search path, in lookup order."""
+    from rich.table import Table
+    from generator.store import get_template_store
+
+    _configure_templates()
+    store = get_template_store()
+    colors = get_config_manager().get_ui_config().get("colors", {})
+    table = Table(title="🗂️  Template Sources", show_header=True)
+    table.add_column("#", justify="right")
+    table.add_column("Location", style=colors.get("primary", "cyan"))
+    table.add_column("Kind", style=colors.get("secondary", "magenta"))
+    table.add_column("Files", justify="right")
+    for i, layer in enumerate(getattr(store, "stores", [store]), 1):
+        kind = "pack" if hasattr(layer, "combinations") else "directory"
+        table.add_row(str(i), layer.location, kind, str(sum(1 for _ in layer.keys())))
+    console.print(table)
+
+
+@templates_app.command("stats")
+def templates_stats(
+    as_json: bool = typer.Option(False, "--json", help="Print the report as JSON"),
+    top: int = typer.Option(10, "--top", help="Number of duplicated files to list")
+):
+    """Show how many bytes content-addressed storage saves across template variants."""
+    import json
+    from rich.table import Table
+    from generator.store import get_template_store, template_stats
+
+    _configure_templates()
+    stats = template_stats(get_template_store())
+    if as_json:
+        typer.echo(json.dumps(stats, indent=2))
+        return
+    
+    colors = get_config_manager().get_ui_config().get("colors", {})
+    table = Table(title="🗃️  Template Store", show_header=True)
+    table.add_column("Framework", style=colors.get("primary", "cyan"))
+    table.add_column("Files", justify="right")
+    table.add_column("Bytes", justify="right")
+    table.add_column("Unique bytes", justify="right", style=colors.get("success", "green"))
+    for framework, info in stats["frameworks"].items():
+        table.add_row(framework, str(info["files"]), f"{info['bytes']:,}", f"{info['unique_bytes']:,}")
+    table.add_row("[bold]total[/bold]", str(stats["files"]), f"{stats['bytes']:,}", f"{stats['unique_bytes']:,}")
+    console.print(table)
+    
+    saved_pct = 100 * stats["saved_bytes"] / stats["bytes"] if stats["bytes"] else 0
+    console.print(f"[blue]Source:[/blue] {stats['source']}")
+    console.print(f"[green]♻️  {stats['files']} files stored as {stats['unique_blobs']} blobs; "
+                  f"deduplication saves {stats['saved_bytes']:,} bytes ({saved_pct:.1f}%)[/green]")
+    for dup in stats["duplicates"][:top]:
+        console.print(f"  [dim]{dup['copies']}× {dup['size']:>8,} B[/dim]  {', '.join(dup['keys'])}")
+
+
+@templates_app.command("watch")
+def templates_watch(
+    templates: Optional[str] = typer.Option(None, "--templates", help="Template tree to watch (default: templates.base_path)"),
+    out: Optional[str] = typer.Option(None, "--out", help="Scratch directory for the sample projects (default: ~/.cache/appgen/samples)"),
+    framework: Optional[List[str]] = typer.Option(None, "--framework", "-f", help="Only keep samples of this framework (repeatable)"),
+    poll: bool = typer.Option(False, "--poll", help="Poll for changes instead of using inotify"),
+    interval: float = typer.Option(0.5, "--interval", help="Seconds between polls")
+):
+    """Regenerate sample projects incrementally while template files are edited."""
+    import time
+    from pathlib import Path
+    from rich.markup import escape
+    from generator.blobs import default_cache_dir
+    from generator.pack import load_build_combinations
+    from generator.store import template_base_dir
+    from generator.watch import TemplateWatch, open_watcher
+
+    _configure_templates()
+    root = Path(templates).resolve() if templates else template_base_dir()
+    if not root.is_dir():
+        console.print(f"[red]❌ Template directory not found: {root}[/red]")
         raise typer.Exit(1)
+    combinations = [c for c in load_build_combinations() if not framework or c["framework"] in framework]
+    if not combinations:
+        console.print(f"[red]❌ No combinations for {', '.join(framework)}[/red]")
+        raise typer.Exit(1)
+    out_path = Path(out) if out else default_cache_dir() / "samples"
+
+    def show(reports, seconds: float) -> None:
+        written = sum(len(r["written"]) + len(r["removed"]) for r in reports)
+        console.print(f"[green]🔁 {len(reports)} samples, {written} files rewritten in {seconds:.2f}s[/green]")
+        failed = {}
+        for report in reports:
+            if report["error"]:
+                failed.setdefault(report["error"], []).append(report["sample"])
+        for error, samples in failed.items():
+            where = samples[0] if len(samples) == 1 else f"{len(samples)} samples"
+            console.print(f"[yellow]⚠️  {where}: {escape(error)}[/yellow]")
+
+    session = TemplateWatch(root, out_path, combinations)
+    started = time.perf_counter()
+    show(session.build(), time.perf_counter() - started)
+    with open_watcher(root, polling=poll, interval=interval) as watcher:
+        console.print(f"[cyan]👀 Watching {root} ({watcher.backend}); samples in {out_path}. Ctrl+C to stop.[/cyan]")
+        try:
+            while True:
+                update = session.apply(watcher.wait())
+                if update["keys"] is None:
+                    console.print("[yellow]Too many changes at once; rebuilt the whole index[/yellow]")
+                elif not update["keys"]:
+                    continue
+                else:
+                    keys = update["keys"]
+                    more = f" and {len(keys) - 5} more" if len(keys) > 5 else ""
+                    console.print(f"[blue]✏️  {escape(', '.join(keys[:5]))}{more}[/blue]")
+                show(update["samples"], update["seconds"])
+        except KeyboardInterrupt:
+            console.print("[yellow]Stopped watching.[/yellow]")
 
 
 @app.callback(invoke_without_command=True)
@@ -237,8 +769,9 @@ def main_callback(
 ):
     """AppGen - Modern Project Generator for Web Development"""
     if interactive and ctx.invoked_subcommand is None:
-        # Call the create command with interactive mode
-        ctx.invoke(create, interactive=True)
+        # Same flow as 'create --interactive'; invoking create here would pass its OptionInfo defaults
+        _configure_templates()
+        get_cli().run_interactive_mode()
         raise typer.Exit()
 
 
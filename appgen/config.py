@@ -4,7 +4,7 @@ Configuration management for AppGen
 """
 import json
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 from rich.console import Console
 
 console = Console()
@@ -93,8 +93,27 @@ DEFAULT_CONFIG = {
     },
     "templates": {
         "base_path": "templates",
+        "sources": [],
+        "cache_max_mb": 1024,
         "auto_cleanup": True,
         "merge_package_json": True
+    },
+    "cache": {
+        "results": False,
+        "max_size_mb": 512
+    },
+    "install": {
+        "package_manager": "auto",
+        "mode": "auto",
+        "jobs": 4,
+        "registry": "",
+        "cache_dir": ""
+    },
+    "server": {
+        "host": "127.0.0.1",
+        "port": 8765,
+        "workers": 4,
+        "queue": 16
     }
 }
 
@@ -102,24 +121,33 @@ class ConfigManager:
     def __init__(self, config_path: Optional[Path] = None):
         # Get config file path from package directory
         self.config_path = config_path or self._get_package_config_path()
-        # Don't cache config - always load fresh
-        self._config = None
+        # Parsed config, keyed by the (mtime, size, inode) of the file it came from
+        self._config: Optional[Dict[str, Any]] = None
+        self._config_signature: Optional[Tuple[int, int, int]] = None
+        # framework name -> spec, merged from the interactive and simple sections
+        self._framework_index: Dict[str, Dict[str, Any]] = {}
     
     def _get_package_config_path(self) -> Path:
         """Get the config file path from the package directory"""
         # Since config.py is now in the appgen package, 
         # the YAML file will be in the same directory
         current_dir = Path(__file__).parent
-        package_config = current_dir / "appgen.config.yaml"
-        console.print(f"[blue]Looking for config in package: {package_config}[/blue]")
-        return package_config
+        return current_dir / "appgen.config.yaml"
     
     def _get_default_config_path(self) -> Path:
         """Get the default config file path - package directory only"""
         return self._get_package_config_path()
     
+    def _stat_signature(self) -> Optional[Tuple[int, int, int]]:
+        """Return (mtime, size, inode) of the config file, or None if it is missing"""
+        try:
+            st = self.config_path.stat()
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+    
     def _load_config(self) -> Dict[str, Any]:
-        """Load configuration from YAML file - NO CACHING, always fresh load"""
+        """Load configuration from YAML file"""
         if self.config_path.exists():
             try:
                 with self.config_path.open('r') as f:
@@ -139,10 +167,33 @@ class ConfigManager:
             console.print("[yellow]Using default configuration[/yellow]")
             return DEFAULT_CONFIG
     
+    def _build_framework_index(self, config: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """Index framework specs by name; interactive entries win over simple ones"""
+        frameworks = config.get("frameworks", {})
+        index = dict(frameworks.get("simple") or {})
+        index.update(frameworks.get("interactive") or {})
+        return index
+    
+    def _refresh(self) -> Dict[str, Any]:
+        """Re-parse the config file only when its (mtime, size, inode) changed"""
+        signature = self._stat_signature()
+        if self._config is None or signature != self._config_signature:
+            from generator import trace
+            with trace.span("config.load"):
+                self._config = self._load_config() or {}
+            self._config_signature = signature
+            self._framework_index = self._build_framework_index(self._config)
+        return self._config
+    
     @property
     def config(self) -> Dict[str, Any]:
-        """Always load fresh config - no caching"""
-        return self._load_config()
+        """Parsed config, cached until the file on disk changes"""
+        return self._refresh()
+    
+    def reload(self) -> Dict[str, Any]:
+        """Drop the cached config and parse the file again"""
+        self._config = None
+        return self.config
     
     def _create_default_config(self):
         """Create default configuration file"""
@@ -159,31 +210,38 @@ class ConfigManager:
             console.print(f"[red]Error creating config: {e}[/red]")
     
     def get_interactive_frameworks(self) -> Dict[str, Any]:
-        """Get interactive frameworks - always fresh load"""
+        """Get interactive frameworks"""
         return self.config.get("frameworks", {}).get("interactive", {})
     
     def get_simple_frameworks(self) -> Dict[str, Any]:
-        """Get simple frameworks - always fresh load"""
+        """Get simple frameworks"""
         return self.config.get("frameworks", {}).get("simple", {})
     
     def get_framework_config(self, framework: str) -> Optional[Dict[str, Any]]:
-        """Get framework config - always fresh load"""
-        interactive = self.get_interactive_frameworks()
-        simple = self.get_simple_frameworks()
-        if framework in interactive:
-            return interactive[framework]
-        elif framework in simple:
-            return simple[framework]
-        return None
+        """Get framework config from the prebuilt name index"""
+        self._refresh()
+        return self._framework_index.get(framework)
     
     def get_ui_config(self) -> Dict[str, Any]:
-        """Get UI config - always fresh load"""
+        """Get UI config"""
         return self.config.get("ui", {})
     
     def get_template_config(self) -> Dict[str, Any]:
-        """Get template config - always fresh load"""
+        """Get template config"""
         return self.config.get("templates", {})
     
+    def get_cache_config(self) -> Dict[str, Any]:
+        """Get result cache config"""
+        return self.config.get("cache", {})
+    
+    def get_install_config(self) -> Dict[str, Any]:
+        """Get dependency install config"""
+        return self.config.get("install", {})
+    
+    def get_server_config(self) -> Dict[str, Any]:
+        """Get `appgen serve` config"""
+        return self.config.get("server", {})
+    
     def add_framework(self, framework_type: str, name: str, config: Dict[str, Any]):
         """Add framework - NO PERSISTENCE (read-only from YAML)"""
         console.print("[yellow]Warning: Cannot modify configuration - using read-only YAML config[/yellow]")
@@ -200,7 +258,7 @@ class ConfigManager:
         raise NotImplementedError("Configuration is read-only from YAML file")
     
     def get_presets(self) -> Dict[str, Any]:
-        """Get presets - always fresh load"""
+        """Get presets"""
         return self.config.get("presets", {})
     
     def _save_config(self):
@@ -208,5 +266,20 @@ class ConfigManager:
         console.print("[yellow]Warning: Cannot save configuration - using read-only YAML config[/yellow]")
         pass
 
-# Global config instance
-config_manager = ConfigManager() 
\ No newline at end of file
+_config_manager: Optional[ConfigManager] = None
+
+
+def get_config_manager() -> ConfigManager:
+    """Return the shared ConfigManager, creating it on first use"""
+    global _config_manager
+    if _config_manager is None:
+        _config_manager = ConfigManager()
+    return _config_manager
+
+
+def __getattr__(name: str) -> Any:
+    # Keep `from appgen.config import config_manager` working without
+    # building the instance at import time
+    if name == "config_manager":
+        return get_config_manager()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -2,17 +2,16 @@
 Framework Selector module for handling framework selection and configuration.
 """
 
-from rich.prompt import Confirm
-from typing import List
+from typing import List, Optional
 from .ui_helper import UIHelper, console
 
 
 class FrameworkSelector:
     """Handles framework selection and configuration"""
     
-    def __init__(self, config_manager):
+    def __init__(self, config_manager, ui: Optional[UIHelper] = None):
         self.config_manager = config_manager
-        self.ui = UIHelper(config_manager)
+        self.ui = ui or UIHelper(config_manager)
     
     def show_framework_selection(self) -> str:
         """Display framework selection table and get user choice"""
@@ -173,6 +172,7 @@ class FrameworkSelector:
     
     def _get_feature_selection(self, framework: str) -> List[str]:
         """Generic feature selection for frameworks"""
+        from rich.prompt import Confirm
         framework_config = self.config_manager.get_framework_config(framework)
         features = framework_config.get("features", [])
         feature_descriptions = framework_config.get("feature_descriptions", {})
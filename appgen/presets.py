@@ -0,0 +1,85 @@
+"""
+Preset resolution and concurrent generation of preset components.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+
+def preset_components(preset_info: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Normalise a preset into a list of {name, framework, features, directory} components.
+
+    Presets either list their parts under `components`, or use the older
+    `frontend`/`backend` keys, or name a single `framework` at the top level.
+    """
+    if "components" in preset_info:
+        raw = [(c.get("name") or c.get("directory") or c["framework"], c) for c in preset_info["components"]]
+    elif "frontend" in preset_info or "backend" in preset_info:
+        raw = [(role, preset_info[role]) for role in ("frontend", "backend") if role in preset_info]
+    elif "framework" in preset_info:
+        raw = [("project", {"framework": preset_info["framework"], "features": preset_info.get("features", [])})]
+    else:
+        return []
+
+    return [
+        {
+            "name": name,
+            "framework": spec["framework"],
+            "features": list(spec.get("features") or []),
+            "directory": spec.get("directory", "."),
+        }
+        for name, spec in raw
+    ]
+
+
+def component_dir(base_dir: str, directory: str) -> str:
+    """Resolve a component directory relative to the preset's base directory"""
+    return base_dir if directory in (".", "") else f"{base_dir}/{directory}"
+
+
+def _generate_component(component: Dict[str, Any], base_dir: str, pipeline=None, **generate_options: Any) -> Dict[str, Any]:
+    from generator.events import BufferedSink
+    from generator.generate import generate_project
+
+    target = component_dir(base_dir, component["directory"])
+    # Buffer each component's events so concurrent components don't interleave on the terminal
+    events = BufferedSink()
+    result = {"name": component["name"], "framework": component["framework"], "directory": target, "events": events}
+    start = time.perf_counter()
+    try:
+        sink = pipeline.watch(events) if pipeline is not None else events
+        generated = generate_project(component["framework"], component["features"], target, sink=sink, **generate_options)
+        result["status"] = "ok" if generated.ok else "failed"
+        result["error"] = generated.error
+        result["files"] = len(generated.files_written)
+        result["bytes"] = generated.bytes_written
+    except Exception as e:
+        result["status"] = "failed"
+        result["error"] = str(e)
+        result["files"] = 0
+        result["bytes"] = 0
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def generate_components(
+    components: List[Dict[str, Any]],
+    base_dir: str,
+    max_workers: Optional[int] = None,
+    pipeline=None,
+    **generate_options: Any,
+) -> List[Dict[str, Any]]:
+    """Generate every component concurrently; return per-component status and timing in input order.
+
+    Each result carries the component's buffered generation events under "events".
+    With an InstallPipeline, each component's dependencies install while it is generated.
+    """
+    directories = [component_dir(base_dir, c["directory"]) for c in components]
+    if len(set(directories)) != len(directories):
+        raise ValueError("Preset components must use distinct directories")
+
+    workers = max_workers or len(components) or 1
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_generate_component, c, base_dir, pipeline, **generate_options) for c in components]
+        return [f.result() for f in futures]
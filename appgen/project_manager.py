@@ -6,18 +6,17 @@ import subprocess
 import sys
 from pathlib import Path
 from rich.prompt import Prompt, Confirm
-from rich.progress import Progress, SpinnerColumn, TextColumn
-from typing import List
+from typing import List, Optional
+from generator import trace
 from .ui_helper import UIHelper, console
-from generator.generate import generate_project
 
 
 class ProjectManager:
     """Handles project creation and management"""
     
-    def __init__(self, config_manager):
+    def __init__(self, config_manager, ui: Optional[UIHelper] = None):
         self.config_manager = config_manager
-        self.ui = UIHelper(config_manager)
+        self.ui = ui or UIHelper(config_manager)
     
     def get_project_directory(self) -> str:
         """Get project directory name from user"""
@@ -47,18 +46,33 @@ class ProjectManager:
         
         return Confirm.ask("🚀 Proceed with project generation?", default=True)
     
-    def generate_with_progress(self, framework: str, features: List[str], dir_name: str) -> None:
-        """Generate project with progress indicator"""
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            console=console
-        ) as progress:
-            task = progress.add_task("Generating project...", total=None)
-            generate_project(framework, features, dir_name)
-            progress.update(task, description="✅ Project generated successfully!")
+    def needs_install(self, framework: str, features: List[str]) -> bool:
+        """Whether the combination writes a package.json that lists dependencies"""
+        from generator.generate import load_combination
+        from generator.install import declares_dependencies
+        from generator.store import get_template_store, load_template_json
+        combination = load_combination(framework, features)
+        if combination is None:
+            return False
+        store = get_template_store()
+        nested = [load_template_json(store, key) for rel_path, key in combination["plan"].items() if Path(rel_path).name == "package.json"]
+        return any(declares_dependencies(package_json) for package_json in [combination["package_json"]] + nested)
     
-    def show_post_generation_info(self, dir_name: str, framework: str = None) -> None:
+    def generate_with_progress(self, framework: str, features: List[str], dir_name: str,
+                               package_manager: Optional[str] = None) -> bool:
+        """Generate project with a progress bar over the planned files.
+
+        With a package manager, dependencies install in the background while the files are written.
+        """
+        from generator.events import ProgressSink
+        from generator.generate import generate_project
+        if package_manager is None:
+            return generate_project(framework, features, dir_name, sink=ProgressSink(console)).ok
+        pipeline = self.install_pipeline(package_manager=package_manager)
+        generate_project(framework, features, dir_name, sink=pipeline.watch(ProgressSink(console)))
+        return self.finish_pipeline(pipeline)
+    
+    def show_post_generation_info(self, dir_name: str, framework: str = None, installed: bool = False) -> None:
         """Show post-generation information and next steps"""
         project_path = Path(dir_name).resolve()
         console.print(f"\n[bold green]🎉 Project created successfully![bold green]")
@@ -74,9 +88,9 @@ class ProjectManager:
         for step in next_steps:
             console.print(f"  $ {step}")
 
-        # Offer to install dependencies for JS/TS frameworks
-        js_frameworks = ["nextjs", "reactjs", "express"]
-        if framework and framework.lower() in js_frameworks:
+        # Offer to install dependencies wherever the project has a package.json that lists some
+        from generator.install import projects_with_dependencies
+        if not installed and projects_with_dependencies(str(project_path)):
             self.install_dependencies_interactive(project_path)
 
         # Ask if user wants to open in editor
@@ -85,22 +99,22 @@ class ProjectManager:
 
     def install_dependencies_interactive(self, project_path: Path) -> None:
         """Prompt for and install dependencies using chosen package manager"""
-        from shutil import which
-        package_managers = [
-            ("npm", "npm install"),
-            ("yarn", "yarn install"),
-            ("pnpm", "pnpm install"),
-            ("bun", "bun install")
-        ]
-        available = [(name, cmd) for name, cmd in package_managers if which(name)]
+        package_manager = self.choose_package_manager()
+        if package_manager is not None:
+            self.install_dependencies(project_path, package_manager=package_manager)
+
+    def choose_package_manager(self) -> Optional[str]:
+        """Ask whether to install dependencies and with which package manager; None if not"""
+        from generator.install import available_package_managers
+        available = available_package_managers()
         if not available:
             console.print("[yellow]⚠️  No supported package managers (npm, yarn, pnpm, bun) found in PATH.[/yellow]")
-            return
+            return None
         if not Confirm.ask("\n📦 Would you like to install dependencies now?", default=True):
-            return
+            return None
         # Show menu of available managers
         console.print("\n[bold]Choose your package manager:[/bold]")
-        for i, (name, _) in enumerate(available, 1):
+        for i, name in enumerate(available, 1):
             console.print(f"  {i}. {name}")
         while True:
             try:
@@ -111,14 +125,82 @@ class ProjectManager:
                     console.print(f"[red]Invalid choice. Please select 1-{len(available)}[/red]")
             except ValueError:
                 console.print("[red]Please enter a valid number[/red]")
-        name, cmd = available[choice - 1]
-        console.print(f"[cyan]Running: {cmd} in {project_path}...[/cyan]")
-        import subprocess
+        return available[choice - 1]
+    
+    def install_dependencies(
+        self,
+        project_path: Path,
+        package_manager: Optional[str] = None,
+        mode: Optional[str] = None,
+        jobs: Optional[int] = None,
+        registry: Optional[str] = None,
+        cache_dir: Optional[str] = None,
+    ) -> bool:
+        """Install dependencies in every sub-project concurrently; settings default to the install config"""
+        from generator.events import RichSink
+        from generator.install import find_projects, install_projects
+
+        install_config = self.config_manager.get_install_config()
+        projects = find_projects(str(project_path))
+        if not projects:
+            console.print(f"[yellow]⚠️  No package.json found under {project_path}[/yellow]")
+            return True
         try:
-            subprocess.run(cmd.split(), cwd=project_path, check=True)
-            console.print(f"[green]✅ Dependencies installed with {name}![/green]")
-        except Exception as e:
-            console.print(f"[red]❌ Failed to install dependencies with {name}: {e}[/red]")
+            results = install_projects(
+                projects,
+                str(project_path),
+                package_manager=package_manager or install_config.get("package_manager", "auto"),
+                mode=mode or install_config.get("mode", "auto"),
+                jobs=jobs or install_config.get("jobs"),
+                registry=registry or install_config.get("registry") or None,
+                cache_dir=cache_dir or install_config.get("cache_dir") or None,
+                sink=RichSink(),
+            )
+        except ValueError as e:
+            console.print(f"[red]❌ {e}[/red]")
+            return False
+        
+        self._print_install_results(results)
+        return all(result["status"] == "ok" for result in results)
+
+    def install_pipeline(self, **overrides):
+        """An InstallPipeline that installs each project while it is still being generated; settings default to the install config"""
+        from generator.events import RichSink
+        from generator.pipeline import InstallPipeline
+
+        install_config = self.config_manager.get_install_config()
+        return InstallPipeline(
+            package_manager=overrides.get("package_manager") or install_config.get("package_manager", "auto"),
+            mode=overrides.get("mode") or install_config.get("mode", "auto"),
+            jobs=overrides.get("jobs") or install_config.get("jobs"),
+            registry=overrides.get("registry") or install_config.get("registry") or None,
+            cache_dir=overrides.get("cache_dir") or install_config.get("cache_dir") or None,
+            sink=RichSink(),
+        )
+
+    def finish_pipeline(self, pipeline) -> bool:
+        """Wait for a pipeline's installs and report them together with any generation failures"""
+        report = pipeline.join()
+        self._print_install_results(report["installs"], report["generation_failures"])
+        return report["ok"]
+
+    def _print_install_results(self, results: List[dict], generation_failures: List[dict] = ()) -> None:
+        table = self.ui.create_table("📦 Dependency Install", [
+            ("Project", "primary"),
+            ("Status", "secondary"),
+            ("Time", "secondary")
+        ])
+        for failure in generation_failures:
+            table.add_row(Path(failure["target"]).name, f"❌ generation: {failure['error']}", "")
+        for result in results:
+            if result["status"] == "ok":
+                status = "✅ ok"
+            elif result["status"] == "skipped":
+                status = f"⏭️  skipped: {result['error']}"
+            else:
+                status = f"❌ {result['error']}"
+            table.add_row(result["project"], status, f"{result['seconds']:.1f}s")
+        console.print(table)
     
     def open_project_in_editor(self, dir_name: str) -> None:
         """Open project in user's preferred code editor"""
@@ -158,12 +240,13 @@ class ProjectManager:
     def _open_with_editor(self, editor_cmd: str, project_path: Path, editor_name: str) -> None:
         """Open project with specified editor"""
         try:
-            if sys.platform == "darwin":  # macOS
-                subprocess.run(["open", "-a", editor_name, str(project_path)])
-            elif sys.platform == "win32":  # Windows
-                subprocess.run(["start", editor_cmd, str(project_path)], shell=True)
-            else:  # Linux
-                subprocess.run(["xdg-open", str(project_path)])
+            with trace.span("editor.open", editor=editor_cmd):
+                if sys.platform == "darwin":  # macOS
+                    subprocess.run(["open", "-a", editor_name, str(project_path)])
+                elif sys.platform == "win32":  # Windows
+                    subprocess.run(["start", editor_cmd, str(project_path)], shell=True)
+                else:  # Linux
+                    subprocess.run(["xdg-open", str(project_path)])
             
             console.print(f"[green]✅ Project opened in {editor_name}![/green]")
         except subprocess.CalledProcessError as e:
@@ -3,12 +3,10 @@ UI Helper module for consistent user interface operations.
 """
 
 from rich.console import Console
-from rich.prompt import IntPrompt
-from rich.panel import Panel
-from rich.table import Table
-from rich.align import Align
-from rich.text import Text
-from typing import List, Tuple
+from typing import List, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from rich.table import Table
 
 console = Console()
 
@@ -21,8 +19,9 @@ class UIHelper:
         self.ui_config = config_manager.get_ui_config()
         self.colors = self.ui_config.get('colors', {})
     
-    def create_table(self, title: str, columns: List[Tuple[str, str]]) -> Table:
+    def create_table(self, title: str, columns: List[Tuple[str, str]]) -> "Table":
         """Create a styled table with consistent formatting"""
+        from rich.table import Table
         table = Table(title=title, show_header=True, header_style=f"bold {self.colors.get('primary', 'cyan')}")
         
         for col_name, style in columns:
@@ -32,6 +31,7 @@ class UIHelper:
     
     def show_panel(self, title: str, content: str, style: str = "primary") -> None:
         """Display a styled panel"""
+        from rich.panel import Panel
         console.print(Panel.fit(
             f"[bold {self.colors.get(style, 'cyan')}]{title}[/bold {self.colors.get(style, 'cyan')}]\n{content}",
             border_style=self.colors.get(style, "cyan")
@@ -39,6 +39,7 @@ class UIHelper:
     
     def get_user_choice(self, prompt: str, max_choice: int, default: int = 1) -> int:
         """Get validated user choice from a numbered list"""
+        from rich.prompt import IntPrompt
         while True:
             try:
                 choice = IntPrompt.ask(prompt, default=default, show_default=True)
@@ -51,6 +52,9 @@ class UIHelper:
     
     def show_welcome(self) -> None:
         """Display welcome message"""
+        from rich.align import Align
+        from rich.panel import Panel
+        from rich.text import Text
         welcome_msg = self.ui_config.get('welcome_message', 'Welcome to AppGen!')
         subtitle = self.ui_config.get('welcome_subtitle', "Let's create your next project together.")
         
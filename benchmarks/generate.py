@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+"""
+Generation benchmark over every combination in appgen.config.yaml.
+
+Covers every framework, Next.js router x feature subset, Express database,
+Serverless language and preset. Each combination runs in a fresh interpreter:
+
+  cold_ms     import + template store open + first generate_project
+  warm_ms     median of --repeat further generations in the same process
+  files/bytes written by one generation
+  syscalls    read + write syscalls of one warm generation (Linux /proc/self/io)
+  peak_rss_kb peak resident set size of the worker process
+
+Results are written as JSON so runs can be compared across commits:
+
+    python benchmarks/generate.py --output bench.json
+    python benchmarks/generate.py --compare bench.json --max-regression 0.25
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+
+def _io_counters() -> Optional[Dict[str, int]]:
+    try:
+        with open("/proc/self/io") as f:
+            return {k: int(v) for k, v in (line.split(": ") for line in f)}
+    except OSError:
+        return None
+
+
+def _peak_rss_kb() -> Optional[int]:
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes elsewhere
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def run_worker(case: Dict[str, Any], repeat: int) -> Dict[str, Any]:
+    """Measure one combination inside this (fresh) process"""
+    start = time.perf_counter()
+    from generator.events import NullSink
+    from generator.generate import generate_project
+
+    components = case.get("components") or [{"framework": case["framework"], "features": case["features"], "directory": "."}]
+
+    def generate(root: str):
+        results = []
+        for component in components:
+            target = root if component["directory"] == "." else os.path.join(root, component["directory"])
+            results.append(generate_project(component["framework"], component["features"], target, sink=NullSink()))
+        return results
+
+    with tempfile.TemporaryDirectory(prefix="appgen-bench-") as scratch:
+        results = generate(os.path.join(scratch, "cold"))
+        cold_ms = (time.perf_counter() - start) * 1000
+
+        warm = []
+        syscalls = None
+        for i in range(repeat):
+            before = _io_counters()
+            t0 = time.perf_counter()
+            generate(os.path.join(scratch, f"warm-{i}"))
+            warm.append((time.perf_counter() - t0) * 1000)
+            after = _io_counters()
+            if before and after and syscalls is None:
+                syscalls = (after["syscr"] - before["syscr"]) + (after["syscw"] - before["syscw"])
+
+    return {
+        "ok": all(r.ok for r in results),
+        "cold_ms": round(cold_ms, 3),
+        "warm_ms": round(statistics.median(warm), 3) if warm else None,
+        "files": sum(len(r.files_written) for r in results),
+        "bytes": sum(r.bytes_written for r in results),
+        "syscalls": syscalls,
+        "peak_rss_kb": _peak_rss_kb(),
+    }
+
+
+def iter_cases() -> List[Dict[str, Any]]:
+    from appgen.config import get_config_manager
+    from appgen.presets import preset_components
+    from generator.combinations import iter_combinations
+
+    config = get_config_manager().config
+    cases = list(iter_combinations(config))
+    for name, info in (config.get("presets") or {}).items():
+        cases.append({"id": f"preset:{name}", "components": preset_components(info)})
+    return cases
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], max_regression: Optional[float]) -> int:
+    """Print per-combination warm time deltas; return 1 if any exceeds max_regression"""
+    regressions = []
+    for case_id, current in results["results"].items():
+        previous = baseline.get("results", {}).get(case_id)
+        if not previous or not previous.get("warm_ms") or not current.get("warm_ms"):
+            continue
+        change = (current["warm_ms"] - previous["warm_ms"]) / previous["warm_ms"]
+        marker = ""
+        if max_regression is not None and change > max_regression:
+            regressions.append(case_id)
+            marker = "  <-- regression"
+        print(f"{case_id:<48} {previous['warm_ms']:9.2f} -> {current['warm_ms']:9.2f} ms  {change:+7.1%}{marker}")
+    if regressions:
+        print(f"{len(regressions)} combinations regressed by more than {max_regression:.0%}")
+        return 1
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="Warm generations per combination")
+    parser.add_argument("--filter", default="", help="Only run combinations whose id contains this")
+    parser.add_argument("--output", default=None, help="Write results JSON here")
+    parser.add_argument("--compare", default=None, help="Baseline results JSON to compare against")
+    parser.add_argument("--max-regression", type=float, default=None, help="Fail if warm time grows by more than this fraction")
+    parser.add_argument("--worker", default=None, help=argparse.SUPPRESS)
+    opts = parser.parse_args()
+
+    if opts.worker:
+        print(json.dumps(run_worker(json.loads(opts.worker), opts.repeat)))
+        return 0
+
+    cases = [c for c in iter_cases() if opts.filter in c["id"]]
+    results: Dict[str, Any] = {
+        "meta": {
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.time(),
+            "repeat": opts.repeat,
+        },
+        "results": {},
+    }
+    print(f"{'combination':<48} {'cold ms':>9} {'warm ms':>9} {'files':>6} {'bytes':>10} {'syscalls':>9} {'rss kB':>8}")
+    for case in cases:
+        out = subprocess.run(
+            [sys.executable, __file__, "--worker", json.dumps(case), "--repeat", str(opts.repeat)],
+            cwd=REPO_ROOT, capture_output=True, text=True, check=True,
+        )
+        measured = json.loads(out.stdout.strip().splitlines()[-1])
+        results["results"][case["id"]] = measured
+        print(f"{case['id']:<48} {measured['cold_ms']:9.1f} {measured['warm_ms'] or 0:9.2f} {measured['files']:6d} "
+              f"{measured['bytes']:10d} {measured['syscalls'] if measured['syscalls'] is not None else '-':>9} "
+              f"{measured['peak_rss_kb'] or '-':>8}")
+
+    if opts.output:
+        Path(opts.output).write_text(json.dumps(results, indent=2))
+    if opts.compare:
+        return compare(results, json.loads(Path(opts.compare).read_text()), opts.max_regression)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+"""
+Startup latency benchmark for the appgen CLI.
+
+Runs `appgen --help` and `appgen list-frameworks` in fresh interpreters and
+reports wall time per command. Pass --max-ms to fail when the median of any
+command goes over budget, so import-time regressions are caught in CI.
+
+    python benchmarks/startup.py --runs 20 --max-ms 400
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+ENTRY_POINT = REPO_ROOT / "genapp.py"
+
+COMMANDS = {
+    "--help": ["--help"],
+    "list-frameworks": ["list-frameworks"],
+}
+
+
+def time_command(args: List[str], runs: int, warmup: int) -> List[float]:
+    """Run the CLI with `args` in a fresh interpreter and return wall times in ms"""
+    cmd = [sys.executable, str(ENTRY_POINT)] + args
+    timings = []
+    for i in range(warmup + runs):
+        start = time.perf_counter()
+        subprocess.run(cmd, cwd=REPO_ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        elapsed = (time.perf_counter() - start) * 1000
+        if i >= warmup:
+            timings.append(elapsed)
+    return timings
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10, help="Measured runs per command")
+    parser.add_argument("--warmup", type=int, default=2, help="Unmeasured runs to warm the page cache")
+    parser.add_argument("--max-ms", type=float, default=None, help="Fail if a command's median exceeds this")
+    parser.add_argument("--json", dest="json_path", default=None, help="Write results to this JSON file")
+    opts = parser.parse_args()
+
+    results: Dict[str, Dict[str, float]] = {}
+    for name, args in COMMANDS.items():
+        timings = time_command(args, opts.runs, opts.warmup)
+        results[name] = {
+            "min_ms": round(min(timings), 2),
+            "median_ms": round(statistics.median(timings), 2),
+            "max_ms": round(max(timings), 2),
+        }
+        print(f"appgen {name:<16} min {results[name]['min_ms']:8.1f} ms"
+              f"   median {results[name]['median_ms']:8.1f} ms")
+
+    if opts.json_path:
+        Path(opts.json_path).write_text(json.dumps(results, indent=2))
+
+    if opts.max_ms is not None:
+        over = [name for name, r in results.items() if r["median_ms"] > opts.max_ms]
+        if over:
+            print(f"Startup budget of {opts.max_ms} ms exceeded by: {', '.join(over)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,231 @@
+"""
+Generated projects written as a zip or tar stream instead of a directory.
+
+    from generator.archive import generate_archive
+    result = generate_archive("express", ["mongodb"], "api.zip", "zip")
+    result = generate_archive("nextjs", ["app"], "-", "tar")        # to stdout
+
+Entries are read straight from the template store, with template variables
+rendered in memory, and written to the output as they are produced. No project
+tree is written, and write_archive() only needs an object with write(), so the
+output can be a socket or a pipe. The archives are reproducible. Entries come
+out sorted by path, with a fixed timestamp (SOURCE_DATE_EPOCH when it is set),
+owner and mode (0644, or 0755 for executables). The same combination and
+variables therefore always give byte-identical archives, whether they go to a
+file or a pipe. Zip entries that are already compressed (JPEG, PNG, fonts,
+archives) are stored rather than deflated again.
+"""
+
+import gzip
+import json
+import os
+import stat
+import sys
+import tarfile
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .events import BufferedSink, RichSink
+from .generate import GenerationResult, load_combination, lockfile_output, package_json_bytes, rendered_bytes
+from .lockfile import LOCKFILE_NAME
+from .pack import STORED_SUFFIXES
+from .store import get_template_store
+from .variables import default_variables
+
+FORMATS = ("zip", "tar.gz", "tar")
+CONTENT_TYPES = {"zip": "application/zip", "tar.gz": "application/gzip", "tar": "application/x-tar"}
+# 1980-01-01, the earliest timestamp a zip entry can hold
+FIXED_MTIME = 315532800
+
+Entry = Tuple[str, int, int, Callable[[], Iterable[bytes]]]
+
+
+def archive_entries(combination: Dict, store=None, variables: Optional[Dict[str, str]] = None) -> List[Entry]:
+    """(path, mode, size, chunks) for every file a combination writes, sorted by path"""
+    store = store or get_template_store()
+    entries = []
+    for rel_path, key in combination["plan"].items():
+        mode = 0o755 if store.mode(key) & 0o111 else 0o644
+        if store.placeholders(key):
+            data = rendered_bytes(key, store, variables)
+            entries.append((rel_path, mode, len(data), lambda data=data: (data,)))
+        else:
+            entries.append((rel_path, mode, store.size(key), lambda key=key: store.chunks(key)))
+    generated = {"package.json": package_json_bytes(combination["package_json"], variables)}
+    if combination["lockfile"] is not None:
+        generated[LOCKFILE_NAME] = lockfile_output(combination, variables)
+    for rel_path, data in generated.items():
+        entries.append((rel_path, 0o644, len(data), lambda data=data: (data,)))
+    return sorted(entries, key=lambda entry: entry[0])
+
+
+def archive_mtime() -> int:
+    """Timestamp of every entry: SOURCE_DATE_EPOCH if set, never before 1980 (zip can't go earlier)"""
+    try:
+        return max(FIXED_MTIME, int(os.environ["SOURCE_DATE_EPOCH"]))
+    except (KeyError, ValueError):
+        return FIXED_MTIME
+
+
+class _Output:
+    """Write-only view of a stream that counts bytes.
+
+    Hiding tell() and seek() makes zipfile write the same bytes whether the
+    output is a regular file, a pipe or a socket.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.written = 0
+
+    def write(self, data: bytes) -> int:
+        self.stream.write(data)
+        self.written += len(data)
+        return len(data)
+
+    def flush(self) -> None:
+        self.stream.flush()
+
+
+class _ChunkReader:
+    """read() over an iterator of byte chunks, as tarfile.addfile expects"""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks: Iterator[bytes] = iter(chunks)
+        self._buffer = b""
+
+    def read(self, size: int = -1) -> bytes:
+        while size < 0 or len(self._buffer) < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buffer += chunk
+        if size < 0:
+            size = len(self._buffer)
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+def _write_zip(entries: List[Entry], out) -> None:
+    date_time = time.gmtime(archive_mtime())[:6]
+    with zipfile.ZipFile(out, "w") as archive:
+        for rel_path, mode, size, chunks in entries:
+            info = zipfile.ZipInfo(rel_path, date_time=date_time)
+            info.create_system = 3
+            info.external_attr = (stat.S_IFREG | mode) << 16
+            stored = Path(rel_path).suffix.lower() in STORED_SUFFIXES
+            info.compress_type = zipfile.ZIP_STORED if stored else zipfile.ZIP_DEFLATED
+            info.file_size = size
+            with archive.open(info, "w") as f:
+                for chunk in chunks():
+                    f.write(chunk)
+
+
+def _write_tar(entries: List[Entry], out) -> None:
+    mtime = archive_mtime()
+    with tarfile.open(fileobj=out, mode="w|", format=tarfile.PAX_FORMAT) as archive:
+        for rel_path, mode, size, chunks in entries:
+            info = tarfile.TarInfo(rel_path)
+            info.size = size
+            info.mode = mode
+            info.mtime = mtime
+            archive.addfile(info, _ChunkReader(chunks()))
+
+
+def _write(entries: List[Entry], fmt: str, out) -> int:
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown archive format '{fmt}'. Valid options: {', '.join(FORMATS)}")
+    output = _Output(out)
+    if fmt == "zip":
+        _write_zip(entries, output)
+    elif fmt == "tar":
+        _write_tar(entries, output)
+    else:
+        # GzipFile rather than tarfile's "w|gz", whose gzip header carries the current time
+        with gzip.GzipFile(filename="", mode="wb", fileobj=output, mtime=0) as compressed:
+            _write_tar(entries, compressed)
+    output.flush()
+    return output.written
+
+
+def write_archive(combination: Dict, fmt: str, out, store=None, variables: Optional[Dict[str, str]] = None) -> int:
+    """Write a combination's files to `out` as a `fmt` archive; return the archive size in bytes"""
+    return _write(archive_entries(combination, store, variables), fmt, out)
+
+
+def archive_stem(output: str) -> str:
+    """An archive's file name without its archive suffix: "out/api.tar.gz" -> "api" """
+    name = Path(output).name
+    for suffix in (".zip", ".tar.gz", ".tgz", ".tar"):
+        if name.lower().endswith(suffix):
+            return name[:-len(suffix)]
+    return name
+
+
+def generate_archive(
+    framework: str,
+    features: List[str],
+    output: str,
+    fmt: str,
+    sink=None,
+    variables: Optional[Dict[str, str]] = None,
+) -> GenerationResult:
+    """Generate a project straight into a `fmt` archive at `output` ('-' for stdout).
+
+    Works like generate_project without the directory. project_name defaults to
+    the archive's file name, or to "<framework>-app" on stdout. The file appears
+    only once it is complete.
+    """
+    sink = sink if sink is not None else RichSink()
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown archive format '{fmt}'. Valid options: {', '.join(FORMATS)}")
+    started = time.perf_counter()
+    result = GenerationResult(framework=framework, features=list(features), target_path=Path(output))
+    variables = default_variables(Path(archive_stem(output) if output != "-" else f"{framework}-app"), variables)
+    sink.emit("start", framework=framework, features=features, target=output)
+
+    store = get_template_store()
+    events = BufferedSink()
+    combination = load_combination(framework, features, store, events)
+    events.replay(sink)
+    invalid = [data["message"] for kind, data in events.events if kind == "invalid"]
+    result.durations["plan"] = time.perf_counter() - started
+    if combination is None:
+        result.error = invalid[0] if invalid else "Invalid framework/feature combination"
+        result.durations["total"] = time.perf_counter() - started
+        sink.emit("done", framework=framework, target=output, result=result)
+        return result
+
+    entries = archive_entries(combination, store, variables)
+    result.conflicts_resolved = [(data["path"], data["shadowed_by"]) for kind, data in events.events if kind == "conflict"]
+    result.package_json = json.loads(package_json_bytes(combination["package_json"], variables))
+    result.lockfile_error = combination["lockfile_error"]
+    sink.emit("planned", files=len(entries), bytes=sum(entry[2] for entry in entries))
+    mark = time.perf_counter()
+    if output == "-":
+        size = _write(entries, fmt, sys.stdout.buffer)
+    else:
+        target = Path(output)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=target.parent, prefix=f".{target.name}.")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                size = _write(entries, fmt, f)
+            os.chmod(tmp, 0o644)
+            os.replace(tmp, target)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+    now = time.perf_counter()
+    result.durations["write"] = now - mark
+    result.durations["total"] = now - started
+    result.ok = True
+    result.files_written = [entry[0] for entry in entries]
+    result.bytes_written = sum(entry[2] for entry in entries)
+    result.strategies = {"archive": len(entries)}
+    sink.emit("archived", target=output, format=fmt, files=len(entries), bytes=result.bytes_written, size=size)
+    sink.emit("done", framework=framework, target=output, result=result)
+    return result
@@ -0,0 +1,108 @@
+"""
+Generate many projects in one go across a process pool.
+
+    from generator.batch import generate_batch
+    summary = generate_batch([
+        {"framework": "nextjs", "features": ["app", "typescript"], "dir": "out/next"},
+        {"framework": "express", "db": "mongodb", "dir": "out/api"},
+    ], workers=4)
+
+Each entry names a framework, its features and an output dir. The `router`
+(Next.js), `db` (Express) and `language` (Serverless) keys are accepted as
+shorthands and placed first in the feature list, as `appgen create` does.
+An optional `variables` mapping fills the templates' placeholders.
+The template store is opened in the parent before the pool starts, so forked
+workers share its index instead of each re-reading it.
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from .events import NullSink
+from .generate import generate_project
+from .store import get_template_store, set_template_configuration, template_configuration
+
+
+def entry_features(entry: Dict[str, Any]) -> List[str]:
+    """An entry's features as a list, with the router/db/language shorthands placed first"""
+    features = entry.get("features") or []
+    if isinstance(features, str):
+        features = [f.strip() for f in features.split(",") if f.strip()]
+    features = [str(f).lower() for f in features]
+    for shorthand in ("router", "db", "language"):
+        if entry.get(shorthand):
+            features = [str(entry[shorthand]).lower()] + features
+    return features
+
+
+def normalize_entry(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """Turn a manifest entry into {framework, features, dir, variables}"""
+    if not entry.get("framework") or not entry.get("dir"):
+        raise ValueError(f"Batch entries need 'framework' and 'dir': {entry}")
+    variables = {str(name): str(value) for name, value in (entry.get("variables") or {}).items()}
+    return {"framework": str(entry["framework"]).lower(), "features": entry_features(entry), "dir": str(entry["dir"]),
+            "variables": variables}
+
+
+def _init_worker(configured) -> None:
+    # Under spawn the parent's store and template sources are not inherited; open them once per worker
+    set_template_configuration(configured)
+    get_template_store()
+
+
+def _generate_entry(entry: Dict[str, Any], options: Dict[str, Any]) -> Dict[str, Any]:
+    result = dict(entry)
+    start = time.perf_counter()
+    try:
+        generated = generate_project(entry["framework"], entry["features"], entry["dir"], sink=NullSink(),
+                                     variables=entry["variables"], **options)
+        result["status"] = "ok" if generated.ok else "failed"
+        result["error"] = generated.error
+        result["files"] = len(generated.files_written)
+        result["bytes"] = generated.bytes_written
+        result["from_cache"] = generated.from_cache
+        result["durations"] = {k: round(v, 4) for k, v in generated.durations.items()}
+    except Exception as e:
+        result["status"] = "failed"
+        result["error"] = str(e)
+        result["files"] = 0
+        result["bytes"] = 0
+    result["seconds"] = round(time.perf_counter() - start, 4)
+    result["pid"] = os.getpid()
+    return result
+
+
+def generate_batch(
+    entries: List[Dict[str, Any]],
+    workers: Optional[int] = None,
+    **generate_options: Any,
+) -> Dict[str, Any]:
+    """Generate every entry across a process pool and return a machine-readable summary.
+
+    `generate_options` (copy_mode, jobs, cache) are passed to each generate_project call.
+    """
+    projects = [normalize_entry(e) for e in entries]
+    dirs = [os.path.abspath(p["dir"]) for p in projects]
+    if len(set(dirs)) != len(dirs):
+        raise ValueError("Batch entries must use distinct directories")
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(projects) or 1))
+    # Load the template index before forking so workers share it
+    get_template_store()
+    start = time.perf_counter()
+    if workers == 1:
+        results = [_generate_entry(p, generate_options) for p in projects]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(template_configuration(),)) as pool:
+            futures = [pool.submit(_generate_entry, p, generate_options) for p in projects]
+            results = [f.result() for f in futures]
+    return {
+        "workers": workers,
+        "seconds": round(time.perf_counter() - start, 4),
+        "ok": sum(1 for r in results if r["status"] == "ok"),
+        "failed": sum(1 for r in results if r["status"] != "ok"),
+        "projects": results,
+    }
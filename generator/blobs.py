@@ -0,0 +1,72 @@
+"""
+Machine-local cache of template blobs, addressed by sha256.
+
+Packed templates are extracted into the cache once per content hash; every
+project generated afterwards gets its files from there through the copy
+engine, so reflinks share storage across projects. A blob is checked against
+its hash before it is first used in a process, and again whenever it changes
+on disk, so a damaged blob is rewritten rather than copied into projects.
+"""
+
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+
+def default_cache_dir() -> Path:
+    """Root of appgen's on-disk caches: $APPGEN_CACHE_DIR, else $XDG_CACHE_HOME/appgen, else ~/.cache/appgen"""
+    if os.environ.get("APPGEN_CACHE_DIR"):
+        return Path(os.environ["APPGEN_CACHE_DIR"])
+    xdg = os.environ.get("XDG_CACHE_HOME")
+    base = Path(xdg) if xdg else Path.home() / ".cache"
+    return base / "appgen"
+
+
+class BlobCache:
+    """Directory of content-addressed blobs laid out as <root>/<aa>/<sha256>"""
+
+    def __init__(self, root: Optional[Path] = None):
+        self.root = Path(root) if root else default_cache_dir() / "blobs"
+        # digest -> (mtime, size, inode) of the blob when its content was last verified
+        self._verified: Dict[str, Tuple[int, int, int]] = {}
+
+    def path(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest
+
+    def ensure(self, digest: str, size: int, read: Callable[[], bytes]) -> Path:
+        """Return the cached blob for `digest`, writing it from `read()` if it is missing or damaged"""
+        blob = self.path(digest)
+        try:
+            st = blob.stat()
+        except FileNotFoundError:
+            st = None
+        if st is not None and st.st_size == size:
+            signature = (st.st_mtime_ns, st.st_size, st.st_ino)
+            if self._verified.get(digest) == signature or self._matches(blob, digest):
+                self._verified[digest] = signature
+                return blob
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        # Write under a temporary name so concurrent generators never see a partial blob
+        fd, tmp = tempfile.mkstemp(dir=blob.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(read())
+            os.chmod(tmp, 0o644)
+            os.replace(tmp, blob)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+        st = blob.stat()
+        self._verified[digest] = (st.st_mtime_ns, st.st_size, st.st_ino)
+        return blob
+
+    @staticmethod
+    def _matches(blob: Path, digest: str) -> bool:
+        h = hashlib.sha256()
+        with open(blob, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                h.update(chunk)
+        return h.hexdigest() == digest
@@ -0,0 +1,56 @@
+"""
+Enumerate every valid framework/feature combination described by the config.
+
+Takes the parsed appgen.config.yaml as a plain dict so the generator does not
+depend on the CLI package.
+"""
+
+from itertools import combinations as _subsets
+from typing import Any, Dict, Iterable, Iterator, List, Set
+
+
+def combination_id(framework: str, features: List[str]) -> str:
+    """Stable identifier such as 'nextjs:app+typescript+tailwind' or 'flask'"""
+    return f"{framework}:{'+'.join(features)}" if features else framework
+
+
+def _feature_subsets(features: List[str]) -> Iterator[List[str]]:
+    """Every subset of `features`, keeping config order, smallest first"""
+    for size in range(len(features) + 1):
+        for subset in _subsets(features, size):
+            yield list(subset)
+
+
+def iter_combinations(config: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Yield {id, framework, features} for every framework/feature combination in the config.
+
+    Next.js routers and Express databases and Serverless languages come first
+    in the feature list, as generate_project expects.
+    """
+    frameworks = config.get("frameworks", {})
+    for group in ("interactive", "simple"):
+        for framework, spec in (frameworks.get(group) or {}).items():
+            spec = spec or {}
+            if spec.get("routers"):
+                for router in spec["routers"]:
+                    for subset in _feature_subsets(spec.get("features", [])):
+                        features = [router] + subset
+                        yield {"id": combination_id(framework, features), "framework": framework, "features": features}
+            elif spec.get("databases"):
+                for db in spec["databases"]:
+                    features = [] if db == "none" else [db]
+                    yield {"id": combination_id(framework, features), "framework": framework, "features": features}
+            elif spec.get("languages"):
+                for language in spec["languages"]:
+                    yield {"id": combination_id(framework, [language]), "framework": framework, "features": [language]}
+            else:
+                for subset in _feature_subsets(spec.get("features", [])):
+                    yield {"id": combination_id(framework, subset), "framework": framework, "features": subset}
+
+
+def feature_catalog(combinations: Iterable[Dict[str, Any]]) -> Dict[str, Set[str]]:
+    """framework -> every feature name its combinations use, from iter_combinations-style dicts"""
+    catalog: Dict[str, Set[str]] = {}
+    for combination in combinations:
+        catalog.setdefault(combination["framework"], set()).update(combination["features"])
+    return catalog
@@ -0,0 +1,130 @@
+"""
+File materialization strategies for template copies.
+
+Each mode names the first strategy to try; anything the filesystem does not
+support falls through to the next one, ending with a plain byte copy:
+
+    hardlink -> reflink -> copy_file_range -> sendfile -> copy
+
+`hardlink` is opt-in only: the generated file shares its inode with the
+template, so it is meant for read-only scratch generations. Copies out of a
+shared cache go through detached_mode(), so they never link to the cache.
+"""
+
+import errno
+import os
+import shutil
+import sys
+from pathlib import Path
+
+COPY_MODES = ("auto", "reflink", "copy_file_range", "hardlink", "copy")
+
+# ioctl(dest_fd, FICLONE, src_fd) from linux/fs.h
+FICLONE = 0x40049409
+
+# Errors meaning "this strategy is not available here", as opposed to real I/O failures
+_FALLBACK_ERRNOS = {
+    errno.EXDEV, errno.EINVAL, errno.ENOSYS, errno.ENOTTY, errno.EOPNOTSUPP,
+    getattr(errno, "ENOTSUP", errno.EOPNOTSUPP), errno.EPERM, errno.EMLINK, errno.EBADF,
+}
+
+# (strategy, src device, dest device) combinations that already failed once
+_unsupported = set()
+
+
+def _reflink(src: Path, dest: Path) -> None:
+    import fcntl
+    with open(src, "rb") as fsrc, open(dest, "wb") as fdst:
+        fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+
+
+def _copy_file_range(src: Path, dest: Path) -> None:
+    with open(src, "rb") as fsrc, open(dest, "wb") as fdst:
+        remaining = os.fstat(fsrc.fileno()).st_size
+        while remaining > 0:
+            copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+            if copied == 0:
+                break
+            remaining -= copied
+
+
+def _sendfile(src: Path, dest: Path) -> None:
+    with open(src, "rb") as fsrc, open(dest, "wb") as fdst:
+        offset = 0
+        size = os.fstat(fsrc.fileno()).st_size
+        while offset < size:
+            sent = os.sendfile(fdst.fileno(), fsrc.fileno(), offset, size - offset)
+            if sent == 0:
+                break
+            offset += sent
+
+
+def _hardlink(src: Path, dest: Path) -> None:
+    os.link(src, dest)
+
+
+def _copy(src: Path, dest: Path) -> None:
+    shutil.copyfile(src, dest)
+
+
+_STRATEGIES = {
+    "hardlink": _hardlink,
+    "reflink": _reflink,
+    "copy_file_range": _copy_file_range,
+    "sendfile": _sendfile,
+    "copy": _copy,
+}
+
+_CHAIN = ["hardlink", "reflink", "copy_file_range", "sendfile", "copy"]
+
+
+def _is_available(strategy: str) -> bool:
+    if strategy in ("reflink", "sendfile"):
+        # FICLONE and file-to-file sendfile are Linux-only
+        return sys.platform.startswith("linux")
+    if strategy == "copy_file_range":
+        return hasattr(os, "copy_file_range")
+    return True
+
+
+def strategies_for(mode: str) -> list[str]:
+    """Return the strategies tried, in order, for a --copy-mode value"""
+    if mode not in COPY_MODES:
+        raise ValueError(f"Unknown copy mode '{mode}'. Valid options: {', '.join(COPY_MODES)}")
+    if mode == "auto":
+        mode = "reflink"
+    chain = _CHAIN[_CHAIN.index(mode):]
+    return [s for s in chain if _is_available(s)]
+
+
+def unlink_existing(dest: Path) -> None:
+    """Remove `dest` before it is rewritten; writing through it would change every file it is hardlinked to"""
+    if dest.exists() or dest.is_symlink():
+        dest.unlink()
+
+
+def detached_mode(mode: str) -> str:
+    """`mode` for copies that must not share an inode with their source, such as shared cache entries"""
+    return "reflink" if mode == "hardlink" else mode
+
+
+def copy_file(src: Path, dest: Path, mode: str = "auto") -> str:
+    """Copy `src` to `dest` using the cheapest strategy `mode` allows; return the strategy used"""
+    src_dev = os.stat(src).st_dev
+    dest_dev = os.stat(dest.parent).st_dev
+    # A previous hardlink generation may have left `dest` sharing the template's inode
+    unlink_existing(dest)
+    for strategy in strategies_for(mode):
+        if strategy != "copy" and (strategy, src_dev, dest_dev) in _unsupported:
+            continue
+        try:
+            _STRATEGIES[strategy](src, dest)
+        except OSError as e:
+            if strategy == "copy" or e.errno not in _FALLBACK_ERRNOS:
+                raise
+            _unsupported.add((strategy, src_dev, dest_dev))
+            continue
+        if strategy != "hardlink":
+            shutil.copystat(src, dest)
+        return strategy
+    raise OSError(f"No copy strategy succeeded for {src}")
@@ -0,0 +1,198 @@
+"""
+Event sinks for generate_project.
+
+Generation reports what it does as events, `sink.emit(kind, **data)`, instead
+of printing. The CLI renders them with RichSink, or with ProgressSink for a
+live progress bar; library callers pass NullSink for silent high-throughput
+use, or BufferedSink to inspect or replay them later. "planned" announces the
+file and byte totals before the copy starts. Per-file events ("file_written",
+"file_failed") are emitted from copy worker threads, so sinks must tolerate
+concurrent emit() calls.
+"""
+
+import threading
+import time
+from typing import Any, List, Tuple
+
+from rich import get_console, print
+from rich.markup import escape
+
+
+class NullSink:
+    """Discards every event"""
+
+    def emit(self, kind: str, **data: Any) -> None:
+        pass
+
+
+class BufferedSink:
+    """Keeps every event in memory, in emission order"""
+
+    def __init__(self):
+        self.events: List[Tuple[str, dict]] = []
+        self._lock = threading.Lock()
+
+    def emit(self, kind: str, **data: Any) -> None:
+        with self._lock:
+            self.events.append((kind, data))
+
+    def replay(self, sink) -> None:
+        """Send the buffered events on to another sink"""
+        for kind, data in self.events:
+            sink.emit(kind, **data)
+
+
+class RichSink:
+    """Renders generation events to the terminal the way the CLI always has"""
+
+    def emit(self, kind: str, **data: Any) -> None:
+        render = getattr(self, f"_on_{kind}", None)
+        if render is not None:
+            render(**data)
+
+    def _on_start(self, framework: str, features: List[str], target: str, **_: Any) -> None:
+        print(f"\n[bold cyan]🚀 Generating '{framework}' project...[bold cyan]")
+        print(f"[blue]📁 Output directory:[/blue] {target}")
+        print(f"[magenta]🧩 Features:[/magenta] {features if features else 'None'}")
+
+    def _on_invalid(self, message: str, **_: Any) -> None:
+        print(f"[red]❌ {message}[red]")
+
+    def _on_info(self, message: str, **_: Any) -> None:
+        print(f"[green]✅ {message}[green]")
+
+    def _on_overlay_missing(self, overlay: str, **_: Any) -> None:
+        print(f"[yellow]⚠️  Skipping missing template: {overlay}[/yellow]")
+
+    def _on_conflict(self, path: str, shadowed_by: str, **_: Any) -> None:
+        print(f"[yellow]🧹 Skipping {path} because {shadowed_by} exists[/yellow]")
+
+    def _on_copied(self, count: int, total: int, overlays: List[str], strategies: dict, errors: dict, **_: Any) -> None:
+        print(f"[green]✅ Copied {count} files from:[/green] {', '.join(o.rsplit('/', 1)[-1] for o in overlays)}")
+        if errors:
+            print(f"[red]❌ Failed to copy {len(errors)} of {total} files:[/red]")
+            for rel_path in sorted(errors):
+                print(f"[red]   {rel_path}: {errors[rel_path]}[/red]")
+        if strategies:
+            print(f"[dim]📎 Copy strategies: {_format_counts(strategies)}[/dim]")
+
+    def _on_cache_hit(self, count: int, strategies: dict, **_: Any) -> None:
+        print(f"[green]♻️  Restored {count} files from cache[/green] [dim]({_format_counts(strategies)})[/dim]")
+
+    def _on_cache_error(self, error: str, **_: Any) -> None:
+        print(f"[yellow]⚠️  Could not cache generated project: {error}[/yellow]")
+
+    def _on_package_json(self, **_: Any) -> None:
+        print("[green]📦 Final package.json written[/green]")
+
+    def _on_lockfile(self, packages: int, **_: Any) -> None:
+        print(f"[green]🔒 package-lock.json synthesized ({packages} packages)[/green]")
+
+    def _on_lockfile_skipped(self, reason: str, **_: Any) -> None:
+        print(f"[yellow]⚠️  No lockfile written: {escape(reason)}[/yellow]")
+
+    def _on_archived(self, target: str, files: int, bytes: int, size: int, **_: Any) -> None:
+        print(f"[green]📦 Archived {files} files ({bytes} bytes) into {target} ({size} bytes)[/green]")
+
+    def _on_done(self, framework: str, target: str, result=None, **_: Any) -> None:
+        if result is not None and not result.ok:
+            print(f"[red]❌ Project '{framework}' was not generated at {escape(target)}[/red]")
+            return
+        print(f"\n[bold green]🎉 Project '{framework}' created successfully at {target}![bold green]")
+
+    def _on_install_plan(self, package_manager: str, mode: str, cache_dir: str, projects: List[str], jobs: int, **_: Any) -> None:
+        print(f"\n[cyan]📦 Installing dependencies for {len(projects)} project(s) with {package_manager} "
+              f"({mode}, {jobs} at a time)[/cyan]")
+        print(f"[dim]   Shared package cache: {cache_dir}[/dim]")
+
+    def _on_install_start(self, project: str, command: str, **_: Any) -> None:
+        print(f"[cyan]▶ {_tag(project)} {escape(command)}[/cyan]")
+
+    def _on_install_output(self, project: str, line: str, **_: Any) -> None:
+        if line.strip():
+            print(f"[dim]{_tag(project)}[/dim] {escape(line)}")
+
+    def _on_install_done(self, project: str, status: str, seconds: float, error: str = None, **_: Any) -> None:
+        if status == "ok":
+            print(f"[green]✅ {_tag(project)} dependencies installed in {seconds:.1f}s[/green]")
+        else:
+            print(f"[red]❌ {_tag(project)} install failed after {seconds:.1f}s: {escape(str(error))}[/red]")
+
+
+class ProgressSink(RichSink):
+    """RichSink plus a progress bar over the planned bytes, with file count, throughput and ETA.
+
+    Copy workers only add to counters; the bar is updated at most every
+    `interval` seconds and drawn by Rich's refresh thread. Off a terminal no
+    bar is shown and per-file events are dropped immediately.
+    """
+
+    def __init__(self, console=None, interval: float = 0.1):
+        self.console = console or get_console()
+        self.interval = interval
+        self.enabled = self.console.is_terminal
+        self._progress = None
+        self._task = None
+        self._lock = threading.Lock()
+        self._files = 0
+        self._bytes = 0
+        self._pushed = 0.0
+
+    def emit(self, kind: str, **data: Any) -> None:
+        if kind in ("file_written", "file_failed"):
+            if self._progress is not None:
+                self._advance(data.get("size", 0))
+            return
+        super().emit(kind, **data)
+
+    def _on_planned(self, files: int, bytes: int, **_: Any) -> None:
+        from rich.progress import (BarColumn, DownloadColumn, Progress, SpinnerColumn, TextColumn,
+                                   TimeRemainingColumn, TransferSpeedColumn)
+
+        if not self.enabled or not files:
+            return
+        self._files = self._bytes = 0
+        self._progress = Progress(
+            SpinnerColumn(),
+            TextColumn("[progress.description]{task.description}"),
+            BarColumn(),
+            TextColumn("{task.fields[files]}/{task.fields[total_files]} files"),
+            DownloadColumn(),
+            TransferSpeedColumn(),
+            TimeRemainingColumn(),
+            console=self.console,
+            transient=True,
+        )
+        self._task = self._progress.add_task("Writing files", total=bytes, files=0, total_files=files)
+        self._progress.start()
+
+    def _advance(self, size: int) -> None:
+        with self._lock:
+            self._files += 1
+            self._bytes += size
+            now = time.monotonic()
+            if now - self._pushed >= self.interval:
+                self._pushed = now
+                self._progress.update(self._task, completed=self._bytes, files=self._files)
+
+    def _stop(self) -> None:
+        if self._progress is not None:
+            self._progress.update(self._task, completed=self._bytes, files=self._files)
+            self._progress.stop()
+            self._progress = None
+
+    def _on_copied(self, **data: Any) -> None:
+        self._stop()
+        super()._on_copied(**data)
+
+    def _on_done(self, **data: Any) -> None:
+        self._stop()
+        super()._on_done(**data)
+
+
+def _tag(project: str) -> str:
+    return escape(f"[{project}]")
+
+
+def _format_counts(counts: dict) -> str:
+    return ", ".join(f"{name} × {count}" for name, count in sorted(counts.items(), key=lambda kv: -kv[1]))
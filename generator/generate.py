@@ -1,40 +1,158 @@
-import shutil
 import json
+import time
+import zlib
 from pathlib import Path
-from rich import print
-import os
-
-TEMPLATE_DIR = Path(__file__).parent.parent / "templates"
-
-def copy_template(src: Path, dest: Path):
-    if not src.exists():
-        print(f"[yellow]⚠️  Skipping missing template: {src}[/yellow]")
-        return
-    try:
-        shutil.copytree(src, dest, dirs_exist_ok=True)
-        print(f"[green]✅ Copied:[/green] {src.name}")
-    except Exception as e:
-        print(f"[red]❌ Failed to copy {src}: {e}[/red]")
-
-def remove_conflicts(target_path: Path, features: list[str]):
-    # Remove .js if .ts or .tsx exists, and .jsx if .tsx exists, recursively
-    for dirpath, _, filenames in os.walk(target_path):
-        files = set(filenames)
-        for fname in filenames:
-            # Remove .js if .ts or .tsx exists
-            if fname.endswith('.ts') or fname.endswith('.tsx'):
-                js_equiv = fname.rsplit('.', 1)[0] + '.js'
-                if js_equiv in files:
-                    js_path = Path(dirpath) / js_equiv
-                    print(f"[yellow]🧹 Removing {js_path} because {fname} exists[/yellow]")
-                    js_path.unlink()
-            # Remove .jsx if .tsx exists
-            if fname.endswith('.tsx'):
-                jsx_equiv = fname[:-4] + '.jsx'
-                if jsx_equiv in files:
-                    jsx_path = Path(dirpath) / jsx_equiv
-                    print(f"[yellow]🧹 Removing {jsx_path} because {fname} exists[/yellow]")
-                    jsx_path.unlink()
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+from . import trace
+from .events import NullSink, RichSink
+from .lockfile import FRAGMENT_NAME, LOCKFILE_NAME, LockfileConflict, load_fragments, lockfile_bytes, synthesize_lockfile, write_lockfile
+from .manifest import build_manifest, sha256_bytes, write_manifest
+from .result_cache import ResultCache, appgen_version
+from .store import get_template_store, load_template_json
+from .variables import default_variables, json_string, render, render_chunks
+
+
+@dataclass
+class GenerationResult:
+    """What a generate_project call did"""
+    framework: str
+    features: List[str]
+    target_path: Path
+    ok: bool = False
+    error: Optional[str] = None
+    files_written: List[str] = field(default_factory=list)
+    bytes_written: int = 0
+    conflicts_resolved: List[Tuple[str, str]] = field(default_factory=list)
+    package_json: Dict[str, Any] = field(default_factory=dict)
+    strategies: Dict[str, int] = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)
+    from_cache: bool = False
+    lockfile_error: Optional[str] = None
+    durations: Dict[str, float] = field(default_factory=dict)
+
+
+def resolve_overlays(framework: str, features: list[str], store=None, sink=None):
+    """Return the template directory keys for a combination, base first, or None if invalid"""
+    store = store or get_template_store()
+    sink = sink or NullSink()
+    if framework == "nextjs":
+        if not features:
+            sink.emit("invalid", message="For Next.js, you must specify a router type as the first feature: 'app' or 'pages'.")
+            return None
+        router = features[0]
+        if router not in ("app", "pages"):
+            sink.emit("invalid", message=f"Invalid router type '{router}'. Must be 'app' or 'pages'.")
+            return None
+        # Base (app or pages), then features (app-typescript, app-tailwind, etc.)
+        overlays = [f"{framework}/{router}"]
+        overlays += [f"{framework}/{router}-{feature}" for feature in features[1:]]
+    elif framework == "express":
+        # Handle Express with database selection
+        if features and features[0] in ["mongodb", "postgresql", "supabase"]:
+            overlays = [f"{framework}/{features[0]}"]
+            sink.emit("info", message=f"Using {features[0]} database template")
+        else:
+            overlays = [f"{framework}/base"]
+            sink.emit("info", message="Using base Express template (no database)")
+    elif framework == "serverless":
+        # Use language as subfolder
+        valid_languages = ["javascript", "typescript", "python", "go"]
+        if not features or features[0] not in valid_languages:
+            sink.emit("invalid", message=f"For Serverless, you must specify a valid language: {', '.join(valid_languages)}.")
+            return None
+        lang = features[0]
+        overlays = [f"{framework}/{lang}"]
+        sink.emit("info", message=f"Using {lang} serverless template")
+    else:
+        overlays = [f"{framework}/base"]
+        overlays += [f"{framework}/{feature}" for feature in features]
+
+    existing = []
+    for overlay in overlays:
+        if store.has_dir(overlay):
+            existing.append(overlay)
+        else:
+            sink.emit("overlay_missing", overlay=overlay)
+    return existing
+
+def resolve_conflicts(plan: dict[str, str]):
+    """Drop .js files shadowed by .ts/.tsx and .jsx files shadowed by .tsx; return what was dropped"""
+    dropped = []
+    for rel_path in sorted(plan):
+        stem, _, ext = rel_path.rpartition(".")
+        if ext == "ts" or ext == "tsx":
+            shadowed = [f"{stem}.js", f"{stem}.jsx"] if ext == "tsx" else [f"{stem}.js"]
+            for js_path in shadowed:
+                if plan.pop(js_path, None) is not None:
+                    dropped.append((js_path, rel_path))
+    return dropped
+
+def plan_files(overlays: list[str], store=None, sink=None) -> dict[str, str]:
+    """Map each output path (relative, posix) to the template key that ends up there.
+
+    Later overlays win over earlier ones, TypeScript files shadow their JS twins,
+    and the root package.json and lockfile fragments are left to the merge steps.
+    """
+    store = store or get_template_store()
+    sink = sink or NullSink()
+    plan = {}
+    for overlay in overlays:
+        with trace.span("plan.overlay", overlay=overlay):
+            for rel_path, key in store.walk(overlay):
+                plan[rel_path] = key
+    with trace.span("plan.resolve_conflicts"):
+        dropped = resolve_conflicts(plan)
+    for js_path, ts_path in dropped:
+        sink.emit("conflict", path=js_path, shadowed_by=ts_path)
+    plan.pop("package.json", None)
+    plan.pop(FRAGMENT_NAME, None)
+    return plan
+
+def write_plan(plan: dict[str, str], target_path: Path, copy_mode: str = "auto", jobs: int = 1, store=None, sink=None,
+               variables: Optional[Dict[str, str]] = None):
+    """Write every planned file once, fanning the copies out over `jobs` threads.
+
+    Directories are created up front, so workers only ever write files.
+    Files with template variables are rendered from `variables` as they are
+    written ("render" strategy); everything else is materialized as is.
+    Returns the per-file errors and the copy strategy used for each written file.
+    """
+    store = store or get_template_store()
+    sink = sink or NullSink()
+    variables = variables or {}
+    errors = {}
+    strategies = {}
+    for rel_dir in sorted({Path(rel_path).parent for rel_path in plan}):
+        (target_path / rel_dir).mkdir(parents=True, exist_ok=True)
+
+    def copy_one(rel_path: str) -> None:
+        key = plan[rel_path]
+        dest = target_path / rel_path
+        try:
+            with trace.span("write.file", key=key):
+                if store.placeholders(key):
+                    strategy = store.render(key, dest, variables)
+                else:
+                    strategy = store.materialize(key, dest, copy_mode)
+        except (OSError, ValueError, zlib.error) as e:
+            # A damaged pack blob (zlib.error) or a bad entry (ValueError) fails that file only, like an I/O error
+            errors[rel_path] = e
+            sink.emit("file_failed", path=rel_path, error=str(e))
+            return
+        strategies[rel_path] = strategy
+        size = dest.stat().st_size if strategy == "render" else store.size(key)
+        sink.emit("file_written", path=rel_path, size=size, strategy=strategy)
+
+    if jobs > 1 and len(plan) > 1:
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            list(pool.map(copy_one, plan))
+    else:
+        for rel_path in plan:
+            copy_one(rel_path)
+    return errors, strategies
 
 def load_json(path: Path):
     if path.exists():
@@ -50,93 +168,241 @@ def merge_dicts(base, extra):
             base[key] = merge_dicts(base[key], value)
     return base
 
-def merge_package_json(framework: str, features: list[str], target_path: Path):
+def build_package_json(framework: str, features: list[str], store=None) -> dict:
+    """Merge the package.json files of a combination's base and features"""
+    with trace.span("package_json.merge"):
+        return _build_package_json(framework, features, store or get_template_store())
+
+def _build_package_json(framework: str, features: list[str], store) -> dict:
     # Next.js special handling
     if framework == "nextjs" and features:
         router = features[0]
-        base_pkg_path = TEMPLATE_DIR / framework / router / "package.json"
-        final_pkg = load_json(base_pkg_path)
+        final_pkg = load_template_json(store, f"{framework}/{router}/package.json")
         for feature in features[1:]:
-            feature_pkg_path = TEMPLATE_DIR / framework / f"{router}-{feature}" / "package.json"
-            feature_pkg = load_json(feature_pkg_path)
+            feature_pkg = load_template_json(store, f"{framework}/{router}-{feature}/package.json")
             final_pkg = merge_dicts(final_pkg, feature_pkg)
     elif framework == "express" and features and features[0] in ["mongodb", "postgresql", "supabase"]:
         # Express with database - use database-specific package.json
-        db_pkg_path = TEMPLATE_DIR / framework / features[0] / "package.json"
-        final_pkg = load_json(db_pkg_path)
+        final_pkg = load_template_json(store, f"{framework}/{features[0]}/package.json")
     else:
-        base_pkg_path = TEMPLATE_DIR / framework / "base" / "package.json"
-        final_pkg = load_json(base_pkg_path)
+        final_pkg = load_template_json(store, f"{framework}/base/package.json")
         for feature in features:
-            feature_pkg_path = TEMPLATE_DIR / framework / feature / "package.json"
-            feature_pkg = load_json(feature_pkg_path)
+            feature_pkg = load_template_json(store, f"{framework}/{feature}/package.json")
             final_pkg = merge_dicts(final_pkg, feature_pkg)
-    with (target_path / "package.json").open("w") as f:
-        json.dump(final_pkg, f, indent=2)
-    print("[green]📦 Final package.json written[/green]")
+    return final_pkg
+
+def package_json_bytes(final_pkg: dict, variables: Optional[Dict[str, str]] = None) -> bytes:
+    """Serialize a merged package.json with its template variables substituted"""
+    return render(json.dumps(final_pkg, indent=2).encode("utf-8"), variables or {}, quote=json_string)
+
+def write_package_json(final_pkg: dict, target_path: Path, variables: Optional[Dict[str, str]] = None) -> int:
+    """Write the merged package.json; return its size in bytes"""
+    data = package_json_bytes(final_pkg, variables)
+    with (target_path / "package.json").open("wb") as f:
+        f.write(data)
+    return len(data)
+
+def merge_package_json(framework: str, features: list[str], target_path: Path, store=None):
+    write_package_json(build_package_json(framework, features, store), target_path)
+
+def plan_combination(framework: str, features: list[str], store=None, sink=None) -> Optional[Dict[str, Any]]:
+    """Work out everything a combination writes, from the template files; None if it is invalid.
+
+    Returns {overlays, plan, package_json, lockfile, lockfile_packages, lockfile_error},
+    where `lockfile` is the synthesized package-lock.json as bytes (or None).
+    """
+    store = store or get_template_store()
+    sink = sink or NullSink()
+    overlays = resolve_overlays(framework, features, store, sink)
+    if overlays is None:
+        return None
+    # Resolve base + overlays + JS/TS conflicts up front so each file is written once
+    plan = plan_files(overlays, store, sink)
+    package_json = build_package_json(framework, features, store)
+    combination = {"overlays": overlays, "plan": plan, "package_json": package_json,
+                   "lockfile": None, "lockfile_packages": 0, "lockfile_error": None}
+    fragments = load_fragments(store, overlays)
+    if fragments:
+        try:
+            with trace.span("package_json.lockfile", fragments=len(fragments)):
+                lock = synthesize_lockfile(package_json, fragments)
+            combination["lockfile"] = lockfile_bytes(lock)
+            combination["lockfile_packages"] = len(lock["packages"]) - 1
+            # The synthesized lockfile replaces any a template ships verbatim
+            plan.pop(LOCKFILE_NAME, None)
+        except LockfileConflict as e:
+            combination["lockfile_error"] = str(e)
+    return combination
+
+def rendered_bytes(key: str, store, variables: Optional[Dict[str, str]] = None) -> bytes:
+    """A template file's content as generation writes it"""
+    if not store.placeholders(key):
+        return store.read_bytes(key)
+    return b"".join(render_chunks(store.chunks(key), variables or {}))
 
-def generate_project(framework: str, features: list[str], target_dir: str):
+def lockfile_output(combination: Dict[str, Any], variables: Optional[Dict[str, str]] = None) -> Optional[bytes]:
+    """The synthesized package-lock.json with template variables substituted, or None"""
+    if combination["lockfile"] is None:
+        return None
+    return render(combination["lockfile"], variables or {}, quote=json_string)
+
+def combination_files(combination: Dict[str, Any], store=None, variables: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """Content hash of every file a combination writes, keyed by output path"""
+    store = store or get_template_store()
+    files = {
+        rel_path: sha256_bytes(rendered_bytes(key, store, variables)) if store.placeholders(key) else store.digest(key)
+        for rel_path, key in combination["plan"].items()
+    }
+    files["package.json"] = sha256_bytes(package_json_bytes(combination["package_json"], variables))
+    if combination["lockfile"] is not None:
+        files[LOCKFILE_NAME] = sha256_bytes(lockfile_output(combination, variables))
+    return files
+
+def load_combination(framework: str, features: list[str], store=None, sink=None) -> Optional[Dict[str, Any]]:
+    """Look a combination up in the store's prebuilt index, planning it from the templates on a miss"""
+    store = store or get_template_store()
+    sink = sink or NullSink()
+    with trace.span("plan.lookup"):
+        combination = store.combination(framework, features)
+    if combination is None:
+        return plan_combination(framework, features, store, sink)
+    # Replay what planning reported when the index was built
+    for kind, data in combination["events"]:
+        sink.emit(kind, **data)
+    return combination
+
+def generate_project(
+    framework: str,
+    features: list[str],
+    target_dir: str,
+    copy_mode: str = "auto",
+    jobs: int = 1,
+    cache: Optional[ResultCache] = None,
+    sink=None,
+    manifest: bool = True,
+    variables: Optional[Dict[str, str]] = None,
+) -> GenerationResult:
+    """Generate a project and return a GenerationResult describing it.
+
+    Progress is reported as events to `sink`; the default RichSink prints them
+    like the CLI does, NullSink keeps generation silent. `variables` fill the
+    templates' placeholders (see generator/variables.py); project_name
+    defaults to the target directory's name. With `manifest`, the hashes of
+    everything written are recorded in .appgen/manifest.json for `appgen sync`.
+    """
+    sink = sink if sink is not None else RichSink()
     target_path = Path(target_dir).resolve()
-    print(f"\n[bold cyan]🚀 Generating '{framework}' project...[bold cyan]")
-    print(f"[blue]📁 Output directory:[/blue] {target_path}")
-    print(f"[magenta]🧩 Features:[/magenta] {features if features else 'None'}")
+    variables = default_variables(target_path, variables)
+    result = GenerationResult(framework=framework, features=list(features), target_path=target_path)
+    started = time.perf_counter()
+    sink.emit("start", framework=framework, features=features, target=str(target_path))
 
-    if framework == "nextjs":
-        if not features:
-            print("[red]❌ For Next.js, you must specify a router type as the first feature: 'app' or 'pages'.[red]")
-            return
-        router = features[0]
-        if router not in ("app", "pages"):
-            print(f"[red]❌ Invalid router type '{router}'. Must be 'app' or 'pages'.[red]")
-            return
-        # Copy base (app or pages)
-        base_path = TEMPLATE_DIR / framework / router
-        copy_template(base_path, target_path)
-        # Copy features (app-typescript, app-tailwind, etc.)
-        for feature in features[1:]:
-            feature_path = TEMPLATE_DIR / framework / f"{router}-{feature}"
-            if not feature_path.exists():
-                print(f"[yellow]⚠️  Skipping missing feature: {feature_path}[yellow]")
-                continue
-            copy_template(feature_path, target_path)
-    elif framework == "express":
-        # Handle Express with database selection
-        if features and features[0] in ["mongodb", "postgresql", "supabase"]:
-            # Copy database-specific template
-            db_template_path = TEMPLATE_DIR / framework / features[0]
-            copy_template(db_template_path, target_path)
-            print(f"[green]✅ Using {features[0]} database template[green]")
-        else:
-            # Copy base Express template (no database)
-            base_path = TEMPLATE_DIR / framework / "base"
-            copy_template(base_path, target_path)
-            print(f"[green]✅ Using base Express template (no database)[green]")
-    elif framework == "serverless":
-        # Use language as subfolder
-        valid_languages = ["javascript", "typescript", "python", "go"]
-        if not features or features[0] not in valid_languages:
-            print(f"[red]❌ For Serverless, you must specify a valid language: {', '.join(valid_languages)}.[red]")
-            return
-        lang = features[0]
-        lang_template_path = TEMPLATE_DIR / framework / lang
-        copy_template(lang_template_path, target_path)
-        print(f"[green]✅ Using {lang} serverless template[green]")
-    else:
-        # Copy base
-        base_path = TEMPLATE_DIR / framework / "base"
-        copy_template(base_path, target_path)
-        # Copy features
-        for feature in features:
-            feature_path = TEMPLATE_DIR / framework / feature
-            if not feature_path.exists():
-                print(f"[yellow]⚠️  Skipping missing feature: {feature_path}[yellow]")
-                continue
-            copy_template(feature_path, target_path)
+    def phase(name: str, since: float) -> float:
+        now = time.perf_counter()
+        result.durations[name] = now - since
+        trace.record(f"generate.{name}", since, now)
+        return now
+
+    def record_manifest(written) -> None:
+        if manifest:
+            files = combination_files(combination, store, variables)
+            write_manifest(target_path, build_manifest(
+                framework, features, appgen_version(), {rel_path: files[rel_path] for rel_path in written}, variables))
+
+    def finish() -> GenerationResult:
+        now = time.perf_counter()
+        result.durations["total"] = now - started
+        trace.record("generate_project", started, now, framework=framework, features=result.features, ok=result.ok)
+        # Every return path reports "done", failed or not, so sinks such as an InstallPipeline see the outcome
+        sink.emit("done", framework=framework, target=str(target_path), result=result)
+        return result
+
+    store = get_template_store()
+    recorder = _Recorder(sink)
+    combination = load_combination(framework, features, store, recorder)
+    mark = phase("plan", started)
+    if combination is None:
+        invalid = recorder.messages("invalid")
+        result.error = invalid[0]["message"] if invalid else "Invalid framework/feature combination"
+        return finish()
+
+    overlays = combination["overlays"]
+    plan = combination["plan"]
+    package_bytes = package_json_bytes(combination["package_json"], variables)
+    lockfile = lockfile_output(combination, variables)
+    result.conflicts_resolved = [(c["path"], c["shadowed_by"]) for c in recorder.messages("conflict")]
+    result.package_json = json.loads(package_bytes)
+    result.lockfile_error = combination["lockfile_error"]
+    target_path.mkdir(parents=True, exist_ok=True)
+
+    cache_key = None
+    if cache is not None:
+        cache_key = cache.key(framework, features, plan, store, result.package_json, lockfile, variables)
+        restored = cache.restore(cache_key, target_path, copy_mode, jobs)
+        mark = phase("cache_lookup", mark)
+        if restored is not None:
+            result.ok = True
+            result.from_cache = True
+            result.files_written = sorted(restored)
+            result.bytes_written = sum((target_path / rel_path).stat().st_size for rel_path in restored)
+            result.strategies = dict(Counter(restored.values()))
+            sink.emit("cache_hit", count=len(restored), strategies=result.strategies)
+            record_manifest(restored)
+            return finish()
+
+    # package.json and the lockfile go first so a pipelined install can start while the sources are copied
+    with (target_path / "package.json").open("wb") as f:
+        f.write(package_bytes)
+    extra_bytes = len(package_bytes)
+    if lockfile is not None:
+        extra_bytes += write_lockfile(lockfile, target_path)
+    sink.emit("package_json", path=str(target_path / "package.json"))
+    if lockfile is not None:
+        sink.emit("lockfile", path=str(target_path / LOCKFILE_NAME), packages=combination["lockfile_packages"])
+    elif result.lockfile_error:
+        sink.emit("lockfile_skipped", reason=result.lockfile_error)
+    mark = phase("package_json", mark)
+
+    sink.emit("planned", files=len(plan), bytes=sum(store.size(key) for key in plan.values()))
+    errors, strategies = write_plan(plan, target_path, copy_mode, jobs, store, sink, variables)
+    mark = phase("write", mark)
+    result.errors = {rel_path: str(e) for rel_path, e in errors.items()}
+    result.strategies = dict(Counter(strategies.values()))
+    result.files_written = sorted(strategies) + ["package.json"] + ([LOCKFILE_NAME] if lockfile is not None else [])
+    result.bytes_written = extra_bytes + sum(
+        (target_path / rel_path).stat().st_size if strategy == "render" else store.size(plan[rel_path])
+        for rel_path, strategy in strategies.items())
+    sink.emit("copied", count=len(strategies), total=len(plan), overlays=overlays,
+              strategies=result.strategies, errors=result.errors)
+
+    if cache is not None and not errors:
+        try:
+            extra = ["package.json"] + ([LOCKFILE_NAME] if lockfile is not None else [])
+            cache.store(cache_key, target_path, list(plan) + extra, framework, features)
+        except OSError as e:
+            sink.emit("cache_error", error=str(e))
+        mark = phase("cache_store", mark)
+    record_manifest(result.files_written)
+
+    result.ok = not errors
+    if errors:
+        result.error = f"Failed to copy {len(errors)} of {len(plan)} files"
+    return finish()
+
+
+class _Recorder:
+    """Forward events to a sink, keeping the ones generate_project folds into its result"""
+
+    KEEP = ("invalid", "conflict")
 
-    # Remove JS/JSX if TS/TSX exists
-    remove_conflicts(target_path, features)
+    def __init__(self, sink):
+        self.sink = sink
+        self.kept: List[Tuple[str, dict]] = []
 
-    # Merge package.json
-    merge_package_json(framework, features, target_path)
+    def emit(self, kind: str, **data: Any) -> None:
+        if kind in self.KEEP:
+            self.kept.append((kind, data))
+        self.sink.emit(kind, **data)
 
-    print(f"\n[bold green]🎉 Project '{framework}' created successfully at {target_path}![bold green]")
+    def messages(self, kind: str) -> List[dict]:
+        return [data for k, data in self.kept if k == kind]
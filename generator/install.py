@@ -0,0 +1,232 @@
+"""
+Dependency installation for generated projects.
+
+    from generator.install import find_projects, install_projects
+    results = install_projects(find_projects("my-mern-app"), "my-mern-app", package_manager="npm")
+
+Every directory with a package.json (outside node_modules) gets its own
+install. The installs run concurrently over `jobs` threads and all use one
+package-manager cache, so a package fetched for one sub-project comes from
+disk for the next. `mode` sets how much they rely on that cache: "online",
+"prefer-offline", "offline", or "auto", which prefers offline once the
+cache has content. `registry` points installs at a mirror. Output is
+reported line by line as "install_output" events tagged with the project.
+Projects that ship the manager's lockfile get a frozen install (`npm ci`,
+`--frozen-lockfile`), which skips dependency resolution.
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from . import trace
+from .events import NullSink
+
+INSTALL_MODES = ("auto", "online", "prefer-offline", "offline")
+
+# Install commands (plain, and frozen for projects that ship the manager's lockfile),
+# cache-mode flags, and where each manager keeps its package cache
+PACKAGE_MANAGERS: Dict[str, Dict[str, Any]] = {
+    "npm": {
+        "install": ["npm", "install"],
+        "frozen": ["npm", "ci"],
+        "prefer-offline": ["--prefer-offline"],
+        "offline": ["--offline"],
+        "cache_env": "npm_config_cache",
+        "default_cache": "~/.npm",
+        "lockfile": "package-lock.json",
+    },
+    "pnpm": {
+        "install": ["pnpm", "install"],
+        "frozen": ["pnpm", "install", "--frozen-lockfile"],
+        "prefer-offline": ["--prefer-offline"],
+        "offline": ["--offline"],
+        "cache_env": "npm_config_store_dir",
+        "default_cache": "~/.local/share/pnpm/store",
+        "lockfile": "pnpm-lock.yaml",
+    },
+    "yarn": {
+        "install": ["yarn", "install"],
+        "frozen": ["yarn", "install", "--frozen-lockfile"],
+        "prefer-offline": ["--prefer-offline"],
+        "offline": ["--offline"],
+        "cache_env": "YARN_CACHE_FOLDER",
+        "default_cache": "~/.cache/yarn",
+        "lockfile": "yarn.lock",
+    },
+    "bun": {
+        # bun always serves from its cache when it can and has no offline switch
+        "install": ["bun", "install"],
+        "frozen": ["bun", "install", "--frozen-lockfile"],
+        "prefer-offline": [],
+        "offline": None,
+        "cache_env": "BUN_INSTALL_CACHE_DIR",
+        "default_cache": "~/.bun/install/cache",
+        "lockfile": "bun.lockb",
+    },
+}
+
+SKIP_DIRS = {"node_modules", ".git"}
+
+# package.json fields that give an install something to fetch
+DEPENDENCY_FIELDS = ("dependencies", "devDependencies", "optionalDependencies", "peerDependencies")
+
+
+def find_projects(root: str) -> List[Path]:
+    """Every directory under `root` holding a package.json, shallowest first"""
+    root_path = Path(root).resolve()
+    found = []
+    for dirpath, dirnames, filenames in os.walk(root_path):
+        dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS)
+        if "package.json" in filenames:
+            found.append(Path(dirpath))
+    return sorted(found, key=lambda p: (len(p.relative_to(root_path).parts), str(p)))
+
+
+def declares_dependencies(package_json: Dict[str, Any]) -> bool:
+    """Whether a parsed package.json lists any dependencies"""
+    return isinstance(package_json, dict) and any(package_json.get(field) for field in DEPENDENCY_FIELDS)
+
+
+def projects_with_dependencies(root: str) -> List[Path]:
+    """find_projects, without those whose package.json lists nothing to install (such as a Flask project's {})"""
+    found = []
+    for project in find_projects(root):
+        try:
+            package_json = json.loads((project / "package.json").read_bytes())
+        except (OSError, ValueError):
+            # Unreadable or malformed: keep it, so the install reports the problem
+            found.append(project)
+            continue
+        if declares_dependencies(package_json):
+            found.append(project)
+    return found
+
+
+def available_package_managers() -> List[str]:
+    """Supported package managers found on PATH, in preference order"""
+    return [name for name in PACKAGE_MANAGERS if shutil.which(name)]
+
+
+def pick_package_manager(projects: List[Path], preferred: Optional[str] = None) -> Optional[str]:
+    """The requested manager, else the one whose lockfile a project ships, else the first on PATH"""
+    if preferred and preferred != "auto":
+        return preferred
+    for project in projects:
+        for name, spec in PACKAGE_MANAGERS.items():
+            if (project / spec["lockfile"]).exists() and shutil.which(name):
+                return name
+    available = available_package_managers()
+    return available[0] if available else None
+
+
+def resolve_cache_dir(package_manager: str, cache_dir: Optional[str] = None) -> Path:
+    """The package cache installs should share: explicit, else from the environment, else the default"""
+    spec = PACKAGE_MANAGERS[package_manager]
+    chosen = cache_dir or os.environ.get(spec["cache_env"]) or spec["default_cache"]
+    return Path(chosen).expanduser()
+
+
+def resolve_mode(mode: str, cache_dir: Path) -> str:
+    """Turn "auto" into "prefer-offline" when the shared cache already has packages"""
+    if mode not in INSTALL_MODES:
+        raise ValueError(f"Invalid install mode '{mode}'. Valid options: {', '.join(INSTALL_MODES)}")
+    if mode != "auto":
+        return mode
+    try:
+        warm = cache_dir.is_dir() and any(cache_dir.iterdir())
+    except OSError:
+        warm = False
+    return "prefer-offline" if warm else "online"
+
+
+def install_command(package_manager: str, mode: str, registry: Optional[str] = None, frozen: bool = False) -> List[str]:
+    """The argv for one install in the given mode; `frozen` installs exactly what the lockfile says"""
+    if package_manager not in PACKAGE_MANAGERS:
+        raise ValueError(f"Unsupported package manager '{package_manager}'. Valid options: {', '.join(PACKAGE_MANAGERS)}")
+    spec = PACKAGE_MANAGERS[package_manager]
+    command = list(spec["frozen"] if frozen else spec["install"])
+    if mode in ("prefer-offline", "offline"):
+        if spec[mode] is None:
+            raise ValueError(f"{package_manager} does not support {mode} installs")
+        command += spec[mode]
+    if registry:
+        command += ["--registry", registry]
+    return command
+
+
+def _project_name(project: Path, root: Path) -> str:
+    rel = project.relative_to(root).as_posix()
+    return root.name if rel == "." else rel
+
+
+def _install_one(project: Path, name: str, command: List[str], env: Dict[str, str], sink) -> Dict[str, Any]:
+    result = {"project": name, "path": str(project), "command": " ".join(command), "returncode": None}
+    start = time.perf_counter()
+    sink.emit("install_start", project=name, command=result["command"])
+    with trace.span("install", project=name, package_manager=command[0]):
+        try:
+            # Resolve npm.cmd and friends on Windows
+            executable = shutil.which(command[0]) or command[0]
+            proc = subprocess.Popen(
+                [executable] + command[1:], cwd=project, env=env,
+                stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, errors="replace",
+            )
+        except OSError as e:
+            result["error"] = str(e)
+        else:
+            for line in proc.stdout:
+                sink.emit("install_output", project=name, line=line.rstrip("\n"))
+            result["returncode"] = proc.wait()
+            if result["returncode"]:
+                result["error"] = f"exited with code {result['returncode']}"
+    result["status"] = "ok" if result["returncode"] == 0 else "failed"
+    result.setdefault("error", None)
+    result["seconds"] = time.perf_counter() - start
+    sink.emit("install_done", **result)
+    return result
+
+
+def install_projects(
+    projects: List[Path],
+    root: str,
+    package_manager: Optional[str] = None,
+    mode: str = "auto",
+    jobs: Optional[int] = None,
+    registry: Optional[str] = None,
+    cache_dir: Optional[str] = None,
+    sink=None,
+) -> List[Dict[str, Any]]:
+    """Install dependencies in every project concurrently; return per-project results in input order.
+
+    Raises ValueError if no package manager is available or the mode is unsupported.
+    """
+    sink = sink or NullSink()
+    root_path = Path(root).resolve()
+    package_manager = pick_package_manager(projects, package_manager)
+    if package_manager is None:
+        raise ValueError("No supported package managers (npm, yarn, pnpm, bun) found in PATH")
+    if package_manager not in PACKAGE_MANAGERS:
+        raise ValueError(f"Unsupported package manager '{package_manager}'. Valid options: {', '.join(PACKAGE_MANAGERS)}")
+    shared_cache = resolve_cache_dir(package_manager, cache_dir)
+    mode = resolve_mode(mode, shared_cache)
+    lockfile = PACKAGE_MANAGERS[package_manager]["lockfile"]
+    # Projects with a lockfile (shipped or synthesized) skip dependency resolution
+    commands = [install_command(package_manager, mode, registry, frozen=(p / lockfile).exists()) for p in projects]
+
+    # Pin every install to the same cache so concurrent installs fill it once
+    env = dict(os.environ)
+    env[PACKAGE_MANAGERS[package_manager]["cache_env"]] = str(shared_cache)
+
+    names = [_project_name(p, root_path) for p in projects]
+    workers = max(1, min(jobs or len(projects) or 1, len(projects) or 1))
+    sink.emit("install_plan", package_manager=package_manager, mode=mode, cache_dir=str(shared_cache),
+              registry=registry, projects=names, jobs=workers)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_install_one, p, n, c, env, sink) for p, n, c in zip(projects, names, commands)]
+        return [f.result() for f in futures]
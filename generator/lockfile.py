@@ -0,0 +1,186 @@
+"""
+package-lock.json synthesis from per-overlay lockfile fragments.
+
+An overlay can ship `package-lock.fragment.json` next to its package.json:
+the locked `packages` entries (npm lockfile v3) for the dependencies that
+package.json declares, plus the version ranges they were resolved for.
+Generation merges the fragments of a combination and writes a complete
+package-lock.json, so the first install can be `npm ci` without going
+through the resolver. Synthesis is offline and all-or-nothing. If fragments
+disagree on a package, or leave a declared dependency unlocked, no lockfile
+is written and the reason is reported.
+
+Fragments are cut from a real lockfile with:
+
+    python -m generator.lockfile extract path/to/package-lock.json templates/<framework>/<overlay>
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+FRAGMENT_NAME = "package-lock.fragment.json"
+LOCKFILE_NAME = "package-lock.json"
+DEPENDENCY_FIELDS = ("dependencies", "devDependencies", "optionalDependencies")
+
+
+class LockfileConflict(ValueError):
+    """The fragments cannot be combined into one consistent lockfile"""
+
+
+def _root_specs(package_json: Dict[str, Any]) -> Dict[str, Dict[str, str]]:
+    return {field: dict(package_json[field]) for field in DEPENDENCY_FIELDS if package_json.get(field)}
+
+
+def _resolve(packages: Dict[str, Any], parent: str, name: str) -> Optional[str]:
+    """Find the node_modules path `name` resolves to from `parent`, the way Node walks up"""
+    base = parent
+    while True:
+        candidate = f"{base}/node_modules/{name}" if base else f"node_modules/{name}"
+        if candidate in packages:
+            return candidate
+        if not base:
+            return None
+        # Step out of the innermost node_modules/<pkg> (scoped names have two parts)
+        head, sep, _ = base.rpartition("node_modules/")
+        base = head.rstrip("/") if sep else ""
+
+
+def _walk(packages: Dict[str, Any], root_deps: Dict[str, str]) -> set:
+    """Every package path reachable from `root_deps`; raises LockfileConflict on a missing required dependency"""
+    seen = set()
+    stack = []
+    for name in root_deps:
+        path = _resolve(packages, "", name)
+        if path is None:
+            raise LockfileConflict(f"no locked version of {name}")
+        stack.append(path)
+    while stack:
+        path = stack.pop()
+        if path in seen:
+            continue
+        seen.add(path)
+        entry = packages[path]
+        required = dict(entry.get("dependencies") or {})
+        optional = dict(entry.get("optionalDependencies") or {})
+        optional.update(entry.get("peerDependencies") or {})
+        for name in list(required) + list(optional):
+            dep_path = _resolve(packages, path, name)
+            if dep_path is not None:
+                stack.append(dep_path)
+            elif name in required:
+                raise LockfileConflict(f"{path} needs {name}, which no fragment locks")
+    return seen
+
+
+def extract_fragment(lock: Dict[str, Any], package_json: Dict[str, Any]) -> Dict[str, Any]:
+    """Cut the entries reachable from `package_json`'s dependencies out of a full lockfile"""
+    packages = lock.get("packages")
+    if lock.get("lockfileVersion", 0) < 2 or not packages:
+        raise ValueError("Only npm lockfiles with a 'packages' section (lockfileVersion 2 or 3) are supported")
+    specs = _root_specs(package_json)
+    wanted = {name: spec for field in specs.values() for name, spec in field.items()}
+    reachable = _walk(packages, wanted)
+    return {
+        "lockfileVersion": 3,
+        "root": specs,
+        "packages": {path: packages[path] for path in sorted(reachable)},
+    }
+
+
+def synthesize_lockfile(package_json: Dict[str, Any], fragments: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Merge fragments into a package-lock.json for `package_json`.
+
+    Raises LockfileConflict if two fragments lock a package differently, a
+    declared range has no fragment resolved for it, or a dependency is missing.
+    """
+    merged: Dict[str, Dict[str, Any]] = {}
+    locked_specs: Dict[str, set] = {}
+    for fragment in fragments:
+        for specs in fragment.get("root", {}).values():
+            for name, spec in specs.items():
+                locked_specs.setdefault(name, set()).add(spec)
+        for path, entry in fragment.get("packages", {}).items():
+            existing = merged.get(path)
+            if existing is None:
+                merged[path] = entry
+            elif (existing.get("version"), existing.get("resolved")) != (entry.get("version"), entry.get("resolved")):
+                raise LockfileConflict(f"{path} is locked at both {existing.get('version')} and {entry.get('version')}")
+
+    specs = _root_specs(package_json)
+    for field, deps in specs.items():
+        for name, spec in deps.items():
+            if spec not in locked_specs.get(name, ()):
+                raise LockfileConflict(f"no fragment locks {name}@{spec}")
+
+    prod = _walk(merged, {**specs.get("dependencies", {}), **specs.get("optionalDependencies", {})})
+    dev = _walk(merged, specs.get("devDependencies", {}))
+
+    root = {"name": package_json.get("name"), "version": package_json.get("version")}
+    root.update(specs)
+    packages = {"": {k: v for k, v in root.items() if v is not None}}
+    for path in sorted(prod | dev):
+        # Dev/optional flags depend on the merged root, not on the fragment it came from
+        entry = dict(merged[path])
+        optional = entry.get("optional") or entry.get("devOptional")
+        if path in prod:
+            flag = "optional" if optional else None
+        else:
+            flag = "devOptional" if optional else "dev"
+        for key in ("dev", "optional", "devOptional"):
+            if key != flag:
+                entry.pop(key, None)
+        if flag:
+            entry.setdefault(flag, True)
+        packages[path] = entry
+
+    lock = {"name": package_json.get("name"), "version": package_json.get("version"),
+            "lockfileVersion": 3, "requires": True, "packages": packages}
+    return {k: v for k, v in lock.items() if v is not None}
+
+
+def load_fragments(store, overlays: List[str]) -> List[Dict[str, Any]]:
+    """The lockfile fragments shipped by `overlays`, in overlay order"""
+    from .store import load_template_json
+
+    return [load_template_json(store, f"{overlay}/{FRAGMENT_NAME}") for overlay in overlays
+            if store.exists(f"{overlay}/{FRAGMENT_NAME}")]
+
+
+def lockfile_bytes(lock: Dict[str, Any]) -> bytes:
+    """Serialize a lockfile the way npm formats it"""
+    return (json.dumps(lock, indent=2, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def write_lockfile(data: bytes, target_path: Path) -> int:
+    """Write serialized package-lock.json bytes; return their size"""
+    with (target_path / LOCKFILE_NAME).open("wb") as f:
+        f.write(data)
+    return len(data)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m generator.lockfile", description="Maintain lockfile fragments")
+    sub = parser.add_subparsers(dest="command", required=True)
+    extract = sub.add_parser("extract", help="Write an overlay's fragment from a full package-lock.json")
+    extract.add_argument("lockfile", type=Path, help="package-lock.json resolved for the overlay")
+    extract.add_argument("overlay", type=Path, help="Template overlay directory holding the package.json")
+    opts = parser.parse_args(argv)
+
+    lock = json.loads(opts.lockfile.read_text())
+    package_json = json.loads((opts.overlay / "package.json").read_text())
+    try:
+        fragment = extract_fragment(lock, package_json)
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    out = opts.overlay / FRAGMENT_NAME
+    out.write_text(json.dumps(fragment, indent=2) + "\n")
+    print(f"Wrote {len(fragment['packages'])} locked packages to {out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
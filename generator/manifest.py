@@ -0,0 +1,69 @@
+"""
+The record a generated project keeps of what appgen wrote into it.
+
+generate_project writes `.appgen/manifest.json` into every project:
+
+    {
+      "framework": "nextjs",
+      "features": ["app", "typescript"],
+      "template_version": "0.3.3",
+      "variables": {"project_name": "web", "port": "3000"},
+      "files": {"app/page.tsx": "<sha256>", "package.json": "<sha256>", ...}
+    }
+
+`appgen sync` (generator/sync.py) compares these hashes with the current
+templates and with the files on disk to update a project in place.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+MANIFEST_PATH = Path(".appgen") / "manifest.json"
+
+
+def sha256_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_digest(path: Path) -> Optional[str]:
+    """sha256 of a file on disk, or None if it does not exist"""
+    h = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+    except FileNotFoundError:
+        return None
+    return h.hexdigest()
+
+
+def build_manifest(framework: str, features: List[str], template_version: str, files: Dict[str, str],
+                   variables: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    return {
+        "framework": framework,
+        "features": list(features),
+        "template_version": template_version,
+        "variables": dict(sorted((variables or {}).items())),
+        "files": dict(sorted(files.items())),
+    }
+
+
+def write_manifest(target_path: Path, manifest: Dict[str, Any]) -> Path:
+    """Write the manifest atomically under `target_path`; return its path"""
+    path = target_path / MANIFEST_PATH
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(manifest, indent=2) + "\n")
+    os.replace(tmp, path)
+    return path
+
+
+def read_manifest(target_path: Path) -> Optional[Dict[str, Any]]:
+    """The project's manifest, or None if it was not generated by appgen (or predates manifests)"""
+    path = Path(target_path) / MANIFEST_PATH
+    if not path.exists():
+        return None
+    return json.loads(path.read_text())
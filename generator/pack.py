@@ -0,0 +1,347 @@
+"""
+Single-file, content-addressed template archive ("template pack").
+
+Layout, all integers little-endian:
+
+    magic     8 bytes   b"APGNPACK"
+    version   u32
+    index_len u64
+    index     index_len bytes of UTF-8 JSON:
+              {"blobs": {...}, "entries": {...}, "combinations": {...}, "signature": "..."}
+    data      blob payloads, each at blob["offset"] from the start of data
+
+Blobs are keyed by the sha256 of their content and record offset, stored size,
+original size and whether the payload is zlib-compressed. Entries map each
+template path to a blob hash and a file mode, so every variant is just a
+manifest of hashes and identical files across variants are stored once.
+Entries of files with template variables also list them under
+"placeholders", so generation never scans for them.
+Already-compressed assets (JPEG, PNG, fonts, archives) are stored as-is. At
+runtime the pack is mmapped and only the blobs a combination needs are read.
+
+The pack also carries a combination index. Every valid framework/feature
+combination in appgen.config.yaml (including preset components) maps to a
+blob holding its planned file list, merged package.json and synthesized
+lockfile. An indexed generation therefore reads one small blob and does no
+template merging at all. "signature" fingerprints the templates the pack was
+built from. In a source checkout, get_template_store() ignores a pack whose
+signature no longer matches the live tree.
+
+Build it before packaging, and check the index against the live templates:
+
+    python -m generator.pack build
+    python -m generator.pack check
+"""
+
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import zlib
+from bisect import bisect_left
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .blobs import BlobCache
+from .copy_engine import copy_file, detached_mode, unlink_existing
+from .combinations import combination_id, iter_combinations
+from .store import DirectoryStore, PACK_PATH, TEMPLATE_DIR, template_signature
+from .variables import CHUNK_SIZE, render_file
+
+MAGIC = b"APGNPACK"
+VERSION = 4
+CONFIG_PATH = Path(__file__).parent.parent / "appgen" / "appgen.config.yaml"
+HEADER = struct.Struct("<8sIQ")
+
+# Formats that are already compressed; deflating them again only costs time
+STORED_SUFFIXES = {
+    ".jpg", ".jpeg", ".png", ".gif", ".webp", ".ico", ".avif",
+    ".woff", ".woff2", ".zip", ".gz", ".tgz", ".bz2", ".xz", ".zst",
+}
+
+
+def _should_compress(key: str) -> bool:
+    return Path(key).suffix.lower() not in STORED_SUFFIXES
+
+
+def load_build_combinations(config_path: Path = CONFIG_PATH) -> List[Dict[str, Any]]:
+    """Every combination the config can produce, plus preset components, without duplicates"""
+    import yaml
+    from appgen.presets import preset_components
+
+    with config_path.open() as f:
+        config = yaml.safe_load(f) or {}
+    combinations = {c["id"]: c for c in iter_combinations(config)}
+    for preset in (config.get("presets") or {}).values():
+        for component in preset_components(preset):
+            cid = combination_id(component["framework"], component["features"])
+            combinations.setdefault(cid, {"id": cid, "framework": component["framework"], "features": component["features"]})
+    return list(combinations.values())
+
+
+def index_combination(framework: str, features: List[str], store) -> Optional[Dict[str, Any]]:
+    """Plan a combination from `store` into its index form, lockfile still as bytes; None if invalid"""
+    from .events import BufferedSink
+    from .generate import plan_combination
+
+    events = BufferedSink()
+    planned = plan_combination(framework, features, store, events)
+    if planned is None:
+        return None
+    planned["events"] = [[kind, data] for kind, data in events.events]
+    return planned
+
+
+def build_pack(
+    templates_dir: Path = TEMPLATE_DIR,
+    output: Path = PACK_PATH,
+    combinations: Optional[List[Dict[str, Any]]] = None,
+) -> Dict[str, Any]:
+    """Pack every file under `templates_dir` and the index of `combinations` into `output`; return the index"""
+    blobs = {}
+    entries = {}
+    payloads = []
+    offset = 0
+
+    def add_blob(data: bytes, compress: bool) -> str:
+        nonlocal offset
+        digest = hashlib.sha256(data).hexdigest()
+        if digest in blobs:
+            return digest
+        stored = data
+        compressed = False
+        if compress and data:
+            deflated = zlib.compress(data, 9)
+            if len(deflated) < len(data):
+                stored = deflated
+                compressed = True
+        blobs[digest] = {
+            "offset": offset,
+            "stored_size": len(stored),
+            "size": len(data),
+            "compressed": compressed,
+        }
+        payloads.append(stored)
+        offset += len(stored)
+        return digest
+
+    source = DirectoryStore(templates_dir)
+    for key in source.keys():
+        path = templates_dir / key
+        digest = add_blob(path.read_bytes(), _should_compress(key))
+        entries[key] = {"sha256": digest, "mode": path.stat().st_mode & 0o777}
+        placeholders = source.placeholders(key)
+        if placeholders:
+            entries[key]["placeholders"] = list(placeholders)
+
+    indexed = {}
+    for combo in combinations or []:
+        planned = index_combination(combo["framework"], combo["features"], source)
+        if planned is None:
+            continue
+        if planned["lockfile"] is not None:
+            planned["lockfile"] = add_blob(planned["lockfile"], True)
+        # Keep key order: it is the order files are written and package.json fields appear
+        indexed[combo["id"]] = add_blob(json.dumps(planned, separators=(",", ":")).encode("utf-8"), True)
+
+    index = {"blobs": blobs, "entries": entries, "combinations": indexed, "signature": template_signature(templates_dir)}
+    index_bytes = json.dumps(index, separators=(",", ":"), sort_keys=True).encode("utf-8")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    tmp = output.with_suffix(output.suffix + ".tmp")
+    with tmp.open("wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(index_bytes)))
+        f.write(index_bytes)
+        for payload in payloads:
+            f.write(payload)
+    os.replace(tmp, output)
+    return index
+
+
+def check_pack(store: "PackStore", templates_dir: Path = TEMPLATE_DIR) -> List[str]:
+    """Compare every indexed combination with a fresh plan from the live templates; return the mismatches"""
+    live = DirectoryStore(templates_dir)
+    problems = []
+    for cid in sorted(store.combinations):
+        framework, _, features = cid.partition(":")
+        features = features.split("+") if features else []
+        expected = index_combination(framework, features, live)
+        actual = store.combination(framework, features)
+        if expected is None:
+            problems.append(f"{cid}: no longer a valid combination")
+            continue
+        for field in ("overlays", "plan", "package_json", "lockfile", "lockfile_error", "events"):
+            if expected[field] != actual[field]:
+                problems.append(f"{cid}: {field} differs from the live templates")
+        for rel_path, key in expected["plan"].items():
+            if store.exists(key) and store.digest(key) != live.digest(key):
+                problems.append(f"{cid}: {key} differs from the live templates")
+    return problems
+
+
+class PackStore:
+    """Templates read from a memory-mapped template pack"""
+
+    def __init__(self, path: Path, blob_cache: Optional[BlobCache] = None):
+        self.path = Path(path)
+        self.blob_cache = blob_cache or BlobCache()
+        with self.path.open("rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, index_len = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{self.path} is not a version {VERSION} template pack")
+        index = json.loads(self._mmap[HEADER.size:HEADER.size + index_len])
+        self._data_start = HEADER.size + index_len
+        self.blobs: Dict[str, Dict[str, Any]] = index["blobs"]
+        self.entries: Dict[str, Dict[str, Any]] = index["entries"]
+        self.combinations: Dict[str, str] = index.get("combinations", {})
+        self.signature: Optional[str] = index.get("signature")
+        self._keys = sorted(self.entries)
+        self._dirs = set()
+        for key in self._keys:
+            parent = key.rpartition("/")[0]
+            while parent and parent not in self._dirs:
+                self._dirs.add(parent)
+                parent = parent.rpartition("/")[0]
+
+    @property
+    def location(self) -> str:
+        return str(self.path)
+
+    def has_dir(self, key: str) -> bool:
+        return key in self._dirs
+
+    def exists(self, key: str) -> bool:
+        return key in self.entries
+
+    def walk(self, key: str) -> Iterator[Tuple[str, str]]:
+        """Yield (path relative to `key`, template key) for every entry under `key`, sorted"""
+        prefix = key + "/"
+        i = bisect_left(self._keys, prefix)
+        while i < len(self._keys) and self._keys[i].startswith(prefix):
+            yield self._keys[i][len(prefix):], self._keys[i]
+            i += 1
+
+    def keys(self) -> Iterator[str]:
+        return iter(self._keys)
+
+    def digest(self, key: str) -> str:
+        return self.entries[key]["sha256"]
+
+    def known_digest(self, key: str) -> str:
+        return self.digest(key)
+
+    def size(self, key: str) -> int:
+        return self.blobs[self.digest(key)]["size"]
+
+    def mode(self, key: str) -> int:
+        return self.entries[key]["mode"]
+
+    def read_blob(self, digest: str) -> bytes:
+        blob = self.blobs[digest]
+        start = self._data_start + blob["offset"]
+        payload = self._mmap[start:start + blob["stored_size"]]
+        return zlib.decompress(payload) if blob["compressed"] else payload
+
+    def read_bytes(self, key: str) -> bytes:
+        return self.read_blob(self.digest(key))
+
+    def chunks(self, key: str, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        """Stream an entry's content, inflating compressed blobs piece by piece"""
+        blob = self.blobs[self.digest(key)]
+        start = self._data_start + blob["offset"]
+        end = start + blob["stored_size"]
+        inflate = zlib.decompressobj() if blob["compressed"] else None
+        for pos in range(start, end, chunk_size):
+            piece = self._mmap[pos:min(pos + chunk_size, end)]
+            if inflate is None:
+                yield piece
+            else:
+                out = inflate.decompress(piece)
+                if out:
+                    yield out
+        if inflate is not None:
+            tail = inflate.flush()
+            if tail:
+                yield tail
+
+    def placeholders(self, key: str) -> Tuple[str, ...]:
+        return tuple(self.entries[key].get("placeholders", ()))
+
+    def combination(self, framework: str, features: List[str]) -> Optional[Dict[str, Any]]:
+        """The prebuilt plan for a combination, or None if the index does not have it"""
+        digest = self.combinations.get(combination_id(framework, list(features)))
+        if digest is None:
+            return None
+        planned = json.loads(self.read_blob(digest))
+        if planned["lockfile"] is not None:
+            planned["lockfile"] = self.read_blob(planned["lockfile"])
+        return planned
+
+    def materialize(self, key: str, dest: Path, copy_mode: str = "auto") -> str:
+        """Write entry `key` to `dest` from the shared blob cache, extracting the blob on first use"""
+        digest = self.digest(key)
+        entry = self.entries[key]
+        try:
+            blob = self.blob_cache.ensure(digest, self.blobs[digest]["size"], lambda: self.read_blob(digest))
+        except OSError:
+            # No writable cache: extract straight into the project
+            unlink_existing(dest)
+            with open(dest, "wb") as f:
+                f.write(self.read_blob(digest))
+            os.chmod(dest, entry["mode"])
+            return "extract"
+        # Every project shares the cache, so a project file must never be a link to it
+        strategy = copy_file(blob, dest, detached_mode(copy_mode))
+        os.chmod(dest, entry["mode"])
+        return strategy
+
+    def render(self, key: str, dest: Path, variables: dict) -> str:
+        """Write entry `key` to `dest` with its placeholders substituted"""
+        render_file(self.chunks(key), dest, variables)
+        os.chmod(dest, self.entries[key]["mode"])
+        return "render"
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m generator.pack", description="Build or inspect the template pack")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="Pack the templates directory into a single archive")
+    build.add_argument("--templates", type=Path, default=TEMPLATE_DIR, help="Templates directory to pack")
+    build.add_argument("--output", type=Path, default=PACK_PATH, help="Where to write the pack")
+    build.add_argument("--config", type=Path, default=CONFIG_PATH, help="Config whose combinations are indexed")
+    check = sub.add_parser("check", help="Verify a pack's combination index against the live templates")
+    check.add_argument("pack", type=Path, nargs="?", default=PACK_PATH)
+    check.add_argument("--templates", type=Path, default=TEMPLATE_DIR, help="Live templates directory")
+    show = sub.add_parser("list", help="List the entries of a pack")
+    show.add_argument("pack", type=Path, nargs="?", default=PACK_PATH)
+    opts = parser.parse_args(argv)
+
+    if opts.command == "build":
+        index = build_pack(opts.templates, opts.output, load_build_combinations(opts.config))
+        blobs = index["blobs"]
+        file_blobs = {e["sha256"] for e in index["entries"].values()}
+        raw = sum(blobs[digest]["size"] for digest in file_blobs)
+        stored = sum(b["stored_size"] for b in blobs.values())
+        print(f"Packed {len(index['entries'])} files as {len(file_blobs)} blobs "
+              f"({raw} bytes, {stored} stored) and indexed {len(index['combinations'])} combinations into {opts.output}")
+    elif opts.command == "check":
+        problems = check_pack(PackStore(opts.pack), opts.templates)
+        for problem in problems:
+            print(problem)
+        if problems:
+            return 1
+        print(f"{opts.pack} matches {opts.templates}")
+    else:
+        store = PackStore(opts.pack)
+        for key in store.keys():
+            blob = store.blobs[store.digest(key)]
+            flag = "z" if blob["compressed"] else "-"
+            print(f"{flag} {blob['size']:>10} {blob['stored_size']:>10}  {store.digest(key)[:12]}  {key}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
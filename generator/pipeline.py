@@ -0,0 +1,116 @@
+"""
+Dependency installs pipelined with generation.
+
+    from generator.pipeline import InstallPipeline
+    pipeline = InstallPipeline(package_manager="npm", sink=RichSink())
+    result = generate_project("strapi", [], "cms", sink=pipeline.watch(RichSink()))
+    report = pipeline.join()
+
+generate_project writes package.json (and the synthesized lockfile) before it
+copies the template files, and emits "package_json" at that point. A sink
+from watch() starts that project's install on a background thread right
+away, so the package manager resolves and downloads while the sources are
+still being written. Two cases wait for the copy to finish first. Projects
+whose package.json has install lifecycle scripts wait, because those scripts
+may read the sources. Nested package.json files found once the copy is done
+are also installed only then. join() waits for every install. Its report
+puts generation failures and install failures side by side.
+"""
+
+import json
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .events import NullSink
+from .install import find_projects, install_projects
+
+# Scripts npm runs for the project itself during install; they may need the sources in place
+LIFECYCLE_SCRIPTS = ("preinstall", "install", "postinstall", "prepare")
+
+
+class InstallPipeline:
+    """Starts each generated project's install as soon as its package.json is on disk"""
+
+    def __init__(
+        self,
+        package_manager: Optional[str] = None,
+        mode: str = "auto",
+        jobs: Optional[int] = None,
+        registry: Optional[str] = None,
+        cache_dir: Optional[str] = None,
+        sink=None,
+    ):
+        self.sink = sink or NullSink()
+        self.options = {"package_manager": package_manager, "mode": mode, "registry": registry, "cache_dir": cache_dir}
+        self._pool = ThreadPoolExecutor(max_workers=jobs or 4, thread_name_prefix="appgen-install")
+        self._lock = threading.Lock()
+        self._installs: List[Future] = []
+        self._started = set()
+        self._copies: Dict[Path, "_Watcher"] = {}
+        self.generation_failures: List[Dict[str, Any]] = []
+
+    def watch(self, sink=None) -> "_Watcher":
+        """A sink for one generate_project call that forwards to `sink` and drives the installs"""
+        return _Watcher(self, sink or NullSink())
+
+    def _submit(self, project: Path, watcher: Optional["_Watcher"] = None) -> None:
+        with self._lock:
+            if project in self._started:
+                return
+            self._started.add(project)
+            self._installs.append(self._pool.submit(self._install, project, watcher))
+
+    def _install(self, project: Path, watcher: Optional["_Watcher"]) -> Dict[str, Any]:
+        if watcher is not None:
+            watcher.copied.wait()
+            if not watcher.ok:
+                return {"project": project.name, "path": str(project), "status": "skipped",
+                        "error": "generation failed", "seconds": 0.0}
+        try:
+            return install_projects([project], str(project), jobs=1, sink=self.sink, **self.options)[0]
+        except ValueError as e:
+            return {"project": project.name, "path": str(project), "status": "failed", "error": str(e), "seconds": 0.0}
+
+    def join(self) -> Dict[str, Any]:
+        """Wait for every install; return {ok, generation_failures, installs}"""
+        # A generation that raised never reported "done"; don't leave its deferred install waiting
+        for watcher in list(self._copies.values()):
+            watcher.copied.set()
+        installs = [future.result() for future in list(self._installs)]
+        self._pool.shutdown()
+        ok = not self.generation_failures and all(result["status"] == "ok" for result in installs)
+        return {"ok": ok, "generation_failures": self.generation_failures, "installs": installs}
+
+
+class _Watcher:
+    """Per-generation sink: forwards every event, and starts installs at the right moments"""
+
+    def __init__(self, pipeline: InstallPipeline, sink):
+        self.pipeline = pipeline
+        self.sink = sink
+        self.target: Optional[Path] = None
+        self.copied = threading.Event()
+        self.ok = True
+
+    def emit(self, kind: str, **data: Any) -> None:
+        self.sink.emit(kind, **data)
+        if kind == "start":
+            self.target = Path(data["target"])
+            self.pipeline._copies[self.target] = self
+        elif kind == "package_json":
+            project = Path(data["path"]).parent
+            scripts = json.loads(Path(data["path"]).read_bytes()).get("scripts") or {}
+            deferred = any(name in scripts for name in LIFECYCLE_SCRIPTS)
+            self.pipeline._submit(project, self if deferred else None)
+        elif kind == "done":
+            result = data["result"]
+            self.ok = result.ok and not result.error
+            if not self.ok:
+                self.pipeline.generation_failures.append({"target": data["target"], "error": result.error})
+            self.copied.set()
+            if self.ok:
+                # Restored trees and nested sub-projects only now have every package.json in place
+                for project in find_projects(data["target"]):
+                    self.pipeline._submit(project)
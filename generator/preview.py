@@ -0,0 +1,111 @@
+"""
+In-memory preview of what a combination generates.
+
+    from generator.preview import preview_project, diff_preview
+    preview = preview_project("nextjs", ["app", "typescript"])
+    changes = diff_preview(preview, "existing-app")
+
+preview_project plans a combination without writing anything. It returns
+every output file with its size, source template and sha256, plus the merged
+package.json. With the built template pack this is one lookup in the
+combination index, and the only template content read is that of files with
+template variables, which are rendered in memory, once each. Loose template
+trees are not hashed for a preview: their files' sizes come from stat(), and
+a sha256 is given only where the store already knows it (None otherwise).
+diff_preview compares a preview with a directory on disk. It compares
+contents only when the sizes are equal, by hash, or against the template
+where the preview has no hash.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .events import BufferedSink
+from .generate import load_combination, lockfile_output, package_json_bytes, rendered_bytes
+from .lockfile import LOCKFILE_NAME
+from .manifest import MANIFEST_PATH, file_digest, sha256_bytes
+from .store import get_template_store
+
+# Not part of what generation writes, so never reported as extra files
+IGNORED_DIRS = {".appgen", ".git", "node_modules"}
+
+
+def preview_project(framework: str, features: List[str], store=None,
+                    variables: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """Plan a combination in memory; return {ok, error, files, package_json, ...} without touching disk.
+
+    Sizes and hashes are of the files as rendered with `variables`. A file copied
+    as is from a loose tree has a sha256 only if the store already knows it.
+    """
+    store = store or get_template_store()
+    events = BufferedSink()
+    combination = load_combination(framework, list(features), store, events)
+    preview: Dict[str, Any] = {"framework": framework, "features": list(features), "ok": combination is not None}
+    if combination is None:
+        invalid = [data["message"] for kind, data in events.events if kind == "invalid"]
+        preview["error"] = invalid[0] if invalid else "Invalid framework/feature combination"
+        return preview
+
+    files = []
+    for rel_path, key in sorted(combination["plan"].items()):
+        if store.placeholders(key):
+            data = rendered_bytes(key, store, variables)
+            sha256, size = sha256_bytes(data), len(data)
+        else:
+            # Metadata only: hashing a loose tree would read every template
+            sha256, size = store.known_digest(key), store.size(key)
+        files.append({"path": rel_path, "source": key, "sha256": sha256, "size": size})
+    package_bytes = package_json_bytes(combination["package_json"], variables)
+    files.append({"path": "package.json", "source": None, "sha256": sha256_bytes(package_bytes), "size": len(package_bytes)})
+    lockfile = lockfile_output(combination, variables)
+    if lockfile is not None:
+        files.append({"path": LOCKFILE_NAME, "source": None, "sha256": sha256_bytes(lockfile), "size": len(lockfile)})
+    preview.update({
+        "error": None,
+        "overlays": combination["overlays"],
+        "files": files,
+        "total_files": len(files),
+        "total_bytes": sum(f["size"] for f in files),
+        "conflicts_resolved": [data for kind, data in events.events if kind == "conflict"],
+        "missing_overlays": [data["overlay"] for kind, data in events.events if kind == "overlay_missing"],
+        "package_json": json.loads(package_bytes),
+        "lockfile_error": combination["lockfile_error"],
+    })
+    return preview
+
+
+def diff_preview(preview: Dict[str, Any], target_dir: str, store=None) -> Dict[str, List[str]]:
+    """Compare a preview with `target_dir`: files generation would add or change, leave alone, or not produce"""
+    store = store or get_template_store()
+    target_path = Path(target_dir)
+    diff = {"added": [], "modified": [], "unchanged": [], "extra": []}
+    planned = set()
+    for f in preview["files"]:
+        planned.add(f["path"])
+        dest = target_path / f["path"]
+        try:
+            size = dest.stat().st_size
+        except FileNotFoundError:
+            diff["added"].append(f["path"])
+            continue
+        if size != f["size"]:
+            changed = True
+        elif f["sha256"] is not None:
+            changed = file_digest(dest) != f["sha256"]
+        else:
+            changed = dest.read_bytes() != store.read_bytes(f["source"])
+        if changed:
+            diff["modified"].append(f["path"])
+        else:
+            diff["unchanged"].append(f["path"])
+
+    if target_path.is_dir():
+        for dirpath, dirnames, filenames in os.walk(target_path):
+            dirnames[:] = sorted(d for d in dirnames if d not in IGNORED_DIRS)
+            for fname in sorted(filenames):
+                rel_path = (Path(dirpath) / fname).relative_to(target_path).as_posix()
+                if rel_path not in planned and rel_path != MANIFEST_PATH.as_posix():
+                    diff["extra"].append(rel_path)
+    return diff
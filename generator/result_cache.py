@@ -0,0 +1,177 @@
+"""
+Cache of fully generated project trees.
+
+Entries are keyed by framework, the ordered feature list, a hash of every
+template file the combination uses (plus the merged package.json) and the
+appgen version, so a template edit or an upgrade never serves a stale tree.
+A hit is materialized with one clone/copy pass through the copy engine, never
+as hardlinks into the cache.
+
+The cache lives under ~/.cache/appgen/results, is trimmed least-recently-used
+first to a size budget, and is guarded by a lock file so concurrent appgen
+processes can share it.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .blobs import default_cache_dir
+from .copy_engine import copy_file, detached_mode
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to no cross-process locking
+    fcntl = None
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+def appgen_version() -> str:
+    try:
+        from importlib.metadata import version
+        return version("appgen")
+    except Exception:
+        return "dev"
+
+
+class FileLock:
+    """Advisory lock on a file; shared for readers, exclusive for writers"""
+
+    def __init__(self, path: Path, exclusive: bool = True):
+        self.path = path
+        self.exclusive = exclusive
+        self._fd = None
+
+    def __enter__(self) -> "FileLock":
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_EX if self.exclusive else fcntl.LOCK_SH)
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        os.close(self._fd)
+
+
+class ResultCache:
+    """LRU cache of generated trees under <root>/<key>/{meta.json,tree/}"""
+
+    def __init__(self, root: Optional[Path] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = Path(root) if root else default_cache_dir() / "results"
+        self.max_bytes = max_bytes
+        self._lock_path = self.root / ".lock"
+
+    def key(self, framework: str, features: List[str], plan: Dict[str, str], store, package_json: Dict[str, Any],
+            lockfile: Optional[bytes] = None, variables: Optional[Dict[str, str]] = None) -> str:
+        """Hash everything that determines the generated tree, including the variables its templates use"""
+        h = hashlib.sha256()
+        h.update(json.dumps([framework, list(features), appgen_version()]).encode())
+        used = set()
+        for rel_path in sorted(plan):
+            h.update(f"{rel_path}\0{store.digest(plan[rel_path])}\n".encode())
+            used.update(store.placeholders(plan[rel_path]))
+        variables = variables or {}
+        h.update(json.dumps({name: variables.get(name) for name in sorted(used)}).encode())
+        h.update(json.dumps(package_json, sort_keys=True).encode())
+        if lockfile is not None:
+            h.update(lockfile)
+        return h.hexdigest()
+
+    def _entry(self, key: str) -> Path:
+        return self.root / key
+
+    def restore(self, key: str, target_path: Path, copy_mode: str = "auto", jobs: int = 1) -> Optional[Dict[str, str]]:
+        """Materialize a cached tree into `target_path`; return {path: strategy} or None on a miss"""
+        entry = self._entry(key)
+        with FileLock(self._lock_path, exclusive=False):
+            meta_path = entry / "meta.json"
+            if not meta_path.exists():
+                return None
+            meta = json.loads(meta_path.read_text())
+            tree = entry / "tree"
+            for rel_dir in sorted({Path(rel_path).parent for rel_path in meta["files"]}):
+                (target_path / rel_dir).mkdir(parents=True, exist_ok=True)
+
+            # A hardlinked project would write its edits into the cache entry every later hit restores
+            copy_mode = detached_mode(copy_mode)
+
+            def restore_one(rel_path: str) -> str:
+                return copy_file(tree / rel_path, target_path / rel_path, copy_mode)
+
+            if jobs > 1:
+                with ThreadPoolExecutor(max_workers=jobs) as pool:
+                    strategies = dict(zip(meta["files"], pool.map(restore_one, meta["files"])))
+            else:
+                strategies = {rel_path: restore_one(rel_path) for rel_path in meta["files"]}
+            # Touch the entry so eviction sees it as recently used
+            os.utime(meta_path)
+        return strategies
+
+    def store(self, key: str, source_path: Path, files: List[str], framework: str, features: List[str]) -> None:
+        """Copy the listed files of a freshly generated tree into the cache, then trim it"""
+        self.root.mkdir(parents=True, exist_ok=True)
+        with FileLock(self._lock_path):
+            entry = self._entry(key)
+            if (entry / "meta.json").exists():
+                return
+            staging = Path(tempfile.mkdtemp(dir=self.root, prefix=".staging-"))
+            try:
+                total = 0
+                for rel_path in sorted(files):
+                    dest = staging / "tree" / rel_path
+                    dest.parent.mkdir(parents=True, exist_ok=True)
+                    copy_file(source_path / rel_path, dest)
+                    total += dest.stat().st_size
+                meta = {
+                    "framework": framework,
+                    "features": list(features),
+                    "version": appgen_version(),
+                    "files": sorted(files),
+                    "bytes": total,
+                    "created": time.time(),
+                }
+                (staging / "meta.json").write_text(json.dumps(meta, indent=2))
+                os.replace(staging, entry)
+            except BaseException:
+                shutil.rmtree(staging, ignore_errors=True)
+                raise
+            self._evict()
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """Cached entries with their size and last-used time, oldest first"""
+        found = []
+        if not self.root.exists():
+            return found
+        for entry in self.root.iterdir():
+            meta_path = entry / "meta.json"
+            if entry.name.startswith(".") or not meta_path.exists():
+                continue
+            meta = json.loads(meta_path.read_text())
+            meta["key"] = entry.name
+            meta["last_used"] = meta_path.stat().st_mtime
+            found.append(meta)
+        return sorted(found, key=lambda m: m["last_used"])
+
+    def _evict(self) -> None:
+        """Drop least-recently-used entries until the cache fits its budget; caller holds the lock"""
+        entries = self.entries()
+        total = sum(e["bytes"] for e in entries)
+        for meta in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(self._entry(meta["key"]), ignore_errors=True)
+            total -= meta["bytes"]
+
+    def clear(self) -> None:
+        with FileLock(self._lock_path):
+            for meta in self.entries():
+                shutil.rmtree(self._entry(meta["key"]), ignore_errors=True)
@@ -0,0 +1,321 @@
+"""
+Project generation over HTTP, for portals that would otherwise run the CLI per request.
+
+    from generator.server import GenerationServer
+    server = GenerationServer(("127.0.0.1", 8765), workers=4)
+    server.serve_forever()
+
+    POST /generate   {"framework": "nextjs", "features": ["app", "typescript"],
+                      "format": "zip", "name": "portal-app", "variables": {"port": "8080"}}
+    GET  /health     liveness, template source and load
+    GET  /metrics    request counts, archive sizes and generation latency, as JSON
+
+/generate streams the project back as a zip, tar.gz or tar built from the
+template store in memory (see generator/archive.py). Nothing is written to
+disk, and the template index and every planned combination stay loaded between
+requests. The body takes the same keys as a batch entry, without "dir". That
+includes the router/db/language shorthands. "name" becomes project_name and
+the download's file name. Only frameworks and features that the config's
+combinations use are accepted, so a request can never name a path of its
+own in the template store. Connections are served by a fixed pool of worker
+threads. Past `workers + queue` open requests, new connections are answered
+with 503 at once instead of piling up.
+"""
+
+import json
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .archive import CONTENT_TYPES, FORMATS, write_archive
+from .batch import entry_features
+from .combinations import feature_catalog
+from .events import BufferedSink
+from .generate import load_combination
+from .result_cache import appgen_version
+from .store import get_template_store
+from .variables import default_variables, project_slug
+
+MAX_BODY = 64 * 1024
+_BUSY_BODY = b'{"error": "server is busy"}'
+BUSY_RESPONSE = (b"HTTP/1.1 503 Service Unavailable\r\nContent-Type: application/json\r\nRetry-After: 1\r\n"
+                 b"Connection: close\r\nContent-Length: %d\r\n\r\n%s" % (len(_BUSY_BODY), _BUSY_BODY))
+
+
+class RequestError(ValueError):
+    """A /generate request that cannot be served; carries the HTTP status"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class ServerMetrics:
+    """Counters behind /metrics, updated from every worker thread"""
+
+    def __init__(self, window: int = 1000):
+        self.started = time.time()
+        self.in_flight = 0
+        self.rejected = 0
+        self.requests: Counter = Counter()
+        self.statuses: Counter = Counter()
+        self.formats: Counter = Counter()
+        self.frameworks: Counter = Counter()
+        self.archive_bytes = 0
+        self.generate_seconds: deque = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def begin(self) -> None:
+        with self._lock:
+            self.in_flight += 1
+
+    def end(self, path: Optional[str], status: int) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            if status:
+                self.requests[path] += 1
+                self.statuses[str(status)] += 1
+
+    def reject(self) -> None:
+        with self._lock:
+            self.rejected += 1
+            self.statuses["503"] += 1
+
+    def generated(self, framework: str, fmt: str, size: int, seconds: float) -> None:
+        with self._lock:
+            self.frameworks[framework] += 1
+            self.formats[fmt] += 1
+            self.archive_bytes += size
+            self.generate_seconds.append(seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            latencies = sorted(self.generate_seconds)
+
+            def percentile(p: float) -> Optional[float]:
+                return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))], 4) if latencies else None
+
+            return {
+                "uptime_seconds": round(time.time() - self.started, 1),
+                "in_flight": self.in_flight,
+                "rejected": self.rejected,
+                "requests": dict(self.requests),
+                "statuses": dict(self.statuses),
+                "archives": {
+                    "count": sum(self.formats.values()),
+                    "bytes": self.archive_bytes,
+                    "formats": dict(self.formats),
+                    "frameworks": dict(self.frameworks),
+                },
+                "generate_seconds": {"p50": percentile(0.5), "p95": percentile(0.95),
+                                     "max": round(latencies[-1], 4) if latencies else None,
+                                     "window": len(latencies)},
+            }
+
+
+class _ChunkedWriter:
+    """A response body sent with chunked transfer encoding, in chunks of at least `buffer_size`"""
+
+    def __init__(self, wfile, buffer_size: int = 64 * 1024):
+        self.wfile = wfile
+        self.buffer_size = buffer_size
+        self._buffer = bytearray()
+
+    def write(self, data: bytes) -> int:
+        self._buffer += data
+        if len(self._buffer) >= self.buffer_size:
+            self._send()
+        return len(data)
+
+    def flush(self) -> None:
+        # Archive writers flush after every entry; small chunks would only add framing
+        pass
+
+    def _send(self) -> None:
+        if self._buffer:
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(self._buffer), bytes(self._buffer)))
+            self._buffer.clear()
+
+    def close(self) -> None:
+        self._send()
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+
+class GenerationHandler(BaseHTTPRequestHandler):
+    """One request per connection: /health, /metrics and POST /generate"""
+
+    protocol_version = "HTTP/1.1"
+    server_version = "appgen"
+    # Seconds a client may stall mid-request before its worker is freed
+    timeout = 30
+    server: "GenerationServer"
+
+    def handle_one_request(self) -> None:
+        self.status = 0
+        self.server.metrics.begin()
+        try:
+            super().handle_one_request()
+        finally:
+            self.server.metrics.end(getattr(self, "path", None), self.status)
+        # A worker stays with its connection while it is open; don't let an idle keep-alive hold one
+        self.close_connection = True
+
+    def send_response(self, code: int, message: Optional[str] = None) -> None:
+        self.status = code
+        super().send_response(code, message)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status: int, payload: Dict[str, Any]) -> None:
+        body = json.dumps(payload, indent=2).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        if self.path == "/health":
+            self._send_json(200, self.server.health())
+        elif self.path == "/metrics":
+            self._send_json(200, self.server.metrics.snapshot())
+        elif self.path == "/generate":
+            self._send_json(405, {"error": "use POST /generate"})
+        else:
+            self._send_json(404, {"error": f"no such endpoint: {self.path}"})
+
+    def do_POST(self) -> None:
+        if self.path != "/generate":
+            self._send_json(404, {"error": f"no such endpoint: {self.path}"})
+            return
+        started = time.perf_counter()
+        try:
+            request = self.server.parse_request(self._read_body())
+        except RequestError as e:
+            self._send_json(e.status, {"error": str(e)})
+            return
+
+        fmt = request["format"]
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPES[fmt])
+        self.send_header("Content-Disposition", f'attachment; filename="{request["name"]}.{fmt}"')
+        self.send_header("Transfer-Encoding", "chunked")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        body = _ChunkedWriter(self.wfile)
+        # Once the headers are out, a failure can only cut the response short; the client sees no final chunk
+        size = write_archive(request["combination"], fmt, body, self.server.store, request["variables"])
+        body.close()
+        self.server.metrics.generated(request["framework"], fmt, size, time.perf_counter() - started)
+
+    def _read_body(self) -> bytes:
+        try:
+            length = int(self.headers.get("Content-Length", ""))
+        except ValueError:
+            raise RequestError(411, "Content-Length is required") from None
+        if length > MAX_BODY:
+            raise RequestError(413, f"Request body is larger than {MAX_BODY} bytes")
+        return self.rfile.read(length)
+
+
+class GenerationServer(HTTPServer):
+    """HTTP server that hands each connection to a bounded pool of worker threads"""
+
+    def __init__(self, address: Tuple[str, int], workers: int = 4, queue: int = 16, store=None, verbose: bool = False,
+                 combinations: Optional[List[Dict[str, Any]]] = None):
+        if combinations is None:
+            from .pack import load_build_combinations
+            combinations = load_build_combinations()
+        self.store = store or get_template_store()
+        self.catalog = feature_catalog(combinations)
+        self.workers = workers
+        self.queue = queue
+        self.verbose = verbose
+        self.metrics = ServerMetrics()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="appgen-serve")
+        self._slots = threading.BoundedSemaphore(workers + queue)
+        self._plan = lru_cache(maxsize=256)(self._load_combination)
+        super().__init__(address, GenerationHandler)
+
+    def _load_combination(self, framework: str, features: Tuple[str, ...]) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """(combination, None), or (None, error) for an invalid one; memoised per server"""
+        if framework not in self.catalog or not self.store.has_dir(framework):
+            return None, f"Unknown framework '{framework}'"
+        unknown = [feature for feature in features if feature not in self.catalog[framework]]
+        if unknown:
+            return None, f"Unknown feature '{unknown[0]}' for {framework}. Valid options: {', '.join(sorted(self.catalog[framework]))}"
+        events = BufferedSink()
+        combination = load_combination(framework, list(features), self.store, events)
+        if combination is None:
+            invalid = [data["message"] for kind, data in events.events if kind == "invalid"]
+            return None, invalid[0] if invalid else "Invalid framework/feature combination"
+        return combination, None
+
+    def parse_request(self, body: bytes) -> Dict[str, Any]:
+        """Validate a /generate body and plan it; raises RequestError"""
+        try:
+            entry = json.loads(body or b"{}")
+        except ValueError as e:
+            raise RequestError(400, f"Request body is not valid JSON: {e}") from None
+        if not isinstance(entry, dict) or not entry.get("framework"):
+            raise RequestError(400, "Request body needs a 'framework'")
+        framework = str(entry["framework"]).lower()
+        fmt = str(entry.get("format") or "zip")
+        if fmt not in FORMATS:
+            raise RequestError(400, f"Unknown format '{fmt}'. Valid options: {', '.join(FORMATS)}")
+        if not isinstance(entry.get("variables") or {}, dict):
+            raise RequestError(400, "'variables' must be an object")
+        features = tuple(entry_features(entry))
+        # Names become template keys; anything that could step out of the framework's directory is refused outright
+        for name in (framework,) + features:
+            if not name or "/" in name or "\\" in name or ".." in name:
+                raise RequestError(400, f"Invalid name '{name}'")
+        combination, error = self._plan(framework, features)
+        if combination is None:
+            raise RequestError(400, error)
+        name = project_slug(str(entry.get("name") or f"{framework}-app"))
+        variables = {str(key): str(value) for key, value in (entry.get("variables") or {}).items()}
+        try:
+            variables = default_variables(Path(name), variables)
+        except ValueError as e:
+            raise RequestError(400, str(e)) from None
+        return {"framework": framework, "format": fmt, "name": name, "combination": combination,
+                "variables": variables}
+
+    def health(self) -> Dict[str, Any]:
+        return {"status": "ok", "version": appgen_version(), "templates": self.store.location,
+                "workers": self.workers, "queue": self.queue, "in_flight": self.metrics.in_flight,
+                "combinations_loaded": self._plan.cache_info().currsize}
+
+    def process_request(self, request, client_address) -> None:
+        if not self._slots.acquire(blocking=False):
+            self.metrics.reject()
+            try:
+                request.sendall(BUSY_RESPONSE)
+            except OSError:
+                pass
+            self.shutdown_request(request)
+            return
+        self._pool.submit(self._process, request, client_address)
+
+    def _process(self, request, client_address) -> None:
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self._slots.release()
+
+    def server_close(self) -> None:
+        super().server_close()
+        self._pool.shutdown(wait=True)
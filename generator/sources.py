@@ -0,0 +1,287 @@
+"""
+Template sources beyond the built-in templates, searched as a path.
+
+    templates:
+      sources:
+        - ~/work/templates                               # a directory, used in place
+        - path: /opt/appgen/acme-templates.tar.zst       # an archive
+          sha256: 9f2c...                                # pinned: refuse anything else
+        - path: /opt/appgen/acme-templates.bundle        # a git bundle
+          ref: v3
+
+Sources are searched in order, then the built-in templates. The first source
+that has a template file wins, so a source can add overlays or replace single
+files of built-in ones. Archives (.tar.zst, .tar.gz, .tgz, .tar) and git bundles
+are unpacked once into ~/.cache/appgen/sources/<sha256>, keyed by the sha256
+of the archive itself. A pinned source whose file no longer hashes to its pin
+is an error. The cache index records each archive's (size, mtime), so the
+archive is only re-hashed after it changes. It also records when each
+unpacked tree was last used, and the least recently used trees are evicted
+once the cache grows past its size budget. .tar.zst needs the optional
+`zstandard` package (pip install appgen[zstd]).
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import tarfile
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from .blobs import default_cache_dir
+from .result_cache import FileLock
+from .store import DirectoryStore
+
+DEFAULT_CACHE_BYTES = 1024 * 1024 * 1024
+TAR_SUFFIXES = (".tar.zst", ".tzst", ".tar.gz", ".tgz", ".tar")
+BUNDLE_SUFFIXES = (".bundle",)
+
+
+class SourceError(ValueError):
+    """A template source is missing, unreadable, or does not match its pin"""
+
+
+def normalize_source(spec: Union[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Turn a config entry into {path, kind, sha256, ref, subdir}"""
+    if isinstance(spec, str):
+        spec = {"path": spec}
+    if not spec.get("path"):
+        raise SourceError(f"Template sources need a 'path': {spec}")
+    path = Path(os.path.expandvars(str(spec["path"]))).expanduser()
+    name = path.name.lower()
+    if path.is_dir():
+        kind = "directory"
+    elif name.endswith(TAR_SUFFIXES):
+        kind = "tar"
+    elif name.endswith(BUNDLE_SUFFIXES):
+        kind = "bundle"
+    elif not path.exists():
+        raise SourceError(f"Template source not found: {path}")
+    else:
+        raise SourceError(f"Unsupported template source {path}; use a directory, "
+                          f"{', '.join(TAR_SUFFIXES)} or a git {', '.join(BUNDLE_SUFFIXES)}")
+    return {"path": path, "kind": kind, "sha256": (spec.get("sha256") or "").lower() or None,
+            "ref": spec.get("ref"), "subdir": spec.get("subdir")}
+
+
+def file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _tree_bytes(root: Path) -> int:
+    return sum(f.stat().st_size for f in root.rglob("*") if f.is_file() and not f.is_symlink())
+
+
+def _extract_tar(archive: Path, dest: Path) -> None:
+    with open(archive, "rb") as raw:
+        if archive.name.lower().endswith((".tar.zst", ".tzst")):
+            try:
+                import zstandard
+            except ImportError:
+                raise SourceError(f"{archive} needs the 'zstandard' package: pip install appgen[zstd]") from None
+            stream = zstandard.ZstdDecompressor().stream_reader(raw)
+            tar = tarfile.open(fileobj=stream, mode="r|")
+        else:
+            tar = tarfile.open(fileobj=raw, mode="r|*")
+        with tar:
+            if hasattr(tarfile, "data_filter"):
+                tar.extractall(dest, filter="data")
+            else:
+                for member in tar:
+                    target = (dest / member.name).resolve()
+                    if not str(target).startswith(str(dest.resolve()) + os.sep) or member.issym() or member.islnk():
+                        raise SourceError(f"{archive}: refusing to extract {member.name}")
+                    tar.extract(member, dest)
+
+
+def _extract_bundle(bundle: Path, dest: Path, ref: Optional[str]) -> None:
+    command = ["git", "clone", "--quiet"]
+    if ref:
+        command += ["--branch", ref]
+    checkout = dest / "checkout"
+    try:
+        subprocess.run(command + [str(bundle), str(checkout)], check=True, capture_output=True, text=True)
+    except FileNotFoundError:
+        raise SourceError(f"{bundle} is a git bundle, but git is not on PATH") from None
+    except subprocess.CalledProcessError as e:
+        raise SourceError(f"Could not unpack {bundle}: {e.stderr.strip()}") from None
+    shutil.rmtree(checkout / ".git")
+    for child in checkout.iterdir():
+        os.replace(child, dest / child.name)
+    checkout.rmdir()
+
+
+class SourceCache:
+    """Unpacked template sources under <root>/<sha256>, trimmed least-recently-used first to a size budget"""
+
+    def __init__(self, root: Optional[Path] = None, max_bytes: int = DEFAULT_CACHE_BYTES):
+        self.root = Path(root) if root else default_cache_dir() / "sources"
+        self.max_bytes = max_bytes
+        self._lock_path = self.root / ".lock"
+        self._index_path = self.root / "index.json"
+
+    def _read_index(self) -> Dict[str, Any]:
+        try:
+            index = json.loads(self._index_path.read_text())
+        except (FileNotFoundError, ValueError):
+            index = {}
+        index.setdefault("archives", {})
+        index.setdefault("entries", {})
+        return index
+
+    def _write_index(self, index: Dict[str, Any]) -> None:
+        tmp = self._index_path.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps(index, indent=2, sort_keys=True))
+        os.replace(tmp, self._index_path)
+
+    def _archive_sha(self, index: Dict[str, Any], path: Path) -> str:
+        """sha256 of an archive, re-hashed only when its (size, mtime) changed"""
+        st = path.stat()
+        known = index["archives"].get(str(path))
+        if known and known["size"] == st.st_size and known["mtime_ns"] == st.st_mtime_ns:
+            return known["sha256"]
+        digest = file_sha256(path)
+        index["archives"][str(path)] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": digest}
+        return digest
+
+    def unpack(self, source: Dict[str, Any], keep: Tuple[str, ...] = ()) -> Tuple[Path, str]:
+        """Return (unpacked tree, archive sha256) for an archive or bundle source, unpacking it on a miss"""
+        path = source["path"]
+        if not path.is_file():
+            raise SourceError(f"Template source not found: {path}")
+        with FileLock(self._lock_path):
+            index = self._read_index()
+            digest = self._archive_sha(index, path)
+            if source["sha256"] and digest != source["sha256"]:
+                raise SourceError(f"{path} has sha256 {digest}, but the config pins {source['sha256']}")
+            # The ref is part of what a bundle unpacks to
+            entry_key = digest if source["kind"] != "bundle" else f"{digest}-{source['ref'] or 'HEAD'}"
+            tree = self.root / entry_key
+            if entry_key not in index["entries"] or not tree.is_dir():
+                tmp = Path(tempfile.mkdtemp(dir=self.root, prefix=".unpack-"))
+                try:
+                    if source["kind"] == "bundle":
+                        _extract_bundle(path, tmp, source["ref"])
+                    else:
+                        _extract_tar(path, tmp)
+                    if tree.exists():
+                        shutil.rmtree(tree)
+                    os.replace(tmp, tree)
+                except BaseException:
+                    shutil.rmtree(tmp, ignore_errors=True)
+                    raise
+                index["entries"][entry_key] = {"source": str(path), "bytes": _tree_bytes(tree)}
+            index["entries"][entry_key]["last_used"] = time.time()
+            self._evict(index, keep + (entry_key,))
+            self._write_index(index)
+        return tree, digest
+
+    def _evict(self, index: Dict[str, Any], keep: Tuple[str, ...]) -> None:
+        entries = index["entries"]
+        total = sum(entry["bytes"] for entry in entries.values())
+        for entry_key in sorted(entries, key=lambda k: entries[k].get("last_used", 0)):
+            if total <= self.max_bytes:
+                break
+            if entry_key in keep:
+                continue
+            shutil.rmtree(self.root / entry_key, ignore_errors=True)
+            total -= entries.pop(entry_key)["bytes"]
+
+    def entries(self) -> Dict[str, Dict[str, Any]]:
+        with FileLock(self._lock_path, exclusive=False):
+            return self._read_index()["entries"]
+
+
+class LayeredStore:
+    """Several template stores searched in order; the first that has a file provides it"""
+
+    def __init__(self, stores: List[Any]):
+        self.stores = stores
+
+    @property
+    def location(self) -> str:
+        return os.pathsep.join(store.location for store in self.stores)
+
+    def _owner(self, key: str):
+        for store in self.stores:
+            if store.exists(key):
+                return store
+        raise FileNotFoundError(f"No template source has {key}")
+
+    def has_dir(self, key: str) -> bool:
+        return any(store.has_dir(key) for store in self.stores)
+
+    def exists(self, key: str) -> bool:
+        return any(store.exists(key) for store in self.stores)
+
+    def walk(self, key: str) -> Iterator[Tuple[str, str]]:
+        """Yield (path relative to `key`, template key) for every file under `key` in any source, sorted"""
+        seen = {}
+        for store in self.stores:
+            if store.has_dir(key):
+                for rel_path, full_key in store.walk(key):
+                    seen.setdefault(rel_path, full_key)
+        for rel_path in sorted(seen):
+            yield rel_path, seen[rel_path]
+
+    def keys(self) -> Iterator[str]:
+        return iter(sorted({key for store in self.stores for key in store.keys()}))
+
+    def digest(self, key: str) -> str:
+        return self._owner(key).digest(key)
+
+    def known_digest(self, key: str) -> Optional[str]:
+        return self._owner(key).known_digest(key)
+
+    def size(self, key: str) -> int:
+        return self._owner(key).size(key)
+
+    def mode(self, key: str) -> int:
+        return self._owner(key).mode(key)
+
+    def read_bytes(self, key: str) -> bytes:
+        return self._owner(key).read_bytes(key)
+
+    def chunks(self, key: str, *args: Any) -> Iterator[bytes]:
+        return self._owner(key).chunks(key, *args)
+
+    def placeholders(self, key: str) -> Tuple[str, ...]:
+        return self._owner(key).placeholders(key)
+
+    def materialize(self, key: str, dest: Path, copy_mode: str = "auto") -> str:
+        return self._owner(key).materialize(key, dest, copy_mode)
+
+    def render(self, key: str, dest: Path, variables: dict) -> str:
+        return self._owner(key).render(key, dest, variables)
+
+    def combination(self, framework: str, features: list) -> Optional[Dict[str, Any]]:
+        """The last store's prebuilt plan, unless an earlier source has templates for this framework"""
+        if any(store.has_dir(framework) for store in self.stores[:-1]):
+            return None
+        return self.stores[-1].combination(framework, features)
+
+
+def open_sources(specs: List[Union[str, Dict[str, Any]]], cache: Optional[SourceCache] = None) -> List[DirectoryStore]:
+    """A DirectoryStore per configured source, in search order, unpacking archives through `cache`"""
+    cache = cache or SourceCache()
+    sources = [normalize_source(spec) for spec in specs]
+    stores = []
+    unpacked: Tuple[str, ...] = ()
+    for source in sources:
+        if source["kind"] == "directory":
+            root = source["path"]
+        else:
+            root, digest = cache.unpack(source, keep=unpacked)
+            unpacked += (root.name,)
+        if source["subdir"]:
+            root = root / source["subdir"]
+        stores.append(DirectoryStore(root))
+    return stores
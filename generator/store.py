@@ -0,0 +1,263 @@
+"""
+Template stores: where generate_project reads template files from.
+
+Templates are addressed by posix keys relative to the templates root, such as
+"nextjs/app-typescript/app/page.tsx". Installed packages read them from the
+packed archive next to this module (see generator/pack.py); a source checkout
+without a built pack, or whose pack is older than its templates, falls back
+to the loose templates/ tree. configure_template_sources() points the base at
+another directory and puts extra sources in front of it (see
+generator/sources.py).
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+
+from . import trace
+from .copy_engine import copy_file
+from .variables import CHUNK_SIZE, render_file, scan
+
+TEMPLATE_DIR = Path(__file__).parent.parent / "templates"
+PACK_PATH = Path(__file__).parent / "templates.pack"
+
+
+class DirectoryStore:
+    """Templates read from a loose directory tree"""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self._digests = {}
+        self._placeholders = {}
+
+    @property
+    def location(self) -> str:
+        return str(self.root)
+
+    def _inside(self, key: str) -> bool:
+        """Whether `key` names a path under the root, after resolving ".." and symlinks"""
+        try:
+            (self.root / key).resolve().relative_to(self.root.resolve())
+        except ValueError:
+            return False
+        return True
+
+    def has_dir(self, key: str) -> bool:
+        return self._inside(key) and (self.root / key).is_dir()
+
+    def exists(self, key: str) -> bool:
+        return (self.root / key).is_file()
+
+    def walk(self, key: str) -> Iterator[Tuple[str, str]]:
+        """Yield (path relative to `key`, template key) for every file under `key`, sorted"""
+        if not self._inside(key):
+            raise ValueError(f"Template key '{key}' is outside {self.root}")
+        top = self.root / key
+        for dirpath, dirnames, filenames in os.walk(top):
+            dirnames.sort()
+            rel_dir = Path(dirpath).relative_to(top)
+            for fname in sorted(filenames):
+                rel_path = (rel_dir / fname).as_posix()
+                yield rel_path, f"{key}/{rel_path}"
+
+    def keys(self) -> Iterator[str]:
+        """Every template key in the tree, sorted, skipping Finder metadata"""
+        keys = []
+        for dirpath, _, filenames in os.walk(self.root):
+            for fname in filenames:
+                if fname != ".DS_Store":
+                    keys.append((Path(dirpath) / fname).relative_to(self.root).as_posix())
+        return iter(sorted(keys))
+
+    def digest(self, key: str) -> str:
+        """sha256 of a template file, memoised on its (mtime, size, inode)"""
+        st = (self.root / key).stat()
+        signature = (st.st_mtime_ns, st.st_size, st.st_ino)
+        cached = self._digests.get(key)
+        if cached and cached[0] == signature:
+            return cached[1]
+        digest = hashlib.sha256(self.read_bytes(key)).hexdigest()
+        self._digests[key] = (signature, digest)
+        return digest
+
+    def known_digest(self, key: str) -> Optional[str]:
+        """digest() if it is already memoised for the file as it is now, else None; never reads the file"""
+        st = (self.root / key).stat()
+        cached = self._digests.get(key)
+        if cached and cached[0] == (st.st_mtime_ns, st.st_size, st.st_ino):
+            return cached[1]
+        return None
+
+    def size(self, key: str) -> int:
+        return (self.root / key).stat().st_size
+
+    def mode(self, key: str) -> int:
+        return (self.root / key).stat().st_mode & 0o777
+
+    def read_bytes(self, key: str) -> bytes:
+        return (self.root / key).read_bytes()
+
+    def chunks(self, key: str, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        with open(self.root / key, "rb") as f:
+            yield from iter(lambda: f.read(chunk_size), b"")
+
+    def placeholders(self, key: str) -> Tuple[str, ...]:
+        """Variables a template file uses, memoised like digest()"""
+        st = (self.root / key).stat()
+        signature = (st.st_mtime_ns, st.st_size, st.st_ino)
+        cached = self._placeholders.get(key)
+        if cached and cached[0] == signature:
+            return cached[1]
+        names = scan(key, self.chunks(key))
+        self._placeholders[key] = (signature, names)
+        return names
+
+    def materialize(self, key: str, dest: Path, copy_mode: str = "auto") -> str:
+        """Write template `key` to `dest`; return the copy strategy used"""
+        return copy_file(self.root / key, dest, copy_mode)
+
+    def render(self, key: str, dest: Path, variables: dict) -> str:
+        """Write template `key` to `dest` with its placeholders substituted"""
+        render_file(self.chunks(key), dest, variables)
+        os.chmod(dest, (self.root / key).stat().st_mode & 0o777)
+        return "render"
+
+    def combination(self, framework: str, features: list) -> None:
+        """Loose trees have no prebuilt combination index; generation plans from the files"""
+        return None
+
+
+def template_signature(root: Path) -> str:
+    """Cheap fingerprint of a loose template tree from every file's path, size and mtime"""
+    h = hashlib.sha256()
+    for key in DirectoryStore(root).keys():
+        st = (root / key).stat()
+        h.update(f"{key}\0{st.st_size}\0{st.st_mtime_ns}\n".encode())
+    return h.hexdigest()
+
+
+def template_stats(store) -> dict:
+    """Summarise how much content-addressing saves over storing every variant's files separately"""
+    total_files = 0
+    total_bytes = 0
+    blobs = {}
+    frameworks = {}
+    for key in store.keys():
+        digest = store.digest(key)
+        size = store.size(key)
+        total_files += 1
+        total_bytes += size
+        blobs.setdefault(digest, {"size": size, "keys": []})["keys"].append(key)
+        framework = frameworks.setdefault(key.split("/", 1)[0], {"files": 0, "bytes": 0, "blobs": set()})
+        framework["files"] += 1
+        framework["bytes"] += size
+        framework["blobs"].add(digest)
+
+    unique_bytes = sum(blob["size"] for blob in blobs.values())
+    duplicates = sorted(
+        ({"sha256": digest, "size": blob["size"], "copies": len(blob["keys"]), "keys": blob["keys"]}
+         for digest, blob in blobs.items() if len(blob["keys"]) > 1),
+        key=lambda d: d["size"] * (d["copies"] - 1),
+        reverse=True,
+    )
+    return {
+        "source": store.location,
+        "files": total_files,
+        "bytes": total_bytes,
+        "unique_blobs": len(blobs),
+        "unique_bytes": unique_bytes,
+        "saved_bytes": total_bytes - unique_bytes,
+        "frameworks": {
+            name: {
+                "files": info["files"],
+                "bytes": info["bytes"],
+                "unique_bytes": sum(blobs[d]["size"] for d in info["blobs"]),
+            }
+            for name, info in sorted(frameworks.items())
+        },
+        "duplicates": duplicates,
+    }
+
+
+def load_template_json(store, key: str):
+    """Parse a JSON template file, or return {} if the store does not have it"""
+    if store.exists(key):
+        return json.loads(store.read_bytes(key))
+    return {}
+
+
+_default_store = None
+# (base directory or None for the built-in templates, extra sources, source cache size)
+_configured: Tuple[Optional[Path], tuple, Optional[int]] = (None, (), None)
+
+
+def _builtin_store():
+    """The built pack if present, else the loose tree"""
+    if PACK_PATH.exists():
+        from .pack import PackStore
+        store = PackStore(PACK_PATH)
+        # In a source checkout, a pack built before the templates last changed is stale
+        if TEMPLATE_DIR.is_dir() and store.signature != template_signature(TEMPLATE_DIR):
+            store = DirectoryStore(TEMPLATE_DIR)
+        return store
+    return DirectoryStore(TEMPLATE_DIR)
+
+
+def get_template_store():
+    """Return the process-wide template store: the configured sources in front of the base templates"""
+    global _default_store
+    if _default_store is None:
+        with trace.span("store.open"):
+            base_path, sources, cache_bytes = _configured
+            base = DirectoryStore(base_path) if base_path is not None else _builtin_store()
+            if sources:
+                from .sources import DEFAULT_CACHE_BYTES, LayeredStore, SourceCache, open_sources
+                cache = SourceCache(max_bytes=cache_bytes or DEFAULT_CACHE_BYTES)
+                base = LayeredStore(open_sources(list(sources), cache) + [base])
+            _default_store = base
+    return _default_store
+
+
+def template_base_dir() -> Path:
+    """The loose template tree behind the base store (what a built pack is made from)"""
+    return _configured[0] or TEMPLATE_DIR
+
+
+def configure_template_sources(base_path: Optional[str] = None, sources: Optional[list] = None,
+                               cache_max_bytes: Optional[int] = None) -> None:
+    """Set where get_template_store() reads templates from; opened lazily on first use.
+
+    A relative `base_path` is taken relative to the directory holding the
+    built-in templates/, so "templates" (the default) means the built-in set.
+    `sources` are searched before it, in order.
+    """
+    global _configured, _default_store
+    base = None
+    if base_path:
+        path = Path(os.path.expanduser(base_path))
+        path = path if path.is_absolute() else TEMPLATE_DIR.parent / path
+        if path.resolve() != TEMPLATE_DIR.resolve():
+            base = path
+    _configured = (base, tuple(sources or ()), cache_max_bytes)
+    _default_store = None
+
+
+def template_configuration() -> Tuple[Optional[Path], tuple, Optional[int]]:
+    """What configure_template_sources() set, for handing on to worker processes"""
+    return _configured
+
+
+def set_template_configuration(configured: Tuple[Optional[Path], tuple, Optional[int]]) -> None:
+    """Apply a template_configuration() from another process; a no-op if it already applies"""
+    global _configured, _default_store
+    if configured != _configured:
+        _configured = configured
+        _default_store = None
+
+
+def set_template_store(store: Optional[object]) -> None:
+    """Override the process-wide template store; None restores auto-detection"""
+    global _default_store
+    _default_store = store
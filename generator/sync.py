@@ -0,0 +1,105 @@
+"""
+Incremental re-sync of a generated project against the current templates.
+
+    from generator.sync import sync_project
+    report = sync_project("services/billing", dry_run=True)
+
+For every file the project's .appgen/manifest.json records, or that the
+current templates would write, three hashes are compared: the one recorded
+at generation, the one the templates give now, and the file on disk. Files
+whose template has not changed are skipped without being read. A file whose
+template changed is rewritten only if the copy on disk still matches the
+manifest, i.e. nobody edited it. Edited files are reported as conflicts and
+left alone, and keep their old manifest hash so the next sync reports them
+again. New template files are added, and files dropped from the templates
+are deleted unless they were edited.
+"""
+
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .events import NullSink
+from .generate import combination_files, load_combination, lockfile_output, package_json_bytes
+from .lockfile import LOCKFILE_NAME
+from .manifest import build_manifest, file_digest, read_manifest, write_manifest
+from .result_cache import appgen_version
+from .store import get_template_store
+from .variables import default_variables
+
+
+def _write(rel_path: str, combination: Dict[str, Any], target_path: Path, store, copy_mode: str, variables: Dict[str, str]) -> None:
+    dest = target_path / rel_path
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    # Never write through the old file: it may be hardlinked to a template or cache entry
+    if dest.exists():
+        dest.unlink()
+    if rel_path == "package.json":
+        dest.write_bytes(package_json_bytes(combination["package_json"], variables))
+    elif rel_path == LOCKFILE_NAME and combination["lockfile"] is not None:
+        dest.write_bytes(lockfile_output(combination, variables))
+    elif store.placeholders(combination["plan"][rel_path]):
+        store.render(combination["plan"][rel_path], dest, variables)
+    else:
+        store.materialize(combination["plan"][rel_path], dest, copy_mode)
+
+
+def sync_project(target_dir: str, dry_run: bool = False, copy_mode: str = "auto") -> Dict[str, Any]:
+    """Bring a generated project up to date with the templates; return what changed.
+
+    The report lists paths under "added", "updated", "removed" and "current"
+    (already matching the new templates) and {path, reason} under "conflicts";
+    "unchanged" counts files whose template did not change. Raises ValueError
+    if the project has no manifest or its combination is no longer valid.
+    """
+    target_path = Path(target_dir).resolve()
+    manifest = read_manifest(target_path)
+    if manifest is None:
+        raise ValueError(f"{target_path} has no .appgen/manifest.json; it was not generated by this appgen version")
+
+    store = get_template_store()
+    framework, features = manifest["framework"], manifest["features"]
+    # Re-render with the variables the project was generated with
+    variables = default_variables(target_path, manifest.get("variables"))
+    combination = load_combination(framework, features, store, NullSink())
+    if combination is None:
+        raise ValueError(f"{framework} with {features or 'no features'} is no longer a valid combination")
+
+    old_files: Dict[str, str] = manifest["files"]
+    new_files = combination_files(combination, store, variables)
+    report = {"target": str(target_path), "framework": framework, "features": features,
+              "from_version": manifest.get("template_version"), "to_version": appgen_version(),
+              "dry_run": dry_run, "added": [], "updated": [], "removed": [], "current": [],
+              "conflicts": [], "unchanged": 0}
+    recorded: Dict[str, Optional[str]] = dict(old_files)
+
+    for rel_path in sorted(set(old_files) | set(new_files)):
+        old, new = old_files.get(rel_path), new_files.get(rel_path)
+        if old == new:
+            report["unchanged"] += 1
+            continue
+        current = file_digest(target_path / rel_path)
+        if current == new:
+            report["current"].append(rel_path)
+            recorded[rel_path] = new
+        elif new is None:
+            if current is None or current == old:
+                report["removed"].append(rel_path)
+                recorded[rel_path] = None
+                if current is not None and not dry_run:
+                    (target_path / rel_path).unlink()
+            else:
+                report["conflicts"].append({"path": rel_path, "reason": "removed from templates but edited locally"})
+        elif current != old:
+            reason = "deleted locally" if current is None else (
+                "exists locally" if old is None else "edited locally")
+            report["conflicts"].append({"path": rel_path, "reason": f"changed in templates but {reason}"})
+        else:
+            report["added" if old is None else "updated"].append(rel_path)
+            recorded[rel_path] = new
+            if not dry_run:
+                _write(rel_path, combination, target_path, store, copy_mode, variables)
+
+    if not dry_run:
+        files = {rel_path: digest for rel_path, digest in recorded.items() if digest is not None}
+        write_manifest(target_path, build_manifest(framework, features, appgen_version(), files, variables))
+    return report
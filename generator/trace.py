@@ -0,0 +1,131 @@
+"""
+Span tracing for `--profile`.
+
+    from generator import trace
+    with trace.span("plan", overlays=3):
+        ...
+
+Tracing is off unless a Tracer is installed with enable(). While it is off,
+span() hands back one shared no-op context manager and record() returns
+straight away, so instrumented code pays a global lookup per call. An
+enabled Tracer keeps complete spans from every thread and saves them in
+Chrome trace-event format, which chrome://tracing and Perfetto can open.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import nullcontext
+from typing import Any, Dict, List, Optional
+
+_NULL_SPAN = nullcontext()
+_tracer: Optional["Tracer"] = None
+
+
+class Tracer:
+    """Collects complete spans (Chrome "X" events) with microsecond timestamps"""
+
+    def __init__(self):
+        self.events: List[Dict[str, Any]] = []
+        self.origin = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def record(self, name: str, start: float, end: float, **args: Any) -> None:
+        """Add a span measured with time.perf_counter()"""
+        event = {
+            "name": name,
+            "cat": name.split(".", 1)[0],
+            "ph": "X",
+            "ts": round((start - self.origin) * 1e6, 3),
+            "dur": round((end - start) * 1e6, 3),
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+        }
+        if args:
+            event["args"] = args
+        with self._lock:
+            self.events.append(event)
+
+    def span(self, name: str, **args: Any) -> "_Span":
+        return _Span(self, name, args)
+
+    def to_chrome(self) -> Dict[str, Any]:
+        """The trace as a Chrome trace-event document"""
+        main = threading.main_thread().ident
+        threads = {main: "main"}
+        for event in self.events:
+            threads.setdefault(event["tid"], f"worker-{len(threads)}")
+        pid = os.getpid()
+        metadata = [{"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": "appgen"}}]
+        metadata += [
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": label}}
+            for tid, label in threads.items()
+        ]
+        return {"traceEvents": metadata + sorted(self.events, key=lambda e: e["ts"]), "displayTimeUnit": "ms"}
+
+    def save(self, path: str) -> None:
+        with open(path, "w") as f:
+            json.dump(self.to_chrome(), f)
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """Per span name: call count and total/mean/max milliseconds, slowest total first"""
+        totals: Dict[str, Dict[str, Any]] = {}
+        for event in self.events:
+            entry = totals.setdefault(event["name"], {"name": event["name"], "calls": 0, "total_ms": 0.0, "max_ms": 0.0})
+            ms = event["dur"] / 1000
+            entry["calls"] += 1
+            entry["total_ms"] += ms
+            entry["max_ms"] = max(entry["max_ms"], ms)
+        for entry in totals.values():
+            entry["mean_ms"] = entry["total_ms"] / entry["calls"]
+        return sorted(totals.values(), key=lambda e: -e["total_ms"])
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "args", "start")
+
+    def __init__(self, tracer: Tracer, name: str, args: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+
+    def __enter__(self) -> "_Span":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        self.tracer.record(self.name, self.start, time.perf_counter(), **self.args)
+
+
+def enable() -> Tracer:
+    """Start collecting spans in this process and return the tracer"""
+    global _tracer
+    _tracer = Tracer()
+    return _tracer
+
+
+def disable() -> Optional[Tracer]:
+    """Stop collecting spans; return the tracer that was active"""
+    global _tracer
+    tracer, _tracer = _tracer, None
+    return tracer
+
+
+def active() -> bool:
+    return _tracer is not None
+
+
+def span(name: str, **args: Any):
+    """Context manager timing a block, or a shared no-op when tracing is off"""
+    if _tracer is None:
+        return _NULL_SPAN
+    return _tracer.span(name, **args)
+
+
+def record(name: str, start: float, end: float, **args: Any) -> None:
+    """Record an already-measured span if tracing is on"""
+    if _tracer is not None:
+        _tracer.record(name, start, end, **args)
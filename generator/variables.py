@@ -0,0 +1,163 @@
+"""
+Template variables: placeholders substituted while template files are written.
+
+A template marks a value as a variable with
+
+    {{appgen.<name>|<default>}}
+
+such as `"name": "{{appgen.project_name|react-app}}"` in a package.json, or
+`process.env.PORT || {{appgen.port|3000}}`. Where the variable is not given,
+the placeholder becomes its default. One without a default, and no value,
+is left as it is. Generation always sets `project_name`, from the target
+directory unless it is given explicitly.
+
+Values land unescaped in JS source, .env files and string literals, so
+check_variables() rejects any that would need escaping there: quotes,
+backslashes, backticks and control characters. `port` must be a port
+number, since templates use it as a bare JS number.
+
+Each template file is scanned for placeholders once (DirectoryStore memoises
+the scan, the template pack records it at build time). Files without
+placeholders and binary assets keep the zero-copy materialize path. The rest
+are rendered chunk by chunk as they are written, so nothing is rewritten
+afterwards.
+"""
+
+import json
+import re
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+from .copy_engine import unlink_existing
+
+PLACEHOLDER = re.compile(rb"\{\{appgen\.([a-z_][a-z0-9_]*)(?:\|([^{}\r\n]*))?\}\}")
+MARKER = b"{{appgen."
+# A placeholder longer than this is not recognised when it straddles two chunks
+MAX_PLACEHOLDER = 512
+CHUNK_SIZE = 1 << 16
+
+# Characters a value can't hold: they would need escaping in a JS, JSON or .env string
+UNSAFE_VALUE = re.compile(r"[\"'`\\\x00-\x1f\x7f]")
+
+# Never scanned: these formats cannot hold a placeholder
+BINARY_SUFFIXES = {
+    ".jpg", ".jpeg", ".png", ".gif", ".webp", ".ico", ".avif", ".bmp", ".pdf",
+    ".woff", ".woff2", ".ttf", ".otf", ".eot", ".zip", ".gz", ".tgz", ".bz2", ".xz", ".zst",
+    ".mp3", ".mp4", ".webm", ".wasm", ".db", ".sqlite",
+}
+
+
+def is_binary(key: str, head: bytes) -> bool:
+    """Binary by suffix, or by a NUL byte in the first chunk"""
+    return Path(key).suffix.lower() in BINARY_SUFFIXES or b"\0" in head[:8192]
+
+
+def scan(key: str, chunks: Iterable[bytes]) -> Tuple[str, ...]:
+    """Names of the variables a template file uses, sorted; () for binary or placeholder-free files"""
+    names = set()
+    carry = b""
+    first = True
+    for chunk in chunks:
+        if first:
+            if is_binary(key, chunk):
+                return ()
+            first = False
+        data = carry + chunk
+        names.update(m.group(1).decode() for m in PLACEHOLDER.finditer(data))
+        carry = data[-MAX_PLACEHOLDER:]
+    return tuple(sorted(names))
+
+
+def project_slug(name: str) -> str:
+    """A directory name turned into a valid npm package name"""
+    slug = re.sub(r"[^a-z0-9._-]+", "-", name.lower()).strip("-._")
+    return slug or "app"
+
+
+def check_variables(variables: Dict[str, str]) -> None:
+    """Raise ValueError for a value templates can't hold as is"""
+    for name, value in variables.items():
+        if UNSAFE_VALUE.search(value):
+            raise ValueError(f"Invalid value for '{name}': quotes, backslashes, backticks and control characters are not allowed")
+        if name == "port" and not (value.isdigit() and 1 <= int(value) <= 65535):
+            raise ValueError(f"Invalid port '{value}'; expected a number from 1 to 65535")
+
+
+def default_variables(target_path: Path, variables: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """`variables` as strings, with project_name defaulting to the target directory's slug.
+
+    Raises ValueError if a value fails check_variables().
+    """
+    merged = {"project_name": project_slug(Path(target_path).name)}
+    merged.update({name: str(value) for name, value in (variables or {}).items()})
+    check_variables(merged)
+    return merged
+
+
+def parse_assignments(assignments: Iterable[str]) -> Dict[str, str]:
+    """Parse NAME=VALUE strings; raises ValueError on anything else, or on a value check_variables() rejects"""
+    variables = {}
+    for assignment in assignments:
+        name, sep, value = assignment.partition("=")
+        name = name.strip().lower().replace("-", "_")
+        if not sep or not re.fullmatch(r"[a-z_][a-z0-9_]*", name):
+            raise ValueError(f"Invalid variable '{assignment}'; expected NAME=VALUE")
+        variables[name] = value
+    check_variables(variables)
+    return variables
+
+
+def json_string(value: str) -> str:
+    """`value` escaped for use inside a JSON string literal"""
+    return json.dumps(value)[1:-1]
+
+
+def _substitute(data: bytes, variables: Dict[str, str], quote=None) -> bytes:
+    def replace(match: "re.Match") -> bytes:
+        name = match.group(1).decode()
+        if name in variables:
+            value = variables[name]
+        elif match.group(2) is not None:
+            return match.group(2)
+        else:
+            return match.group(0)
+        return (quote(value) if quote else value).encode("utf-8")
+
+    return PLACEHOLDER.sub(replace, data)
+
+
+def render(data: bytes, variables: Dict[str, str], quote=None) -> bytes:
+    """Substitute every placeholder in `data`; `quote` escapes values (json_string for JSON)"""
+    if MARKER not in data:
+        return data
+    return _substitute(data, variables, quote)
+
+
+def render_chunks(chunks: Iterable[bytes], variables: Dict[str, str]) -> Iterator[bytes]:
+    """Substitute placeholders in a stream, holding back only a possibly split placeholder between chunks"""
+    carry = b""
+    for chunk in chunks:
+        data = carry + chunk
+        # The last "{" that is not closed yet may open a placeholder finished by the next chunk
+        cut = data.rfind(b"{", max(0, len(data) - MAX_PLACEHOLDER))
+        if cut != -1 and b"}}" not in data[cut:]:
+            if cut > 0 and data[cut - 1:cut] == b"{":
+                cut -= 1
+            data, carry = data[:cut], data[cut:]
+        else:
+            carry = b""
+        if data:
+            yield render(data, variables)
+    if carry:
+        yield render(carry, variables)
+
+
+def render_file(chunks: Iterable[bytes], dest: Path, variables: Dict[str, str]) -> int:
+    """Write a rendered template to `dest`; return the bytes written"""
+    written = 0
+    unlink_existing(dest)
+    with open(dest, "wb") as f:
+        for piece in render_chunks(chunks, variables):
+            f.write(piece)
+            written += len(piece)
+    return written
@@ -0,0 +1,352 @@
+"""
+Watch mode for template authors: sample projects kept in step with the templates as they are edited.
+
+    from generator.watch import TemplateWatch, open_watcher
+    session = TemplateWatch(TEMPLATE_DIR, "/tmp/samples", load_build_combinations())
+    session.build()
+    with open_watcher(TEMPLATE_DIR) as watcher:
+        while True:
+            update = session.apply(watcher.wait())
+
+IndexedStore is the loose template tree with an in-memory version of the
+pack's combination index. Each combination's plan is made once. After an
+edit, only the combinations that read the changed overlay are planned again.
+That happens when a file appears or disappears, or when any package.json or
+lockfile fragment in an overlay changes, including a sub-project's. An edit
+to any other existing file changes no plan, so it only marks the samples whose
+plan reads that file. Each sample project is generated once into the scratch
+directory. After that it is brought up to date with sync_project, so only its
+changed files are rewritten, and restarting the watch is incremental too.
+
+Changes come from inotify on Linux, through ctypes. Elsewhere, or with
+polling=True or when inotify is unavailable, the tree is polled. Either way a
+burst of events is collected until the tree has been quiet for `settle`
+seconds, so one save is handled once.
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from .combinations import combination_id
+from .events import NullSink
+from .generate import generate_project
+from .lockfile import FRAGMENT_NAME
+from .manifest import read_manifest
+from .pack import index_combination
+from .store import DirectoryStore, set_template_store
+from .sync import sync_project
+
+# Editor swap, backup and probe files; never templates
+IGNORED_SUFFIXES = (".swp", ".swx", ".tmp", "~")
+IGNORED_NAMES = {".DS_Store", "4913"}
+
+IN_ATTRIB = 0x4
+IN_CLOSE_WRITE = 0x8
+IN_MOVED_FROM = 0x40
+IN_MOVED_TO = 0x80
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_Q_OVERFLOW = 0x4000
+IN_IGNORED = 0x8000
+IN_ISDIR = 0x40000000
+WATCH_MASK = IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+_EVENT = struct.Struct("iIII")
+
+
+def _ignored(path: str) -> bool:
+    name = path.rsplit("/", 1)[-1]
+    return name in IGNORED_NAMES or name.startswith(".#") or name.endswith(IGNORED_SUFFIXES)
+
+
+class InotifyWatcher:
+    """Changed paths under `root`, from inotify watches on every directory"""
+
+    backend = "inotify"
+
+    def __init__(self, root: Path, settle: float = 0.1):
+        self.root = Path(root)
+        self.settle = settle
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = self._libc.inotify_init1(os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs: Dict[int, str] = {}
+        try:
+            self._add_tree("")
+        except OSError:
+            os.close(self.fd)
+            raise
+
+    def _add_tree(self, rel_dir: str) -> None:
+        for dirpath, _, _ in os.walk(self.root / rel_dir):
+            path = os.fsencode(dirpath)
+            wd = self._libc.inotify_add_watch(self.fd, path, WATCH_MASK)
+            if wd < 0:
+                err = ctypes.get_errno()
+                if err == errno.ENOENT:
+                    continue
+                # ENOSPC: out of fs.inotify.max_user_watches
+                raise OSError(err, f"inotify_add_watch {dirpath}: {os.strerror(err)}")
+            rel_dir = Path(dirpath).relative_to(self.root).as_posix()
+            self._dirs[wd] = "" if rel_dir == "." else rel_dir
+
+    def _read(self) -> Optional[Set[str]]:
+        data = os.read(self.fd, 64 * 1024)
+        changed: Set[str] = set()
+        overflow = False
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = _EVENT.unpack_from(data, offset)
+            name = data[offset + _EVENT.size:offset + _EVENT.size + length].rstrip(b"\0")
+            offset += _EVENT.size + length
+            if mask & IN_Q_OVERFLOW:
+                overflow = True
+            elif mask & IN_IGNORED:
+                self._dirs.pop(wd, None)
+            elif wd in self._dirs and name:
+                rel_dir = self._dirs[wd]
+                rel_path = f"{rel_dir}/{os.fsdecode(name)}" if rel_dir else os.fsdecode(name)
+                if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                    self._add_tree(rel_path)
+                changed.add(rel_path)
+        return None if overflow else changed
+
+    def wait(self) -> Optional[Set[str]]:
+        """Block until something changes and the tree settles; the changed paths, or None to rescan everything"""
+        select.select([self.fd], [], [])
+        changed: Optional[Set[str]] = set()
+        while True:
+            batch = self._read()
+            changed = None if changed is None or batch is None else changed | batch
+            if not select.select([self.fd], [], [], self.settle)[0]:
+                return changed
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+    def __enter__(self) -> "InotifyWatcher":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+class PollingWatcher:
+    """Changed paths under `root`, by comparing (mtime, size, mode) snapshots every `interval` seconds"""
+
+    backend = "polling"
+
+    def __init__(self, root: Path, interval: float = 0.5, settle: float = 0.1):
+        self.root = Path(root)
+        self.interval = interval
+        self.settle = settle
+        self._snapshot = self._scan()
+
+    def _scan(self) -> Dict[str, tuple]:
+        snapshot = {}
+        for dirpath, _, filenames in os.walk(self.root):
+            for fname in filenames:
+                path = Path(dirpath) / fname
+                try:
+                    st = path.stat()
+                except FileNotFoundError:
+                    continue
+                snapshot[path.relative_to(self.root).as_posix()] = (st.st_mtime_ns, st.st_size, st.st_mode)
+        return snapshot
+
+    def _diff(self) -> Set[str]:
+        snapshot = self._scan()
+        old, self._snapshot = self._snapshot, snapshot
+        return {key for key in old.keys() | snapshot.keys() if old.get(key) != snapshot.get(key)}
+
+    def wait(self) -> Optional[Set[str]]:
+        """Block until something changes and the tree settles; the changed paths"""
+        while True:
+            time.sleep(self.interval)
+            changed = self._diff()
+            if changed:
+                break
+        while True:
+            time.sleep(self.settle)
+            batch = self._diff()
+            if not batch:
+                return changed
+            changed |= batch
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> "PollingWatcher":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+def open_watcher(root: Path, polling: bool = False, interval: float = 0.5):
+    """inotify where it is available, else polling every `interval` seconds"""
+    if not polling and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(root)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(root, interval)
+
+
+class IndexedStore(DirectoryStore):
+    """A loose template tree with an in-memory combination index that follows edits to the tree"""
+
+    def __init__(self, root: Path, combinations: List[Dict[str, Any]]):
+        super().__init__(root)
+        self.specs = {c["id"]: c for c in combinations}
+        self.combinations: Dict[str, Optional[Dict[str, Any]]] = {}
+        self.errors: Dict[str, str] = {}
+        self._files: Set[str] = set()
+        # overlay -> combinations that use it, or asked for it and found it missing
+        self._by_overlay: Dict[str, Set[str]] = {}
+        # template key -> combinations whose plan writes it
+        self._by_key: Dict[str, Set[str]] = {}
+
+    def combination(self, framework: str, features: list) -> Optional[Dict[str, Any]]:
+        return self.combinations.get(combination_id(framework, list(features)))
+
+    def _unindex(self, cid: str) -> None:
+        for cids in list(self._by_overlay.values()) + list(self._by_key.values()):
+            cids.discard(cid)
+
+    def _index(self, cid: str) -> None:
+        spec = self.specs[cid]
+        try:
+            planned = index_combination(spec["framework"], spec["features"], self)
+        except ValueError as e:
+            # Usually a package.json caught half-written; keep the last good plan
+            self.errors[cid] = f"{type(e).__name__}: {e}"
+            return
+        self.errors.pop(cid, None)
+        self._unindex(cid)
+        self.combinations[cid] = planned
+        if planned is None:
+            return
+        wanted = set(planned["overlays"])
+        wanted.update(data["overlay"] for kind, data in planned["events"] if kind == "overlay_missing")
+        for overlay in wanted:
+            self._by_overlay.setdefault(overlay, set()).add(cid)
+        for key in planned["plan"].values():
+            self._by_key.setdefault(key, set()).add(cid)
+
+    def rebuild(self) -> List[str]:
+        """Index every combination from scratch; return their ids"""
+        self._digests.clear()
+        self._placeholders.clear()
+        self._files = set(self.keys())
+        self._by_overlay.clear()
+        self._by_key.clear()
+        for cid in self.specs:
+            self._index(cid)
+        return list(self.specs)
+
+    def expand(self, paths: Iterable[str]) -> Set[str]:
+        """Template keys behind changed paths: the file itself, or everything under a changed directory"""
+        keys = set()
+        for path in paths:
+            full = self.root / path
+            if full.is_dir():
+                keys.update(f"{path}/{rel_path}" for rel_path, _ in self.walk(path))
+            elif full.is_file():
+                keys.add(path)
+            keys.update(key for key in self._files if key == path or key.startswith(path + "/"))
+        return {key for key in keys if not _ignored(key)}
+
+    def update(self, keys: Optional[Iterable[str]]) -> Dict[str, List[str]]:
+        """Bring the index up to date with changed template keys (None: everything).
+
+        Returns the combinations whose output may have changed, each with the
+        changed keys it reads.
+        """
+        if keys is None:
+            return {cid: [] for cid in self.rebuild()}
+        affected: Dict[str, Set[str]] = {}
+        replan: Set[str] = set()
+        for key in keys:
+            self._digests.pop(key, None)
+            self._placeholders.pop(key, None)
+            exists = (self.root / key).is_file()
+            parts = key.split("/")
+            overlay = "/".join(parts[:2])
+            # Any package.json or lockfile fragment, sub-projects' included, can change what planning produces
+            structural = exists != (key in self._files) or parts[-1] in ("package.json", FRAGMENT_NAME)
+            if exists:
+                self._files.add(key)
+            else:
+                self._files.discard(key)
+            readers = set(self._by_overlay.get(overlay, ()) if structural else self._by_key.get(key, ()))
+            # Combinations that failed to plan may read any overlay of their framework; retry them
+            readers.update(cid for cid in self.errors if self.specs[cid]["framework"] == parts[0])
+            if structural:
+                replan.update(readers)
+            else:
+                replan.update(cid for cid in readers if cid in self.errors)
+            for cid in readers:
+                affected.setdefault(cid, set()).add(key)
+        for cid in replan:
+            self._index(cid)
+        return {cid: sorted(keys) for cid, keys in affected.items()}
+
+
+class TemplateWatch:
+    """Sample projects for a set of combinations, kept in step with an IndexedStore"""
+
+    def __init__(self, root: Path, out: Path, combinations: List[Dict[str, Any]], copy_mode: str = "auto"):
+        self.store = IndexedStore(Path(root), combinations)
+        self.out = Path(out)
+        self.copy_mode = copy_mode
+        # generate_project and sync_project read templates through the process-wide store
+        set_template_store(self.store)
+
+    def sample_dir(self, cid: str) -> Path:
+        return self.out / cid.replace(":", "-").replace("+", "-")
+
+    def _refresh(self, cid: str) -> Dict[str, Any]:
+        spec = self.store.specs[cid]
+        target = self.sample_dir(cid)
+        report: Dict[str, Any] = {"sample": cid, "dir": str(target), "written": [], "removed": [], "error": None}
+        if cid in self.store.errors:
+            report["error"] = self.store.errors[cid]
+            return report
+        if self.store.combinations.get(cid) is None:
+            report["error"] = "not a valid combination"
+            return report
+        manifest = read_manifest(target)
+        if manifest and (manifest["framework"], manifest["features"]) == (spec["framework"], spec["features"]):
+            synced = sync_project(str(target), copy_mode=self.copy_mode)
+            report["written"] = synced["added"] + synced["updated"]
+            report["removed"] = synced["removed"]
+            if synced["conflicts"]:
+                report["error"] = f"{len(synced['conflicts'])} files edited in the sample were left alone"
+        else:
+            result = generate_project(spec["framework"], spec["features"], str(target), copy_mode=self.copy_mode,
+                                      sink=NullSink())
+            report["written"] = result.files_written
+            report["error"] = result.error
+        return report
+
+    def build(self) -> List[Dict[str, Any]]:
+        """Index every combination and generate (or sync) every sample"""
+        return [self._refresh(cid) for cid in self.store.rebuild()]
+
+    def apply(self, paths: Optional[Iterable[str]]) -> Dict[str, Any]:
+        """Handle one batch of changed paths (None: everything); return {keys, samples, seconds}"""
+        started = time.perf_counter()
+        keys = None if paths is None else self.store.expand(paths)
+        affected = self.store.update(keys)
+        samples = [self._refresh(cid) for cid in sorted(affected)]
+        return {"keys": sorted(keys) if keys is not None else None, "samples": samples,
+                "seconds": time.perf_counter() - started}
@@ -6,9 +6,9 @@ const morgan = require("morgan");
 require("dotenv").config();
 
 const app = express();
-const PORT = process.env.PORT || 3000;
+const PORT = process.env.PORT || {{appgen.port|3000}};
 const MONGODB_URI =
-  process.env.MONGODB_URI || "mongodb://localhost:27017/mern-app";
+  process.env.MONGODB_URI || "{{appgen.database_url|mongodb://localhost:27017/mern-app}}";
 
 // Middleware
 app.use(helmet());
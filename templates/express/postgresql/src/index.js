@@ -6,11 +6,11 @@ const morgan = require("morgan");
 require("dotenv").config();
 
 const app = express();
-const PORT = process.env.PORT || 3000;
+const PORT = process.env.PORT || {{appgen.port|3000}};
 
 // Database configuration
 const DATABASE_URL =
-  process.env.DATABASE_URL || "postgresql://localhost:5432/express_app";
+  process.env.DATABASE_URL || "{{appgen.database_url|postgresql://localhost:5432/express_app}}";
 
 // Initialize Sequelize
 const sequelize = new Sequelize(DATABASE_URL, {
@@ -6,7 +6,7 @@ const morgan = require("morgan");
 require("dotenv").config();
 
 const app = express();
-const PORT = process.env.PORT || 3000;
+const PORT = process.env.PORT || {{appgen.port|3000}};
 
 // Supabase configuration
 const SUPABASE_URL = process.env.SUPABASE_URL;
@@ -0,0 +1,38 @@
+"""
+Shared fixtures: every test reads the loose templates/ tree and keeps its caches in a temporary directory.
+"""
+
+import shutil
+from pathlib import Path
+
+import pytest
+
+from generator.pack import load_build_combinations
+from generator.store import TEMPLATE_DIR, DirectoryStore, configure_template_sources, set_template_store
+
+COMBINATIONS = load_build_combinations()
+
+
+@pytest.fixture(autouse=True)
+def isolated(tmp_path, monkeypatch):
+    """Caches under tmp_path, and the loose templates as the store (a built pack may be stale)"""
+    monkeypatch.setenv("APPGEN_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.delenv("SOURCE_DATE_EPOCH", raising=False)
+    configure_template_sources()
+    set_template_store(DirectoryStore(TEMPLATE_DIR))
+    yield
+    configure_template_sources()
+
+
+@pytest.fixture
+def template_copy(tmp_path) -> Path:
+    """A private copy of templates/ that a test may edit, installed as the template store"""
+    root = tmp_path / "templates"
+    shutil.copytree(TEMPLATE_DIR, root, ignore=shutil.ignore_patterns("__pycache__"))
+    set_template_store(DirectoryStore(root))
+    return root
+
+
+def tree_files(root: Path) -> dict:
+    """{posix path: bytes} for every file under `root`"""
+    return {path.relative_to(root).as_posix(): path.read_bytes() for path in sorted(root.rglob("*")) if path.is_file()}
@@ -0,0 +1,77 @@
+"""
+Archive output: reproducible bytes, and the same files a directory generation writes.
+"""
+
+import io
+import tarfile
+import zipfile
+
+import pytest
+
+from generator.archive import FORMATS, archive_mtime, generate_archive, write_archive
+from generator.events import BufferedSink, NullSink
+from generator.generate import generate_project, load_combination
+from generator.manifest import MANIFEST_PATH
+
+from conftest import tree_files
+
+
+class _Pipe(io.RawIOBase):
+    """A write-only, unseekable stream, like stdout piped into another process"""
+
+    def __init__(self):
+        self.data = bytearray()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.data += data
+        return len(data)
+
+
+def _members(data: bytes, fmt: str) -> dict:
+    if fmt == "zip":
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            return {name: archive.read(name) for name in archive.namelist()}
+    with tarfile.open(fileobj=io.BytesIO(data), mode="r:*") as archive:
+        return {member.name: archive.extractfile(member).read() for member in archive.getmembers()}
+
+
+@pytest.mark.parametrize("fmt", FORMATS)
+def test_archives_are_reproducible(fmt, tmp_path):
+    first = generate_archive("nextjs", ["app", "typescript"], str(tmp_path / "a" / f"web.{fmt}"), fmt, sink=NullSink())
+    second = generate_archive("nextjs", ["app", "typescript"], str(tmp_path / "b" / f"web.{fmt}"), fmt, sink=NullSink())
+    assert first.ok and second.ok
+    data = (tmp_path / "a" / f"web.{fmt}").read_bytes()
+    assert data == (tmp_path / "b" / f"web.{fmt}").read_bytes()
+
+    combination = load_combination("nextjs", ["app", "typescript"])
+    pipe = _Pipe()
+    write_archive(combination, fmt, pipe, variables={"project_name": "web"})
+    assert bytes(pipe.data) == data
+
+
+@pytest.mark.parametrize("fmt", FORMATS)
+def test_archive_holds_the_generated_tree(fmt, tmp_path):
+    generate_archive("express", ["mongodb"], str(tmp_path / f"api.{fmt}"), fmt, sink=NullSink())
+    generate_project("express", ["mongodb"], str(tmp_path / "api"), sink=NullSink())
+    expected = tree_files(tmp_path / "api")
+    expected.pop(MANIFEST_PATH.as_posix())
+    assert _members((tmp_path / f"api.{fmt}").read_bytes(), fmt) == expected
+
+
+def test_source_date_epoch_sets_entry_times(tmp_path, monkeypatch):
+    monkeypatch.setenv("SOURCE_DATE_EPOCH", "1700000000")
+    assert archive_mtime() == 1700000000
+    generate_archive("flask", [], str(tmp_path / "app.tar"), "tar", sink=NullSink())
+    with tarfile.open(tmp_path / "app.tar") as archive:
+        assert {member.mtime for member in archive.getmembers()} == {1700000000}
+
+
+def test_invalid_combination_writes_nothing(tmp_path):
+    events = BufferedSink()
+    result = generate_archive("serverless", [], str(tmp_path / "fn.zip"), "zip", sink=events)
+    assert not result.ok and result.error
+    assert events.events[-1][0] == "done"
+    assert not (tmp_path / "fn.zip").exists()
@@ -0,0 +1,51 @@
+"""
+appgen batch: manifest entries generated across a process pool, with one summary.
+"""
+
+import pytest
+
+from generator.batch import entry_features, generate_batch, normalize_entry
+from generator.events import NullSink
+from generator.generate import generate_project
+from generator.manifest import MANIFEST_PATH
+
+from conftest import tree_files
+
+
+def _tree(root):
+    files = tree_files(root)
+    files.pop(MANIFEST_PATH.as_posix(), None)
+    return files
+
+
+def test_shorthands_come_first():
+    assert entry_features({"framework": "nextjs", "router": "app", "features": "TypeScript, tailwind"}) == [
+        "app", "typescript", "tailwind"]
+    assert entry_features({"framework": "express", "db": "mongodb"}) == ["mongodb"]
+    with pytest.raises(ValueError):
+        normalize_entry({"framework": "flask"})
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_batch_matches_single_generations(workers, tmp_path):
+    entries = [
+        {"framework": "nextjs", "router": "app", "features": ["typescript"], "dir": str(tmp_path / "out" / "web")},
+        {"framework": "express", "db": "mongodb", "dir": str(tmp_path / "out" / "api"), "variables": {"port": "8080"}},
+        {"framework": "nextjs", "features": ["bogus"], "dir": str(tmp_path / "out" / "broken")},
+    ]
+    summary = generate_batch(entries, workers=workers)
+    assert summary["workers"] == workers
+    assert (summary["ok"], summary["failed"]) == (2, 1)
+    assert [p["status"] for p in summary["projects"]] == ["ok", "ok", "failed"]
+    assert "Invalid router type" in summary["projects"][2]["error"]
+
+    generate_project("nextjs", ["app", "typescript"], str(tmp_path / "web"), sink=NullSink())
+    generate_project("express", ["mongodb"], str(tmp_path / "api"), sink=NullSink(), variables={"port": "8080"})
+    assert _tree(tmp_path / "out" / "web") == _tree(tmp_path / "web")
+    assert _tree(tmp_path / "out" / "api") == _tree(tmp_path / "api")
+
+
+def test_entries_need_distinct_directories(tmp_path):
+    entries = [{"framework": "flask", "dir": str(tmp_path / "app")}, {"framework": "django", "dir": str(tmp_path / "app")}]
+    with pytest.raises(ValueError):
+        generate_batch(entries)
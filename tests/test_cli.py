@@ -0,0 +1,70 @@
+"""
+The appgen command line, driven through Typer's CliRunner.
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+from typer.testing import CliRunner
+
+from appgen import config
+from appgen.cli import app
+
+runner = CliRunner()
+
+
+def test_interactive_shortcut_generates_a_project(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr("generator.install.available_package_managers", lambda: [])
+    # flask, directory "site", proceed, don't open an editor
+    result = runner.invoke(app, ["-i"], input="5\nsite\ny\nn\n")
+    assert result.exit_code == 0, result.output
+    assert (tmp_path / "site" / "run.py").exists()
+
+
+def test_interactive_mode_skips_the_install_offer_without_dependencies(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr("generator.install.available_package_managers", lambda: ["npm"])
+    result = runner.invoke(app, ["-i"], input="5\nsite\ny\nn\n")
+    assert result.exit_code == 0, result.output
+    assert "install dependencies" not in result.output
+
+
+def test_interactive_mode_exits_non_zero_when_generation_fails(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr("generator.install.available_package_managers", lambda: [])
+    # A directory where run.py should go makes that file fail to copy
+    (tmp_path / "site" / "run.py").mkdir(parents=True)
+    result = runner.invoke(app, ["-i"], input="5\nsite\ny\nn\n")
+    assert result.exit_code == 1
+    assert "created successfully" not in result.output
+    assert "Next Steps" not in result.output
+    assert result.exception is None or isinstance(result.exception, SystemExit)
+
+
+def test_needs_install_only_for_manifests_with_dependencies():
+    from appgen.project_manager import ProjectManager
+    project_manager = ProjectManager(config.get_config_manager())
+    assert project_manager.needs_install("express", ["mongodb"])
+    assert not project_manager.needs_install("flask", [])
+    assert not project_manager.needs_install("serverless", [])
+
+
+def test_startup_imports_nothing_heavy():
+    # A fresh interpreter: this test session has already imported everything
+    code = ("import sys, appgen.cli, appgen.config as config; "
+            "print(config._config_manager is None, sorted(m for m in HEAVY if m in sys.modules))")
+    heavy = ["yaml", "generator.generate", "generator.store", "generator.pack", "appgen.project_manager",
+             "appgen.framework_selector", "rich.prompt", "rich.table"]
+    out = subprocess.run([sys.executable, "-c", f"HEAVY = {heavy!r}; {code}"], capture_output=True, text=True,
+                         cwd=Path(__file__).resolve().parents[1], check=True).stdout
+    assert out.split() == ["True", "[]"]
+
+
+def test_help_does_not_read_the_config(monkeypatch):
+    monkeypatch.setattr(config, "_config_manager", None)
+    result = runner.invoke(app, ["--help"])
+    assert result.exit_code == 0
+    assert "create" in result.output
+    assert config._config_manager is None
@@ -0,0 +1,50 @@
+"""
+ConfigManager parses appgen.config.yaml once, and again only after the file changes.
+"""
+
+import os
+import shutil
+
+import pytest
+
+from appgen.config import ConfigManager, get_config_manager
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    path = tmp_path / "appgen.config.yaml"
+    shutil.copy(ConfigManager().config_path, path)
+    manager = ConfigManager(path)
+    loads = []
+    load = manager._load_config
+    monkeypatch.setattr(manager, "_load_config", lambda: (loads.append(1), load())[1])
+    manager.loads = loads
+    return manager
+
+
+def test_parses_once(manager):
+    manager.get_ui_config()
+    manager.get_framework_config("express")
+    manager.get_install_config()
+    assert len(manager.loads) == 1
+
+
+def test_reparses_after_the_file_changes(manager):
+    assert manager.get_ui_config()["default_project_name"] == "my-project"
+    text = manager.config_path.read_text().replace('default_project_name: "my-project"', 'default_project_name: "edited"')
+    manager.config_path.write_text(text)
+    os.utime(manager.config_path, ns=(0, 0))
+    assert manager.get_ui_config()["default_project_name"] == "edited"
+    assert len(manager.loads) == 2
+    manager.reload()
+    assert len(manager.loads) == 3
+
+
+def test_framework_lookup_spans_both_sections(manager):
+    assert "databases" in manager.get_framework_config("express")
+    assert "routers" in manager.get_framework_config("nextjs")
+    assert manager.get_framework_config("rails") is None
+
+
+def test_shared_instance():
+    assert get_config_manager() is get_config_manager()
@@ -0,0 +1,43 @@
+"""
+Copy engine: every --copy-mode produces the same file, and never writes through an existing link.
+"""
+
+import os
+
+import pytest
+
+from generator.copy_engine import COPY_MODES, copy_file, strategies_for
+
+
+@pytest.fixture
+def source(tmp_path):
+    src = tmp_path / "src.sh"
+    src.write_bytes(b"#!/bin/sh\necho hi\n" * 1000)
+    src.chmod(0o755)
+    return src
+
+
+@pytest.mark.parametrize("mode", COPY_MODES)
+def test_modes_copy_content_and_mode(mode, source, tmp_path):
+    dest = tmp_path / "dest.sh"
+    strategy = copy_file(source, dest, mode)
+    assert strategy in strategies_for(mode)
+    assert dest.read_bytes() == source.read_bytes()
+    assert os.access(dest, os.X_OK)
+    assert (dest.stat().st_ino == source.stat().st_ino) == (strategy == "hardlink")
+
+
+@pytest.mark.parametrize("mode", [mode for mode in COPY_MODES if mode != "hardlink"])
+def test_copying_over_a_hardlink_leaves_its_source_alone(mode, source, tmp_path):
+    dest = tmp_path / "dest.sh"
+    copy_file(source, dest, "hardlink")
+    other = tmp_path / "other.sh"
+    other.write_bytes(b"other\n")
+    copy_file(other, dest, mode)
+    assert dest.read_bytes() == b"other\n"
+    assert source.read_bytes() == b"#!/bin/sh\necho hi\n" * 1000
+
+
+def test_unknown_mode():
+    with pytest.raises(ValueError):
+        strategies_for("symlink")
@@ -0,0 +1,73 @@
+"""
+The library API: generate_project returns a GenerationResult and reports through the sink it is given.
+"""
+
+import io
+
+from rich.console import Console
+
+from generator.events import BufferedSink, NullSink, ProgressSink
+from generator.generate import generate_project
+from generator.lockfile import LOCKFILE_NAME
+from generator.manifest import MANIFEST_PATH
+
+from conftest import tree_files
+
+
+def test_null_sink_is_silent(tmp_path, capfd):
+    result = generate_project("nextjs", ["app", "typescript"], str(tmp_path / "web"), sink=NullSink())
+    assert result.ok
+    assert capfd.readouterr() == ("", "")
+
+
+def test_result_describes_the_generation(tmp_path):
+    target = tmp_path / "web"
+    result = generate_project("nextjs", ["app", "typescript"], str(target), sink=NullSink())
+    files = tree_files(target)
+    files.pop(MANIFEST_PATH.as_posix())
+    assert (result.ok, result.error, result.errors) == (True, None, {})
+    assert result.target_path == target.resolve()
+    assert sorted(result.files_written) == sorted(files)
+    assert result.bytes_written == sum(len(data) for data in files.values())
+    assert result.package_json["dependencies"]["next"]
+    assert sum(result.strategies.values()) == len(result.files_written) - 1 - (LOCKFILE_NAME in files)
+    assert {"plan", "write", "total"} <= set(result.durations)
+
+
+def test_events_arrive_in_order(tmp_path):
+    events = BufferedSink()
+    result = generate_project("express", ["mongodb"], str(tmp_path / "api"), sink=events)
+    kinds = [kind for kind, _ in events.events]
+    assert kinds[0] == "start" and kinds[-1] == "done"
+    assert kinds.index("package_json") < kinds.index("planned") < kinds.index("file_written") < kinds.index("copied")
+    assert events.events[-1][1]["result"] is result
+    written = sorted(data["path"] for kind, data in events.events if kind == "file_written")
+    assert written == sorted(path for path in result.files_written if path not in ("package.json", LOCKFILE_NAME))
+
+
+def test_planned_totals_match_what_is_written(tmp_path):
+    events = BufferedSink()
+    generate_project("reactjs", ["typescript"], str(tmp_path / "app"), sink=events, variables={"project_name": "app"})
+    planned = next(data for kind, data in events.events if kind == "planned")
+    written = [data for kind, data in events.events if kind == "file_written"]
+    assert planned["files"] == len(written)
+    assert planned["bytes"] == sum(data["size"] for data in written)
+
+
+def test_progress_bar_follows_the_plan(tmp_path):
+    console = Console(file=io.StringIO(), force_terminal=True, width=120)
+    sink = ProgressSink(console, interval=0)
+    seen = []
+    advance = sink._advance
+    sink._advance = lambda size: (seen.append(sink._progress.tasks[0].total), advance(size))
+    result = generate_project("nextjs", ["app", "typescript"], str(tmp_path / "web"), sink=sink, jobs=4)
+    assert result.ok
+    assert len(seen) == sink._files == len(result.files_written) - 1 - (LOCKFILE_NAME in result.files_written)
+    assert seen[0] == sink._bytes
+    assert sink._progress is None
+
+
+def test_progress_bar_is_off_without_a_terminal(tmp_path):
+    sink = ProgressSink(Console(file=io.StringIO(), force_terminal=False))
+    generate_project("flask", [], str(tmp_path / "app"), sink=sink)
+    assert sink._progress is None and sink._files == 0
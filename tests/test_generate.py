@@ -0,0 +1,178 @@
+"""
+Regression tests: every combination generates what the original copy-then-clean generator produced.
+
+The reference below is the pre-planning algorithm: copy the base and every
+feature directory over each other, delete JS files shadowed by TS ones, then
+write the merged package.json. The planned, single-pass generator must give
+the same tree. The only additions are the template variables rendered in
+place, the synthesized lockfile and the .appgen manifest.
+"""
+
+import json
+import os
+import shutil
+import zlib
+from pathlib import Path
+
+import pytest
+
+from generator.events import BufferedSink, NullSink
+from generator.generate import build_package_json, generate_project, load_combination, load_json, write_plan
+from generator.lockfile import FRAGMENT_NAME, LOCKFILE_NAME
+from generator.manifest import MANIFEST_PATH
+from generator.pipeline import InstallPipeline
+from generator.result_cache import ResultCache
+from generator.store import TEMPLATE_DIR, DirectoryStore
+from generator.variables import default_variables, json_string, parse_assignments, render
+
+from conftest import COMBINATIONS, tree_files
+
+
+def _overlays(framework, features):
+    if framework == "nextjs":
+        return [features[0]] + [f"{features[0]}-{feature}" for feature in features[1:]]
+    if framework == "express":
+        return [features[0]] if features else ["base"]
+    if framework == "serverless":
+        return [features[0]]
+    return ["base"] + list(features)
+
+
+def reference_project(framework, features, target: Path, variables) -> dict:
+    """The original generator's output for a combination, with placeholders rendered"""
+    target.mkdir()
+    for overlay in _overlays(framework, features):
+        source = TEMPLATE_DIR / framework / overlay
+        if source.exists():
+            shutil.copytree(source, target, dirs_exist_ok=True)
+    for dirpath, _, filenames in os.walk(target):
+        names = set(filenames)
+        for fname in filenames:
+            stem, _, ext = fname.rpartition(".")
+            if ext in ("ts", "tsx") and f"{stem}.js" in names:
+                (Path(dirpath) / f"{stem}.js").unlink(missing_ok=True)
+            if ext == "tsx" and f"{stem}.jsx" in names:
+                (Path(dirpath) / f"{stem}.jsx").unlink(missing_ok=True)
+    (target / FRAGMENT_NAME).unlink(missing_ok=True)
+    with (target / "package.json").open("w") as f:
+        json.dump(build_package_json(framework, features), f, indent=2)
+    files = tree_files(target)
+    return {rel_path: render(data, variables, quote=json_string if rel_path == "package.json" else None)
+            for rel_path, data in files.items()}
+
+
+@pytest.mark.parametrize("combination", COMBINATIONS, ids=[c["id"] for c in COMBINATIONS])
+def test_matches_reference_generator(combination, tmp_path):
+    framework, features = combination["framework"], combination["features"]
+    target = tmp_path / "project"
+    result = generate_project(framework, features, str(target), sink=NullSink())
+    assert result.ok, result.error
+
+    expected = reference_project(framework, features, tmp_path / "reference", default_variables(target))
+    generated = tree_files(target)
+    assert generated.pop(MANIFEST_PATH.as_posix())
+    generated.pop(LOCKFILE_NAME, None)
+    assert generated == expected
+    lockfile = [LOCKFILE_NAME] if (target / LOCKFILE_NAME).exists() else []
+    assert sorted(result.files_written) == sorted(list(generated) + lockfile)
+
+
+def test_keeps_executable_bits(template_copy, tmp_path):
+    script = template_copy / "flask" / "base" / "run.sh"
+    script.write_text("#!/bin/sh\nflask run\n")
+    script.chmod(0o755)
+    generate_project("flask", [], str(tmp_path / "app"), sink=NullSink())
+    assert os.access(tmp_path / "app" / "run.sh", os.X_OK)
+
+
+def test_regenerating_over_hardlinks_keeps_the_templates(template_copy, tmp_path):
+    before = tree_files(template_copy)
+    target = tmp_path / "api"
+    generate_project("express", ["mongodb"], str(target), copy_mode="hardlink", sink=NullSink())
+    # A new placeholder makes the file rendered instead of linked the second time
+    (template_copy / "express" / "mongodb" / "README.md").unlink()
+    (template_copy / "express" / "mongodb" / "README.md").write_bytes(b"# {{appgen.project_name}}\n")
+    before["express/mongodb/README.md"] = b"# {{appgen.project_name}}\n"
+    result = generate_project("express", ["mongodb"], str(target), sink=NullSink(), variables={"project_name": "other"})
+    assert result.ok
+    assert tree_files(template_copy) == before
+    assert (target / "README.md").read_bytes() == b"# other\n"
+
+def test_cache_hit_matches_fresh_generation_and_never_links_the_cache(tmp_path):
+    cache = ResultCache(tmp_path / "results")
+    variables = {"project_name": "shop"}
+    first = generate_project("reactjs", ["typescript"], str(tmp_path / "a"), cache=cache, sink=NullSink(), variables=variables)
+    second = generate_project("reactjs", ["typescript"], str(tmp_path / "b"), copy_mode="hardlink", cache=cache,
+                              sink=NullSink(), variables=variables)
+    assert not first.from_cache and second.from_cache
+    assert tree_files(tmp_path / "a") == tree_files(tmp_path / "b")
+    assert all((tmp_path / "b" / rel_path).stat().st_nlink == 1 for rel_path in second.files_written)
+
+
+def test_variables_are_rendered(tmp_path):
+    generate_project("express", [], str(tmp_path / "api"), sink=NullSink(), variables={"project_name": "billing", "port": "8080"})
+    assert json.loads((tmp_path / "api" / "package.json").read_text())["name"] == "billing"
+    assert "process.env.PORT || 8080;" in (tmp_path / "api" / "src" / "index.js").read_text()
+
+
+@pytest.mark.parametrize("variables", [
+    {"port": "3000; require('child_process')"},
+    {"port": "70000"},
+    {"database_url": 'mongodb://localhost"; process.exit(); "'},
+    {"project_name": "a\nb"},
+])
+def test_unsafe_variables_are_rejected(variables, tmp_path):
+    with pytest.raises(ValueError):
+        generate_project("express", ["mongodb"], str(tmp_path / "api"), sink=NullSink(), variables=variables)
+    with pytest.raises(ValueError):
+        parse_assignments([f"{name}={value}" for name, value in variables.items()])
+    assert not (tmp_path / "api").exists()
+
+def test_invalid_combination_reports_done(tmp_path):
+    events = BufferedSink()
+    result = generate_project("nextjs", ["bogus"], str(tmp_path / "web"), sink=events)
+    assert not result.ok
+    assert "Invalid router type" in result.error
+    assert [kind for kind, _ in events.events][-1] == "done"
+
+
+def test_install_pipeline_reports_failed_generation(tmp_path):
+    pipeline = InstallPipeline(package_manager="npm")
+    generate_project("serverless", [], str(tmp_path / "fn"), sink=pipeline.watch())
+    report = pipeline.join()
+    assert not report["ok"]
+    assert report["generation_failures"][0]["target"] == str(tmp_path / "fn")
+    assert report["installs"] == []
+
+
+class _DamagedStore(DirectoryStore):
+    """Loose templates where some files fail the way a damaged pack or bad entry would"""
+
+    def __init__(self, root, failures):
+        super().__init__(root)
+        self.failures = failures
+
+    def materialize(self, key, dest, copy_mode="auto"):
+        if key in self.failures:
+            raise self.failures[key]
+        return super().materialize(key, dest, copy_mode)
+
+
+@pytest.mark.parametrize("jobs", [1, 4])
+def test_write_plan_records_each_failed_file(jobs, tmp_path):
+    plan = load_combination("reactjs", ["typescript"])["plan"]
+    copied = sorted(rel_path for rel_path, key in plan.items() if not DirectoryStore(TEMPLATE_DIR).placeholders(key))
+    failures = {plan[copied[0]]: zlib.error("invalid stored block lengths"), plan[copied[1]]: ValueError("bad entry"),
+                plan[copied[2]]: PermissionError("denied")}
+    events = BufferedSink()
+    errors, strategies = write_plan(plan, tmp_path, jobs=jobs, store=_DamagedStore(TEMPLATE_DIR, failures), sink=events)
+    assert sorted(errors) == copied[:3]
+    assert sorted(strategies) == sorted(set(plan) - set(copied[:3]))
+    assert all((tmp_path / rel_path).exists() for rel_path in strategies)
+    assert sorted(data["path"] for kind, data in events.events if kind == "file_failed") == copied[:3]
+
+
+def test_load_json_keeps_its_path_signature(tmp_path):
+    (tmp_path / "package.json").write_text('{"name": "x"}')
+    assert load_json(tmp_path / "package.json") == {"name": "x"}
+    assert load_json(tmp_path / "missing.json") == {}
@@ -0,0 +1,117 @@
+"""
+Dependency installs: which projects get one, and how they run.
+"""
+
+import json
+import os
+import sys
+
+import pytest
+
+from generator.events import BufferedSink, NullSink
+from generator.generate import generate_project
+from generator.install import install_projects, projects_with_dependencies
+from generator.lockfile import LOCKFILE_NAME
+from generator.pipeline import InstallPipeline
+
+
+def test_manifests_without_dependencies_are_skipped(tmp_path):
+    generate_project("flask", [], str(tmp_path / "app"), sink=NullSink())
+    generate_project("express", ["mongodb"], str(tmp_path / "api"), sink=NullSink())
+    (tmp_path / "api" / "web").mkdir()
+    (tmp_path / "api" / "web" / "package.json").write_text("{not json")
+    assert (tmp_path / "app" / "package.json").exists()
+    assert projects_with_dependencies(str(tmp_path / "app")) == []
+    assert projects_with_dependencies(str(tmp_path / "api")) == [(tmp_path / "api").resolve(), (tmp_path / "api" / "web").resolve()]
+
+
+STUB = """#!{python}
+import json, os, sys, time
+start = time.time()
+print("stub " + " ".join(sys.argv[1:]), flush=True)
+time.sleep(float(os.environ.get("STUB_SLEEP", "0")))
+code = int(open(".stub-exit").read()) if os.path.exists(".stub-exit") else int(os.environ.get("STUB_EXIT", "0"))
+with open(os.environ["STUB_LOG"], "a") as log:
+    log.write(json.dumps({{"argv": sys.argv[1:], "cwd": os.getcwd(), "start": start, "end": time.time(),
+                          "cache": os.environ.get("npm_config_cache")}}) + "\\n")
+sys.exit(code)
+"""
+
+
+@pytest.fixture
+def npm(tmp_path, monkeypatch):
+    """A stub npm on PATH that logs each call to npm.log instead of installing anything"""
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    stub = bin_dir / "npm"
+    stub.write_text(STUB.format(python=sys.executable))
+    stub.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setenv("STUB_LOG", str(tmp_path / "npm.log"))
+    return lambda: [json.loads(line) for line in (tmp_path / "npm.log").read_text().splitlines()]
+
+
+def _projects(root, *names):
+    projects = []
+    for name in names:
+        (root / name).mkdir(parents=True)
+        (root / name / "package.json").write_text('{"dependencies": {"left-pad": "1.3.0"}}')
+        projects.append(root / name)
+    return projects
+
+
+def test_installs_run_concurrently(npm, tmp_path, monkeypatch):
+    monkeypatch.setenv("STUB_SLEEP", "0.5")
+    projects = _projects(tmp_path / "app", "client", "server", "admin")
+    results = install_projects(projects, str(tmp_path / "app"), package_manager="npm", mode="online", jobs=3,
+                               cache_dir=str(tmp_path / "npm-cache"))
+    assert [result["status"] for result in results] == ["ok"] * 3
+    calls = npm()
+    assert max(call["start"] for call in calls) < min(call["end"] for call in calls)
+    assert {call["cache"] for call in calls} == {str(tmp_path / "npm-cache")}
+
+
+def test_projects_with_a_lockfile_get_npm_ci(npm, tmp_path):
+    client, server = _projects(tmp_path / "app", "client", "server")
+    (server / "package-lock.json").write_text("{}")
+    results = install_projects([client, server], str(tmp_path / "app"), package_manager="npm", mode="offline")
+    assert [result["command"] for result in results] == ["npm install --offline", "npm ci --offline"]
+    assert sorted(call["argv"][0] for call in npm()) == ["ci", "install"]
+
+
+def test_failures_are_reported_per_project(npm, tmp_path):
+    projects = _projects(tmp_path / "app", "client", "server", "admin")
+    (projects[1] / ".stub-exit").write_text("3")
+    events = BufferedSink()
+    results = install_projects(projects, str(tmp_path / "app"), package_manager="npm", mode="online", sink=events)
+    assert [(result["project"], result["status"]) for result in results] == [
+        ("client", "ok"), ("server", "failed"), ("admin", "ok")]
+    assert results[1]["error"] == "exited with code 3"
+    output = [data for kind, data in events.events if kind == "install_output"]
+    assert {(data["project"], data["line"]) for data in output} == {
+        (name, "stub install") for name in ("client", "server", "admin")}
+
+
+def test_unknown_package_manager_is_an_error(tmp_path):
+    with pytest.raises(ValueError):
+        install_projects(_projects(tmp_path, "app"), str(tmp_path), package_manager="pip")
+
+
+def test_pipeline_installs_the_generated_project(npm, tmp_path):
+    pipeline = InstallPipeline(package_manager="npm", mode="online")
+    result = generate_project("express", ["mongodb"], str(tmp_path / "api"), sink=pipeline.watch())
+    report = pipeline.join()
+    assert result.ok and report["ok"]
+    frozen = (tmp_path / "api" / LOCKFILE_NAME).exists()
+    assert [install["command"] for install in report["installs"]] == ["npm ci" if frozen else "npm install"]
+    assert [call["cwd"] for call in npm()] == [str((tmp_path / "api").resolve())]
+
+
+def test_pipeline_reports_install_failures(npm, tmp_path, monkeypatch):
+    monkeypatch.setenv("STUB_EXIT", "1")
+    pipeline = InstallPipeline(package_manager="npm", mode="online")
+    generate_project("express", ["mongodb"], str(tmp_path / "api"), sink=pipeline.watch())
+    report = pipeline.join()
+    assert not report["ok"]
+    assert report["generation_failures"] == []
+    assert [(install["status"], install["error"]) for install in report["installs"]] == [("failed", "exited with code 1")]
@@ -0,0 +1,84 @@
+"""
+Template pack round trip: what goes into a pack comes back out unchanged, and generates the same projects.
+"""
+
+import hashlib
+
+import pytest
+
+from generator.events import NullSink
+from generator.generate import generate_project, plan_combination
+from generator.pack import PackStore, build_pack, check_pack
+from generator.store import TEMPLATE_DIR, DirectoryStore, set_template_store
+
+from conftest import COMBINATIONS, tree_files
+
+
+@pytest.fixture(scope="module")
+def pack_path(tmp_path_factory):
+    path = tmp_path_factory.mktemp("pack") / "templates.pack"
+    build_pack(TEMPLATE_DIR, path, COMBINATIONS)
+    return path
+
+
+@pytest.fixture
+def pack(pack_path):
+    store = PackStore(pack_path)
+    set_template_store(store)
+    return store
+
+
+def test_entries_round_trip(pack):
+    loose = DirectoryStore(TEMPLATE_DIR)
+    keys = list(loose.keys())
+    assert list(pack.keys()) == keys
+    for key in keys:
+        data = pack.read_bytes(key)
+        assert data == loose.read_bytes(key)
+        assert b"".join(pack.chunks(key, chunk_size=7)) == data
+        assert pack.digest(key) == hashlib.sha256(data).hexdigest()
+        assert pack.size(key) == len(data)
+        assert pack.mode(key) == loose.mode(key)
+        assert pack.placeholders(key) == loose.placeholders(key)
+
+
+def test_index_matches_live_templates(pack):
+    assert check_pack(pack, TEMPLATE_DIR) == []
+    loose = DirectoryStore(TEMPLATE_DIR)
+    for combination in COMBINATIONS:
+        indexed = pack.combination(combination["framework"], combination["features"])
+        planned = plan_combination(combination["framework"], combination["features"], loose)
+        for field in ("overlays", "plan", "package_json", "lockfile", "lockfile_error"):
+            assert indexed[field] == planned[field], (combination["id"], field)
+
+
+@pytest.mark.parametrize("combination", COMBINATIONS[::7], ids=[c["id"] for c in COMBINATIONS[::7]])
+def test_generates_like_loose_templates(combination, pack, tmp_path):
+    generate_project(combination["framework"], combination["features"], str(tmp_path / "app"), sink=NullSink())
+    set_template_store(DirectoryStore(TEMPLATE_DIR))
+    generate_project(combination["framework"], combination["features"], str(tmp_path / "loose" / "app"), sink=NullSink())
+    assert tree_files(tmp_path / "app") == tree_files(tmp_path / "loose" / "app")
+
+
+def test_hardlink_mode_never_links_into_the_blob_cache(pack, tmp_path):
+    result = generate_project("express", ["mongodb"], str(tmp_path / "api"), copy_mode="hardlink", sink=NullSink())
+    assert result.ok
+    assert "hardlink" not in result.strategies
+    assert all((tmp_path / "api" / rel_path).stat().st_nlink == 1 for rel_path in result.files_written)
+
+
+def test_damaged_blob_is_extracted_again(pack_path, tmp_path):
+    store = PackStore(pack_path)
+    key = next(key for key in store.keys() if not store.placeholders(key))
+    blob = store.blob_cache.ensure(store.digest(key), store.size(key), lambda: store.read_blob(store.digest(key)))
+    blob.write_bytes(b"x" * store.size(key))
+    fresh = PackStore(pack_path)
+    fresh.materialize(key, tmp_path / "copy")
+    assert (tmp_path / "copy").read_bytes() == fresh.read_bytes(key)
+    assert blob.read_bytes() == fresh.read_bytes(key)
+
+
+def test_rejects_other_files(tmp_path):
+    (tmp_path / "bad.pack").write_bytes(b"NOTAPACK" + bytes(12))
+    with pytest.raises(ValueError):
+        PackStore(tmp_path / "bad.pack")
@@ -0,0 +1,69 @@
+"""
+Presets: components are normalised from every preset shape and generated side by side.
+"""
+
+import threading
+
+import pytest
+
+import generator.generate
+from appgen.config import get_config_manager
+from appgen.presets import generate_components, preset_components
+from generator.events import NullSink
+from generator.generate import generate_project
+from generator.manifest import MANIFEST_PATH
+
+from conftest import tree_files
+
+
+def _tree(root):
+    files = tree_files(root)
+    files.pop(MANIFEST_PATH.as_posix(), None)
+    return files
+
+
+def test_preset_shapes():
+    mern = preset_components(get_config_manager().get_presets()["mern"])
+    assert [(c["name"], c["framework"], c["directory"]) for c in mern] == [
+        ("frontend", "reactjs", "client"), ("backend", "express", "server")]
+    assert preset_components({"framework": "flask"}) == [
+        {"name": "project", "framework": "flask", "features": [], "directory": "."}]
+    assert [c["name"] for c in preset_components({"components": [{"framework": "flask", "directory": "api"}]})] == ["api"]
+    assert preset_components({"description": "empty"}) == []
+
+
+def test_components_generate_concurrently(tmp_path, monkeypatch):
+    # Each generation waits for the other, so this only finishes if both run at once
+    barrier = threading.Barrier(2, timeout=10)
+    original = generator.generate.generate_project
+
+    def generate_together(*args, **kwargs):
+        barrier.wait()
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(generator.generate, "generate_project", generate_together)
+    components = preset_components(get_config_manager().get_presets()["mern"])
+    results = generate_components(components, str(tmp_path / "mern"))
+    assert [(r["name"], r["status"]) for r in results] == [("frontend", "ok"), ("backend", "ok")]
+
+    monkeypatch.undo()
+    generate_project("reactjs", ["typescript", "tailwind"], str(tmp_path / "client"), sink=NullSink())
+    generate_project("express", ["mongodb"], str(tmp_path / "server"), sink=NullSink(),
+                     variables={"project_name": "server"})
+    assert _tree(tmp_path / "mern" / "client") == _tree(tmp_path / "client")
+    assert _tree(tmp_path / "mern" / "server") == _tree(tmp_path / "server")
+
+
+def test_a_failed_component_does_not_stop_the_others(tmp_path):
+    components = [{"name": "web", "framework": "nextjs", "features": ["bogus"], "directory": "web"},
+                  {"name": "api", "framework": "flask", "features": [], "directory": "api"}]
+    results = generate_components(components, str(tmp_path))
+    assert [r["status"] for r in results] == ["failed", "ok"]
+    assert "Invalid router type" in results[0]["error"]
+    assert results[1]["files"] > 0
+
+
+def test_components_need_distinct_directories(tmp_path):
+    components = [{"name": n, "framework": "flask", "features": [], "directory": "."} for n in ("a", "b")]
+    with pytest.raises(ValueError):
+        generate_components(components, str(tmp_path))
@@ -0,0 +1,79 @@
+"""
+Dry runs: a preview describes exactly what generation writes, without reading more templates than it must.
+"""
+
+import hashlib
+
+import pytest
+
+from generator.events import NullSink
+from generator.generate import generate_project
+from generator.manifest import MANIFEST_PATH
+from generator.pack import PackStore, build_pack
+from generator.preview import diff_preview, preview_project
+from generator.store import TEMPLATE_DIR, DirectoryStore
+from generator.variables import default_variables
+
+from conftest import COMBINATIONS, tree_files
+
+
+class _CountingStore(DirectoryStore):
+    def __init__(self, root):
+        super().__init__(root)
+        self.hashed = []
+
+    def digest(self, key):
+        self.hashed.append(key)
+        return super().digest(key)
+
+
+def _generated(tmp_path, framework, features):
+    target = tmp_path / "project"
+    assert generate_project(framework, features, str(target), sink=NullSink()).ok
+    files = tree_files(target)
+    files.pop(MANIFEST_PATH.as_posix())
+    return target, files
+
+
+def test_loose_preview_reads_metadata_only(tmp_path):
+    store = _CountingStore(TEMPLATE_DIR)
+    target, generated = _generated(tmp_path, "express", ["mongodb"])
+    preview = preview_project("express", ["mongodb"], store, default_variables(target))
+    assert store.hashed == []
+    assert {f["path"]: f["size"] for f in preview["files"]} == {path: len(data) for path, data in generated.items()}
+    for f in preview["files"]:
+        if f["sha256"] is not None:
+            assert f["sha256"] == hashlib.sha256(generated[f["path"]]).hexdigest()
+    assert {f["path"] for f in preview["files"] if f["sha256"] is None} == {
+        f["path"] for f in preview["files"] if f["source"] and not store.placeholders(f["source"])}
+
+
+def test_pack_preview_has_every_hash(tmp_path):
+    build_pack(TEMPLATE_DIR, tmp_path / "templates.pack", COMBINATIONS)
+    target, generated = _generated(tmp_path, "nextjs", ["app", "typescript"])
+    preview = preview_project("nextjs", ["app", "typescript"], PackStore(tmp_path / "templates.pack"), default_variables(target))
+    assert {f["path"]: f["sha256"] for f in preview["files"]} == {
+        path: hashlib.sha256(data).hexdigest() for path, data in generated.items()}
+
+
+def test_diff_against_the_generated_tree(tmp_path):
+    target, generated = _generated(tmp_path, "express", ["mongodb"])
+    preview = preview_project("express", ["mongodb"], variables=default_variables(target))
+    diff = diff_preview(preview, str(target))
+    assert (diff["added"], diff["modified"], diff["extra"]) == ([], [], [])
+    assert sorted(diff["unchanged"]) == sorted(generated)
+
+    readme = target / "README.md"
+    readme.write_bytes(bytes(reversed(readme.read_bytes())))
+    (target / ".env.example").unlink()
+    (target / "notes.txt").write_text("mine\n")
+    diff = diff_preview(preview, str(target))
+    assert diff["modified"] == ["README.md"]
+    assert diff["added"] == [".env.example"]
+    assert diff["extra"] == ["notes.txt"]
+
+
+@pytest.mark.parametrize("framework, features", [("nextjs", ["bogus"]), ("serverless", [])])
+def test_invalid_combinations(framework, features):
+    preview = preview_project(framework, features)
+    assert not preview["ok"] and preview["error"]
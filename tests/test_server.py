@@ -0,0 +1,97 @@
+"""
+appgen serve: /generate validates its input before anything reads the template store.
+"""
+
+import http.client
+import io
+import json
+import threading
+import zipfile
+
+import pytest
+
+from generator.server import GenerationServer, RequestError
+from generator.store import TEMPLATE_DIR, DirectoryStore
+
+from conftest import COMBINATIONS
+
+
+@pytest.fixture
+def server():
+    server = GenerationServer(("127.0.0.1", 0), workers=2, queue=0, combinations=COMBINATIONS)
+    yield server
+    server.server_close()
+
+
+def _error(server, body) -> RequestError:
+    with pytest.raises(RequestError) as info:
+        server.parse_request(body if isinstance(body, bytes) else json.dumps(body).encode())
+    return info.value
+
+
+@pytest.mark.parametrize("body", [
+    {"framework": "reactjs", "features": ["../../../../../../../etc/ssh"]},
+    {"framework": "reactjs", "features": ["base/../../nextjs/app"]},
+    {"framework": "../../etc", "features": []},
+    {"framework": "reactjs", "features": ["..\\..\\etc"]},
+    {"framework": "nextjs", "router": "../app"},
+    {"framework": "express", "db": "/etc"},
+])
+def test_rejects_paths(server, body):
+    assert _error(server, body).status == 400
+
+
+@pytest.mark.parametrize("body, message", [
+    ({"framework": "rails"}, "Unknown framework 'rails'"),
+    ({"framework": "reactjs", "features": ["graphql"]}, "Unknown feature 'graphql' for reactjs"),
+    ({"framework": "nextjs", "features": ["typescript"]}, "Invalid router type"),
+    ({"framework": "serverless"}, "For Serverless"),
+    ({"framework": "flask", "format": "rar"}, "Unknown format 'rar'"),
+    ({"framework": "flask", "variables": ["port"]}, "'variables' must be an object"),
+    ({"framework": "express", "variables": {"port": "80 + 1"}}, "Invalid port"),
+    ({"framework": "express", "variables": {"database_url": "x'; drop"}}, "Invalid value for 'database_url'"),
+    ({"features": ["typescript"]}, "needs a 'framework'"),
+    (b"{not json", "not valid JSON"),
+])
+def test_rejects_invalid_requests(server, body, message):
+    error = _error(server, body)
+    assert error.status == 400
+    assert message in str(error)
+
+
+def test_accepts_config_combinations(server):
+    for combination in COMBINATIONS:
+        request = server.parse_request(json.dumps(
+            {"framework": combination["framework"], "features": combination["features"], "name": "Portal App"}).encode())
+        assert request["combination"]["plan"] is not None
+        assert request["name"] == "portal-app"
+
+
+def test_store_refuses_keys_outside_its_root():
+    store = DirectoryStore(TEMPLATE_DIR / "reactjs")
+    assert store.has_dir("base")
+    assert not store.has_dir("../nextjs")
+    assert not store.has_dir("base/../../../")
+    with pytest.raises(ValueError):
+        list(store.walk("../nextjs"))
+
+
+def test_generate_over_http(server):
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        connection = http.client.HTTPConnection(*server.server_address, timeout=10)
+        connection.request("POST", "/generate", json.dumps({"framework": "express", "db": "mongodb", "name": "api"}))
+        response = connection.getresponse()
+        assert response.status == 200
+        with zipfile.ZipFile(io.BytesIO(response.read())) as archive:
+            assert json.loads(archive.read("package.json"))["name"] == "api"
+
+        connection = http.client.HTTPConnection(*server.server_address, timeout=10)
+        connection.request("POST", "/generate", json.dumps({"framework": "reactjs", "features": ["../../../etc"]}))
+        response = connection.getresponse()
+        assert response.status == 400
+        assert "error" in json.loads(response.read())
+    finally:
+        server.shutdown()
+        thread.join()
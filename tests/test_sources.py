@@ -0,0 +1,103 @@
+"""
+Template sources: directories and archives searched before the built-in templates.
+"""
+
+import hashlib
+import os
+import subprocess
+import sys
+import tarfile
+import textwrap
+from pathlib import Path
+
+import pytest
+
+from generator.events import NullSink
+from generator.generate import generate_project
+from generator.sources import LayeredStore, SourceCache, SourceError, open_sources
+from generator.store import TEMPLATE_DIR, DirectoryStore, configure_template_sources, get_template_store
+
+
+@pytest.fixture
+def source(tmp_path):
+    """A source that replaces Flask's requirements.txt and adds a Flask 'docker' feature"""
+    root = tmp_path / "acme"
+    (root / "flask" / "base").mkdir(parents=True)
+    (root / "flask" / "base" / "requirements.txt").write_text("flask==3.0.0\nacme-auth\n")
+    (root / "flask" / "docker").mkdir()
+    (root / "flask" / "docker" / "Dockerfile").write_text("FROM python:3.12\n")
+    return root
+
+
+def _tar(root: Path, output: Path) -> Path:
+    with tarfile.open(output, "w:gz") as archive:
+        archive.add(root, arcname=".")
+    return output
+
+
+def test_directory_source_comes_first(source, tmp_path):
+    configure_template_sources(sources=[str(source)])
+    result = generate_project("flask", ["docker"], str(tmp_path / "app"), sink=NullSink())
+    assert result.ok, result.error
+    assert (tmp_path / "app" / "requirements.txt").read_text() == "flask==3.0.0\nacme-auth\n"
+    assert (tmp_path / "app" / "Dockerfile").exists()
+    assert (tmp_path / "app" / "run.py").read_bytes() == (TEMPLATE_DIR / "flask" / "base" / "run.py").read_bytes()
+
+
+def test_layered_store_skips_the_index_for_overridden_frameworks(source):
+    store = LayeredStore([DirectoryStore(source), DirectoryStore(TEMPLATE_DIR)])
+    assert store.combination("flask", []) is None
+    assert store.digest("flask/base/run.py") == DirectoryStore(TEMPLATE_DIR).digest("flask/base/run.py")
+
+
+def test_archives_are_unpacked_once_and_pinned(source, tmp_path):
+    archive = _tar(source, tmp_path / "acme.tar.gz")
+    cache = SourceCache(tmp_path / "sources")
+    digest = hashlib.sha256(archive.read_bytes()).hexdigest()
+    first = open_sources([{"path": str(archive), "sha256": digest}], cache)[0]
+    assert first.read_bytes("flask/docker/Dockerfile") == b"FROM python:3.12\n"
+    second = open_sources([str(archive)], cache)[0]
+    assert second.root == first.root == tmp_path / "sources" / digest
+    assert list(cache.entries()) == [digest]
+    with pytest.raises(SourceError):
+        open_sources([{"path": str(archive), "sha256": "0" * 64}], cache)
+    with pytest.raises(SourceError):
+        open_sources([str(tmp_path / "missing.tar.gz")], cache)
+
+
+def test_least_recently_used_trees_are_evicted(source, tmp_path):
+    old = _tar(source, tmp_path / "old.tar")
+    (source / "flask" / "docker" / "compose.yaml").write_text("services: {}\n")
+    new = _tar(source, tmp_path / "new.tar")
+    cache = SourceCache(tmp_path / "sources", max_bytes=1)
+    old_root = open_sources([str(old)], cache)[0].root
+    new_root = open_sources([str(new)], cache)[0].root
+    assert not old_root.exists() and new_root.is_dir()
+    assert list(cache.entries()) == [new_root.name]
+
+
+def test_spawned_batch_workers_read_the_configured_sources(source, tmp_path):
+    script = tmp_path / "run_batch.py"
+    script.write_text(textwrap.dedent(f"""
+        import multiprocessing
+        from generator.batch import generate_batch
+        from generator.store import configure_template_sources
+
+        if __name__ == "__main__":
+            multiprocessing.set_start_method("spawn")
+            configure_template_sources(sources=[{str(source)!r}])
+            entries = [{{"framework": "flask", "features": ["docker"], "dir": {str(tmp_path / "a")!r}}},
+                       {{"framework": "flask", "dir": {str(tmp_path / "b")!r}}}]
+            summary = generate_batch(entries, workers=2)
+            assert summary["failed"] == 0, summary
+    """))
+    subprocess.run([sys.executable, str(script)], cwd=Path(__file__).resolve().parents[1], check=True,
+                   env={**os.environ, "PYTHONPATH": str(Path(__file__).resolve().parents[1])})
+    assert (tmp_path / "a" / "Dockerfile").exists()
+    assert "acme-auth" in (tmp_path / "b" / "requirements.txt").read_text()
+
+
+def test_bad_sources_are_reported_when_the_store_opens(tmp_path):
+    configure_template_sources(sources=[str(tmp_path / "nowhere")])
+    with pytest.raises(SourceError):
+        get_template_store()
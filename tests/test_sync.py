@@ -0,0 +1,87 @@
+"""
+appgen sync: template changes reach a generated project without overwriting local edits.
+"""
+
+import json
+
+import pytest
+
+from generator.events import NullSink
+from generator.generate import generate_project
+from generator.manifest import read_manifest
+from generator.sync import sync_project
+
+from conftest import tree_files
+
+
+@pytest.fixture
+def overlay(template_copy):
+    return template_copy / "express" / "mongodb"
+
+
+@pytest.fixture
+def project(overlay, tmp_path):
+    target = tmp_path / "api"
+    result = generate_project("express", ["mongodb"], str(target), sink=NullSink(), variables={"port": "8080"})
+    assert result.ok
+    return target
+
+
+def test_fresh_project_is_current(project):
+    report = sync_project(str(project))
+    assert report["added"] == report["updated"] == report["removed"] == report["conflicts"] == []
+    assert report["unchanged"] == len(read_manifest(project)["files"])
+
+
+def test_template_changes_are_applied(overlay, project):
+    (overlay / "README.md").write_text("# rewritten\n")
+    (overlay / "CHANGELOG.md").write_text("# {{appgen.project_name}}\n")
+    report = sync_project(str(project))
+    assert report["updated"] == ["README.md"]
+    assert report["added"] == ["CHANGELOG.md"]
+    assert (project / "README.md").read_text() == "# rewritten\n"
+    assert (project / "CHANGELOG.md").read_text() == "# api\n"
+    assert sync_project(str(project))["unchanged"] == len(read_manifest(project)["files"])
+
+
+def test_local_edits_are_conflicts(overlay, project):
+    (project / "README.md").write_text("# mine\n")
+    (overlay / "README.md").write_text("# theirs\n")
+    report = sync_project(str(project))
+    assert report["conflicts"] == [{"path": "README.md", "reason": "changed in templates but edited locally"}]
+    assert (project / "README.md").read_text() == "# mine\n"
+    # The conflict is reported again until it is resolved
+    assert sync_project(str(project))["conflicts"] == report["conflicts"]
+
+
+def test_removed_templates_keep_edited_files(overlay, project):
+    (overlay / ".env.example").unlink()
+    (overlay / "README.md").unlink()
+    (project / "README.md").write_text("# mine\n")
+    report = sync_project(str(project))
+    assert report["removed"] == [".env.example"]
+    assert not (project / ".env.example").exists()
+    assert report["conflicts"] == [{"path": "README.md", "reason": "removed from templates but edited locally"}]
+    assert (project / "README.md").read_text() == "# mine\n"
+
+
+def test_dry_run_writes_nothing(overlay, project):
+    (overlay / "README.md").write_text("# rewritten\n")
+    before = tree_files(project)
+    report = sync_project(str(project), dry_run=True)
+    assert report["updated"] == ["README.md"]
+    assert tree_files(project) == before
+
+
+def test_variables_survive_a_sync(overlay, project):
+    package_json = overlay / "package.json"
+    data = json.loads(package_json.read_text())
+    data["description"] = "{{appgen.project_name}} on {{appgen.port}}"
+    package_json.write_text(json.dumps(data, indent=2))
+    assert sync_project(str(project))["updated"] == ["package.json"]
+    assert json.loads((project / "package.json").read_text())["description"] == "api on 8080"
+
+
+def test_requires_a_manifest(tmp_path):
+    with pytest.raises(ValueError):
+        sync_project(str(tmp_path))
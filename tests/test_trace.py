@@ -0,0 +1,51 @@
+"""
+--profile: spans from every phase, saved as a Chrome trace.
+"""
+
+import json
+
+import pytest
+from typer.testing import CliRunner
+
+from appgen import config
+from appgen.cli import app
+from generator import trace
+
+
+@pytest.fixture(autouse=True)
+def tracing_off():
+    yield
+    trace.disable()
+
+
+def test_spans_are_free_when_tracing_is_off():
+    assert not trace.active()
+    assert trace.span("plan") is trace.span("write.file", key="x")
+    trace.record("plan", 0.0, 1.0)
+
+
+def test_failed_spans_are_marked():
+    tracer = trace.enable()
+    with pytest.raises(KeyError):
+        with trace.span("plan.lookup"):
+            raise KeyError("missing")
+    assert tracer.events[0]["args"] == {"error": "KeyError"}
+    assert tracer.summary()[0]["calls"] == 1
+
+
+def test_profile_writes_a_chrome_trace(tmp_path, monkeypatch):
+    # A fresh ConfigManager, so the config parse happens inside the trace
+    monkeypatch.setattr(config, "_config_manager", None)
+    result = CliRunner().invoke(app, ["create", "--framework", "express", "--db", "mongodb", "--dir", str(tmp_path / "api"),
+                                      "--jobs", "4", "--profile", str(tmp_path / "trace.json")])
+    assert result.exit_code == 0, result.output
+    assert "Profile" in result.output
+    document = json.loads((tmp_path / "trace.json").read_text())
+    spans = [event for event in document["traceEvents"] if event["ph"] == "X"]
+    names = {event["name"] for event in spans}
+    assert {"config.load", "plan.lookup", "package_json.merge", "write.file", "generate.plan", "generate.write",
+            "generate_project"} <= names
+    assert all(event["dur"] >= 0 for event in spans)
+    threads = {event["args"]["name"] for event in document["traceEvents"] if event["name"] == "thread_name"}
+    assert "main" in threads
+    assert not trace.active()
@@ -0,0 +1,72 @@
+"""
+Watch mode: edits to the template tree replan and rewrite only the samples they affect.
+"""
+
+import json
+
+import pytest
+
+from generator.watch import IndexedStore, TemplateWatch
+
+from conftest import COMBINATIONS, tree_files
+
+SAMPLES = [c for c in COMBINATIONS if c["framework"] in ("flask", "express")]
+
+
+@pytest.fixture
+def session(template_copy, tmp_path):
+    session = TemplateWatch(template_copy, tmp_path / "samples", SAMPLES)
+    assert not any(report["error"] for report in session.build())
+    return session
+
+
+def test_content_edit_rewrites_only_its_readers(template_copy, session):
+    (template_copy / "express" / "mongodb" / "README.md").write_text("# edited\n")
+    update = session.apply(["express/mongodb/README.md"])
+    assert [report["sample"] for report in update["samples"]] == ["express:mongodb"]
+    assert update["samples"][0]["written"] == ["README.md"]
+    assert (session.sample_dir("express:mongodb") / "README.md").read_text() == "# edited\n"
+
+
+def test_new_file_reaches_the_sample(template_copy, session):
+    (template_copy / "flask" / "base" / "docs").mkdir()
+    (template_copy / "flask" / "base" / "docs" / "index.md").write_text("docs\n")
+    update = session.apply(["flask/base/docs"])
+    assert update["keys"] == ["flask/base/docs/index.md"]
+    assert (session.sample_dir("flask") / "docs" / "index.md").read_text() == "docs\n"
+
+
+def test_nested_package_json_is_structural(template_copy, tmp_path):
+    (template_copy / "flask" / "base" / "web").mkdir()
+    (template_copy / "flask" / "base" / "web" / "package.json").write_text('{"name": "web"}')
+    store = IndexedStore(template_copy, SAMPLES)
+    store.rebuild()
+    replanned = []
+    index = store._index
+    store._index = lambda cid: (replanned.append(cid), index(cid))
+    (template_copy / "flask" / "base" / "web" / "package.json").write_text('{"name": "web", "private": true}')
+    assert store.update(["flask/base/web/package.json"]) == {"flask": ["flask/base/web/package.json"]}
+    assert replanned == ["flask"]
+
+
+def test_broken_package_json_keeps_the_last_good_plan(template_copy, session):
+    package_json = template_copy / "express" / "base" / "package.json"
+    good = package_json.read_text()
+    package_json.write_text("{")
+    update = session.apply(["express/base/package.json"])
+    assert "express" in session.store.errors
+    assert update["samples"][0]["error"]
+    package_json.write_text(good.replace('"version"', '"private": true, "version"', 1))
+    session.apply(["express/base/package.json"])
+    assert "express" not in session.store.errors
+    assert json.loads((session.sample_dir("express") / "package.json").read_text())["private"] is True
+
+
+def test_samples_match_a_fresh_build(template_copy, session, tmp_path):
+    (template_copy / "express" / "base" / "src" / "index.js").write_text("// edited\n")
+    (template_copy / "express" / "mongodb" / ".env.example").unlink()
+    session.apply(["express/base/src/index.js", "express/mongodb/.env.example"])
+    fresh = TemplateWatch(template_copy, tmp_path / "fresh", SAMPLES)
+    fresh.build()
+    for combination in SAMPLES:
+        assert tree_files(session.sample_dir(combination["id"])) == tree_files(fresh.sample_dir(combination["id"]))